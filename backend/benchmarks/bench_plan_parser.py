@@ -0,0 +1,54 @@
+"""
+Micro-benchmark for the weekly-plan parser.
+
+Times ``normalize_plan`` against the parser it replaced on the seeded corpus
+from ``tests/test_plan_parsing.py``, after checking that both produce the
+same days (the tests run the same check over more seeds). Then times full
+weeks in the ``WeeklyPlanCreate`` shape, which take the strict fast path,
+against the same weeks as top-level day keys, which take the general one.
+
+Usage (from backend/):
+    python -m benchmarks.bench_plan_parser [--cases 500] [--seed 7] [--repeat 5]
+"""
+import argparse
+import timeit
+from typing import Any, Dict, List
+
+from features.planner.parsing import normalize_plan
+from features.planner.models import WEEK_DAYS
+from tests.test_plan_parsing import DISHES, legacy_parse, make_corpus
+
+
+def check(corpus: List[Dict[str, Any]]) -> None:
+    for i, plan in enumerate(corpus):
+        expected, actual = [day.model_dump() for day in legacy_parse(plan)], normalize_plan(plan)
+        if expected != actual:
+            raise AssertionError(f"case {i} differs:\n{plan}\nlegacy: {expected}\nnew: {actual}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.cases, args.seed)
+    check(corpus)
+    print(f"{len(corpus)} plans parse identically")
+
+    for name, parse in (("legacy", legacy_parse), ("normalize_plan", normalize_plan)):
+        best = min(timeit.repeat(lambda: [parse(plan) for plan in corpus], number=1, repeat=args.repeat))
+        print(f"{name:>15}: {best / len(corpus) * 1e6:8.1f} µs/plan")
+
+    weeks = [
+        {day.lower(): {meal: DISHES[i % 5:i % 5 + 2] for meal in ("breakfast", "lunch", "dinner")} for day in WEEK_DAYS}
+        for i in range(args.cases)
+    ]
+    for name, plans in (("general path", weeks), ("strict path", [{"days": week} for week in weeks])):
+        best = min(timeit.repeat(lambda: [normalize_plan(plan) for plan in plans], number=1, repeat=args.repeat))
+        print(f"{name:>15}: {best / len(plans) * 1e6:8.1f} µs/plan (full WeeklyPlanCreate week)")
+
+
+if __name__ == "__main__":
+    main()
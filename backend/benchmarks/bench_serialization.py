@@ -0,0 +1,112 @@
+"""
+Per-route response serialization cost, default versus FAST_SERIALIZATION.
+
+Boots the app in-process (see benchmarks.harness), seeds one user with a
+full week (21 meal slots) and some recipes, then times the same requests
+with fast serialization off and on. Everything else on the path is
+identical, so the difference is the response_model validation and JSON
+encoding that fast mode skips or replaces. Only the planner routes use fast
+mode; the recipe routes are a control and show the run-to-run noise.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization [--requests 2000]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from typing import Any, Dict
+
+from benchmarks.fake_elevenlabs import FakeElevenLabs
+from benchmarks.harness import bench_client
+
+USER = {"x-bench-user": "bench-serialization"}
+
+FULL_WEEK = {
+    day: {
+        meal: [f"{day.title()} {meal} {i}" for i in range(2)]
+        for meal in ("breakfast", "lunch", "dinner")
+    }
+    for day in ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+}
+
+RECIPE = {
+    "userId": USER["x-bench-user"],
+    "title": "Serialization Stew",
+    "description": "A recipe with enough fields to be representative",
+    "ingredients": [{"name": f"ingredient {i}", "amount": i, "unit": "g"} for i in range(12)],
+    "instructions": [f"Step {i}" for i in range(8)],
+    "prepTime": 10,
+    "cookTime": 40,
+    "servings": 4,
+}
+
+_recipe_numbers = itertools.count(1)
+
+
+def _recipe() -> Dict[str, Any]:
+    """RECIPE with a unique title: recipes are content-addressed, so posting
+    the same one again would only time the duplicate lookup."""
+    return {**RECIPE, "title": f"{RECIPE['title']} {next(_recipe_numbers)}"}
+
+
+ROUTES = {
+    "GET /planner": lambda c: c.get("/planner", headers=USER),
+    "POST /planner": lambda c: c.post("/planner", json=FULL_WEEK, headers=USER),
+    "GET /recipes": lambda c: c.get("/recipes", params={"limit": 50}, headers=USER),
+    "POST /recipes": lambda c: c.post("/recipes", json=_recipe(), headers=USER),
+}
+
+
+async def _time_route(client, request, count: int) -> float:
+    # Warm up caches and code paths, then measure
+    for _ in range(20):
+        await request(client)
+    started = time.perf_counter()
+    for _ in range(count):
+        response = await request(client)
+        response.raise_for_status()
+    return (time.perf_counter() - started) / count * 1e6
+
+
+async def run(requests: int) -> Dict[str, Any]:
+    from features.serialization import responses
+
+    upstream = FakeElevenLabs()
+    await upstream.start()
+    try:
+        async with bench_client(upstream.url) as client:
+            await client.post("/planner", json=FULL_WEEK, headers=USER)
+            for _ in range(50):
+                await client.post("/recipes", json=_recipe(), headers=USER)
+
+            # Both modes must produce the same JSON
+            bodies = {}
+            for fast in (False, True):
+                responses.FAST_SERIALIZATION = fast
+                bodies[fast] = (await client.get("/planner", headers=USER)).json()
+            assert bodies[False] == bodies[True], "fast and default GET /planner responses differ"
+
+            report = {}
+            for name, request in ROUTES.items():
+                timings = {}
+                for fast in (False, True):
+                    responses.FAST_SERIALIZATION = fast
+                    timings["fast" if fast else "default"] = round(await _time_route(client, request, requests), 1)
+                timings["savedPct"] = round((1 - timings["fast"] / timings["default"]) * 100, 1)
+                report[name] = timings
+    finally:
+        await upstream.stop()
+    return {"requests": requests, "usPerRequest": report}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Timed requests per route and mode")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.requests)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Local stand-in for the ElevenLabs conversation-token API.
+
+Serves ``GET /v1/convai/conversation/token`` on 127.0.0.1 with configurable
+latency and error rate, so token minting can be load-tested without
+touching the real API or spending credits.
+"""
+import asyncio
+import random
+import socket
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Header, HTTPException, Query
+
+
+def create_app(latency: float = 0.05, error_rate: float = 0.0) -> FastAPI:
+    app = FastAPI()
+    app.state.requests = 0
+
+    @app.get("/v1/convai/conversation/token")
+    async def conversation_token(
+        agent_id: str = Query(...),
+        xi_api_key: str = Header(...),
+    ):
+        app.state.requests += 1
+        await asyncio.sleep(random.uniform(latency * 0.5, latency * 1.5))
+        if random.random() < error_rate:
+            raise HTTPException(status_code=503, detail="fake upstream error")
+        return {"token": f"fake-{agent_id}-{uuid.uuid4().hex}"}
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeElevenLabs:
+    """Runs the fake API with uvicorn in the current event loop."""
+
+    def __init__(self, latency: float = 0.05, error_rate: float = 0.0, port: int = 0):
+        self.app = create_app(latency, error_rate)
+        self.port = port or _free_port()
+        self._server = uvicorn.Server(uvicorn.Config(
+            self.app, host="127.0.0.1", port=self.port, log_level="warning", access_log=False,
+        ))
+        self._task = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def requests(self) -> int:
+        return self.app.state.requests
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._server.serve())
+        while not self._server.started:
+            if self._task.done():
+                self._task.result()
+            await asyncio.sleep(0.01)
+
+    async def stop(self) -> None:
+        self._server.should_exit = True
+        if self._task is not None:
+            await self._task
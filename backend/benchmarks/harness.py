@@ -0,0 +1,87 @@
+"""
+Boots ``main:app`` in-process for benchmarks.
+
+Firestore is the in-memory fake (``FIRESTORE_BACKEND=memory``),
+``get_current_user`` is overridden to trust an ``x-bench-user`` header, and
+ElevenLabs calls go to whatever ``upstream_url`` points at (normally
+``FakeElevenLabs``). Requests go through httpx's ASGI transport, so results
+measure the app itself rather than the network or a server process.
+"""
+import logging
+import math
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+import httpx
+from fastapi import Request
+
+BENCH_AGENT_KEY = "bench-agent-key"
+
+
+def configure_environment(upstream_url: str, token_pool_size: int = 0) -> None:
+    """Point the app's settings at local fakes. Must run before ``main`` is imported."""
+    os.environ.update({
+        "FIRESTORE_BACKEND": "memory",
+        "ELEVENLABS_API_BASE_URL": upstream_url,
+        "ELEVENLABS_API_KEY": "bench",
+        "ELEVENLABS_DISCOVER_AGENT_ID": "bench-discover",
+        "ELEVENLABS_COOK_AGENT_ID": "bench-cook",
+        "ELEVENLABS_PLANNER_AGENT_ID": "bench-planner",
+        "ELEVENLABS_TOKEN_POOL_MIN_SIZE": str(min(token_pool_size, 1)),
+        "ELEVENLABS_TOKEN_POOL_MAX_SIZE": str(token_pool_size),
+        "DISCOVER_AGENT_ENDPOINT_KEY": BENCH_AGENT_KEY,
+        "ACCESS_LOG_ENABLED": "false",
+        "TEXT_INDEX_SNAPSHOT_PATH": "",
+        "METRICS_LOOP_LAG_INTERVAL_SECONDS": "0",
+        # A few users at full speed would otherwise be measuring 429s
+        "RATE_LIMIT_ENABLED": "false",
+    })
+
+
+async def _bench_user(request: Request) -> dict:
+    return {"uid": request.headers.get("x-bench-user", "bench-user")}
+
+
+@asynccontextmanager
+async def bench_client(upstream_url: str, token_pool_size: int = 0):
+    """Yield an httpx client bound to a started ``main:app`` with bench overrides."""
+    configure_environment(upstream_url, token_pool_size)
+    # httpx logs every request at INFO: noise in the report, and time in the loop
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    import main
+    from features.auth.firebase import get_current_user
+
+    main.app.dependency_overrides[get_current_user] = _bench_user
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+    main.app.dependency_overrides.clear()
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Optional[float]]:
+    """Count, throughput and latency percentiles (ms) for one scenario."""
+    values = sorted(latencies)
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        "count": len(values),
+        "errors": errors,
+        "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+        "p50Ms": ms(percentile(values, 50)),
+        "p95Ms": ms(percentile(values, 95)),
+        "p99Ms": ms(percentile(values, 99)),
+        "maxMs": ms(values[-1] if values else None),
+    }
@@ -0,0 +1,211 @@
+"""
+Load test for the API with in-memory Firestore, stubbed auth and a fake ElevenLabs.
+
+Runs a weighted mix of recipe creates and lists, planner reads, saves and
+meal patches, and conversation-token mints against ``main:app`` at a fixed
+concurrency. Prints a JSON report of throughput and p50/p95/p99 latency per
+scenario; pass ``--baseline`` with an earlier report to see the change.
+
+Usage (from backend/):
+    python -m benchmarks.load --duration 20 --concurrency 32 --output after.json
+    python -m benchmarks.load --mix planner_read=8,planner_patch=2 --baseline before.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.fake_elevenlabs import FakeElevenLabs
+from benchmarks.harness import bench_client, summarize
+
+DEFAULT_MIX = {
+    "recipe_create": 2,
+    "recipe_list": 3,
+    "planner_read": 6,
+    "planner_write": 1,
+    "planner_patch": 2,
+    "token_mint": 1,
+}
+
+DISHES = ["Shakshuka", "Mushroom Risotto", "Chicken Tikka", "Lentil Soup", "Fish Tacos", "Pad Thai"]
+INGREDIENTS = ["egg", "tomato", "onion", "garlic", "rice", "lentil", "chicken", "lime", "cumin", "butter"]
+
+
+def _recipe(user_id: str, rng: random.Random) -> Dict[str, Any]:
+    return {
+        "userId": user_id,
+        "title": f"{rng.choice(DISHES)} #{rng.randint(1, 10_000)}",
+        "description": "Benchmark recipe",
+        "ingredients": [
+            {"name": name, "amount": rng.randint(1, 500), "unit": rng.choice(["g", "ml", None])}
+            for name in rng.sample(INGREDIENTS, 5)
+        ],
+        "instructions": ["Prep everything.", "Cook it.", "Serve."],
+        "servings": rng.randint(1, 6),
+    }
+
+
+def _plan(rng: random.Random) -> Dict[str, Any]:
+    return {
+        day: {meal: rng.sample(DISHES, rng.randint(0, 2)) for meal in ("breakfast", "lunch", "dinner")}
+        for day in ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+    }
+
+
+Scenario = Callable[[httpx.AsyncClient, str, random.Random], Awaitable[httpx.Response]]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "recipe_create": lambda c, u, r: c.post("/recipes", json=_recipe(u, r), headers={"x-bench-user": u}),
+    "recipe_list": lambda c, u, r: c.get("/recipes", params={"limit": 20}, headers={"x-bench-user": u}),
+    "planner_read": lambda c, u, r: c.get("/planner", headers={"x-bench-user": u}),
+    "planner_write": lambda c, u, r: c.post("/planner", json=_plan(r), headers={"x-bench-user": u}),
+    "planner_patch": lambda c, u, r: c.patch(
+        f"/planner/{r.choice(['monday', 'wednesday', 'friday'])}/dinner",
+        json={"op": "add", "item": {"name": r.choice(DISHES)}},
+        headers={"x-bench-user": u},
+    ),
+    "token_mint": lambda c, u, r: c.get("/elevenlabs/conversation-token", headers={"x-bench-user": u}),
+}
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def _seed(client: httpx.AsyncClient, users: List[str], rng: random.Random) -> None:
+    """Give every user some recipes and a plan, so reads and patches hit real data."""
+    for user_id in users:
+        await client.post("/planner", json=_plan(rng), headers={"x-bench-user": user_id})
+        for _ in range(5):
+            await client.post("/recipes", json=_recipe(user_id, rng), headers={"x-bench-user": user_id})
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    upstream = FakeElevenLabs(latency=args.upstream_latency_ms / 1000, error_rate=args.upstream_error_rate)
+    await upstream.start()
+    try:
+        async with bench_client(upstream.url, args.token_pool_size) as client:
+            users = [f"bench-user-{i}" for i in range(args.users)]
+            await _seed(client, users, rng)
+
+            names = list(args.mix)
+            weights = [args.mix[name] for name in names]
+            latencies: Dict[str, List[float]] = {name: [] for name in names}
+            errors: Dict[str, int] = {name: 0 for name in names}
+            statuses: Dict[str, Dict[int, int]] = {name: {} for name in names}
+            deadline = time.perf_counter() + args.duration
+
+            async def worker(worker_id: int) -> None:
+                worker_rng = random.Random(args.seed * 1000 + worker_id)
+                while time.perf_counter() < deadline:
+                    name = worker_rng.choices(names, weights)[0]
+                    user_id = worker_rng.choice(users)
+                    started = time.perf_counter()
+                    try:
+                        response = await SCENARIOS[name](client, user_id, worker_rng)
+                        status = response.status_code
+                    except Exception:
+                        status = 599
+                    latencies[name].append(time.perf_counter() - started)
+                    statuses[name][status] = statuses[name].get(status, 0) + 1
+                    if status >= 400:
+                        errors[name] += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+    finally:
+        await upstream.stop()
+
+    scenarios = {}
+    for name in names:
+        scenarios[name] = summarize(latencies[name], errors[name], elapsed)
+        scenarios[name]["statuses"] = {str(code): count for code, count in sorted(statuses[name].items())}
+    all_latencies = [value for values in latencies.values() for value in values]
+
+    return {
+        "commit": _git_commit(),
+        "config": {
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "users": args.users,
+            "mix": args.mix,
+            "seed": args.seed,
+            "upstreamLatencyMs": args.upstream_latency_ms,
+            "upstreamErrorRate": args.upstream_error_rate,
+            "tokenPoolSize": args.token_pool_size,
+        },
+        "elapsedSeconds": round(elapsed, 3),
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+        "scenarios": scenarios,
+        "upstreamRequests": upstream.requests,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> Dict[str, Dict[str, Optional[float]]]:
+    """Percent change per scenario for rps and latency percentiles (negative latency = faster)."""
+    def change(new: Optional[float], old: Optional[float]) -> Optional[float]:
+        if new is None or not old:
+            return None
+        return round((new - old) / old * 100, 1)
+
+    deltas = {}
+    for name, stats in {"total": report["total"], **report["scenarios"]}.items():
+        old = baseline["total"] if name == "total" else baseline.get("scenarios", {}).get(name)
+        if old is None:
+            continue
+        deltas[name] = {key: change(stats.get(key), old.get(key)) for key in ("rps", "p50Ms", "p95Ms", "p99Ms")}
+    return deltas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run the mix")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent virtual clients")
+    parser.add_argument("--users", type=int, default=50, help="Distinct users the clients act as")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="Scenario weights, e.g. planner_read=6,token_mint=1")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--upstream-latency-ms", type=float, default=50.0, help="Fake ElevenLabs latency")
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0, help="Fake ElevenLabs 503 rate")
+    parser.add_argument("--token-pool-size", type=int, default=0, help="Pre-minted token pool size (0 = off)")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["changeVsBaselinePct"] = compare(report, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,53 @@
-import os
+import asyncio
+from typing import Dict, Any
 
-import firebase_admin
-from firebase_admin import auth
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-# Initialize Firebase Admin SDK (project ID only for token verification)
-if not firebase_admin._apps:
-    firebase_admin.initialize_app(options={
-        'projectId': os.getenv('FIREBASE_PROJECT_ID', 'chefmate-ai-fac55')
-    })
+from features.auth.token_cache import VerifiedTokenCache, token_cache
+from features.observability.metrics import track
+from features.services.container import services
 
 security = HTTPBearer()
 
+# Verifications currently running in the thread pool, keyed like the cache,
+# so concurrent requests carrying the same new token share one verification.
+_pending_verifications: Dict[str, asyncio.Future] = {}
+
+
+@track("auth", "verify_id_token")
+async def _verify_with_firebase(token: str) -> Dict[str, Any]:
+    # The first call imports firebase_admin.auth and initializes the app
+    return await asyncio.to_thread(lambda: services.auth().verify_id_token(token))
+
+
+async def _verify_token(token: str) -> Dict[str, Any]:
+    """
+    Verify a Firebase ID token, serving repeat tokens from the cache.
+
+    Cache misses run the blocking ``auth.verify_id_token`` (RSA checks and the
+    occasional public-cert refresh) in a worker thread so the event loop keeps
+    serving other requests.
+    """
+    key = VerifiedTokenCache.key_for(token)
+    decoded_token = token_cache.get(key)
+    if decoded_token is not None:
+        return decoded_token
+
+    pending = _pending_verifications.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+
+    future = asyncio.ensure_future(_verify_with_firebase(token))
+    _pending_verifications[key] = future
+    try:
+        decoded_token = await asyncio.shield(future)
+    finally:
+        _pending_verifications.pop(key, None)
+
+    token_cache.put(key, decoded_token)
+    return decoded_token
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -21,21 +56,18 @@ async def get_current_user(
     token = credentials.credentials
     
     try:
-        decoded_token = auth.verify_id_token(token)
+        decoded_token = await _verify_token(token)
         return decoded_token
-    except auth.InvalidIdTokenError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication token"
-        )
-    except auth.ExpiredIdTokenError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has expired"
-        )
     except Exception as e:
+        auth = services.auth()
+        # ExpiredIdTokenError subclasses InvalidIdTokenError, so check it first
+        if isinstance(e, auth.ExpiredIdTokenError):
+            detail = "Token has expired"
+        elif isinstance(e, auth.InvalidIdTokenError):
+            detail = "Invalid authentication token"
+        else:
+            detail = f"Authentication failed: {str(e)}"
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"Authentication failed: {str(e)}"
+            detail=detail
         )
-
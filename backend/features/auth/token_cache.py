@@ -0,0 +1,94 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from features.observability.metrics import registry
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU cache of verified Firebase ID tokens.
+
+    Entries are keyed by a SHA-256 hash of the raw token (the token itself is
+    never stored) and expire at the token's own ``exp`` claim, minus a small
+    clock-skew margin. The least recently used entry is evicted once the cache
+    is full.
+    """
+
+    def __init__(self, max_size: int = 10000, skew_seconds: float = 30.0):
+        self.max_size = max_size
+        self.skew_seconds = skew_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    @staticmethod
+    def key_for(token: str) -> str:
+        """Hash a raw token into a cache key."""
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached decoded token, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, decoded_token = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return decoded_token
+
+    def put(self, key: str, decoded_token: Dict[str, Any]) -> None:
+        """Cache a decoded token until its ``exp`` claim."""
+        if self.max_size <= 0:
+            return
+
+        exp = decoded_token.get("exp")
+        if not isinstance(exp, (int, float)):
+            return
+
+        expires_at = exp - self.skew_seconds
+        if expires_at <= time.time():
+            return
+
+        self._entries[key] = (expires_at, decoded_token)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxSize": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+token_cache = VerifiedTokenCache(
+    max_size=int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000")),
+    skew_seconds=float(os.getenv("AUTH_TOKEN_CACHE_SKEW_SECONDS", "30")),
+)
+
+registry.register_collector(lambda: [
+    ("auth_token_cache_hits_total", "Verified ID tokens served from the cache.", "counter",
+     [({}, token_cache.hits)]),
+    ("auth_token_cache_misses_total", "ID tokens that needed a Firebase verification.", "counter",
+     [({}, token_cache.misses)]),
+    ("auth_token_cache_size", "Verified ID tokens currently cached.", "gauge",
+     [({}, token_cache.stats()["size"])]),
+])
@@ -0,0 +1 @@
+# Cache feature module
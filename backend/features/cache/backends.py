@@ -0,0 +1,98 @@
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """
+    Minimal async key-value interface for caches.
+
+    Values must be JSON-serializable so the same caller code works with the
+    in-process backend and with a shared backend across workers.
+    """
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Process-local cache with per-entry TTL and LRU eviction.
+
+    Also serves as the local fake of a shared backend in tests.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Shared cache in Redis, so several uvicorn workers see the same entries."""
+
+    def __init__(self, url: str, prefix: str = "chefmate:"):
+        # Optional dependency: only needed when a Redis URL is configured
+        import redis.asyncio as redis
+
+        self.prefix = prefix
+        self._redis = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._redis.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self._redis.set(self.prefix + key, json.dumps(value, default=str), px=int(ttl * 1000))
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(self.prefix + key)
+
+
+def create_backend(redis_url: Optional[str], max_size: int, prefix: str = "chefmate:") -> CacheBackend:
+    """Use Redis when a URL is configured and redis is installed, else in-process."""
+    if redis_url:
+        try:
+            return RedisCacheBackend(redis_url, prefix=prefix)
+        except ImportError:
+            logger.warning("CACHE_REDIS_URL is set but redis is not installed; using in-process cache")
+    return InMemoryCacheBackend(max_size=max_size)
@@ -0,0 +1 @@
+# Cooking session feature module
@@ -0,0 +1,48 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from features.recipes.models import ScaledIngredient
+
+
+class CookingSessionCreate(BaseModel):
+    """Start cooking a recipe, optionally rescaled like GET /recipes/{id}"""
+    recipeId: str = Field(..., min_length=1)
+    servings: Optional[int] = Field(None, ge=1, le=100)
+    units: Optional[Literal["metric", "imperial"]] = None
+
+
+class CookingStep(BaseModel):
+    """One instruction, numbered from 1, with any durations it mentions in seconds"""
+    number: int
+    total: int
+    text: str
+    durations: List[int] = []
+    isLast: bool
+
+
+class CookingSessionResponse(BaseModel):
+    """A new cooking session with the recipe's ingredients and first step"""
+    id: str
+    recipeId: str
+    title: str
+    servings: Optional[int] = None
+    ingredients: List[ScaledIngredient]
+    step: CookingStep
+
+
+class CookingTimerCreate(BaseModel):
+    """Start a timer; without ``seconds``, the current step's first duration is used"""
+    label: Optional[str] = Field(None, max_length=100)
+    seconds: Optional[int] = Field(None, ge=1, le=86400)
+
+
+class CookingTimer(BaseModel):
+    label: str
+    seconds: int
+    remainingSeconds: int
+    done: bool
+
+
+class CookingTimersResponse(BaseModel):
+    timers: List[CookingTimer]
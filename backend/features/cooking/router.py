@@ -0,0 +1,125 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+
+from features.auth.firebase import get_current_user
+from features.cooking.models import (
+    CookingSessionCreate,
+    CookingSessionResponse,
+    CookingStep,
+    CookingTimerCreate,
+    CookingTimersResponse,
+)
+from features.cooking.sessions import CookingSession, cooking_sessions
+from features.database.firestore import get_recipe
+from features.ratelimit.limiter import RateLimit
+from features.recipes.scaling import scale_ingredients
+
+# The cook agent calls these once or twice per conversational turn
+rate_limit = RateLimit.from_env("cook", per_minute=240, burst=60)
+
+router = APIRouter(prefix="/cook/sessions", tags=["Cooking"], dependencies=[Depends(rate_limit.user)])
+
+
+def _session(session_id: str, user: dict) -> CookingSession:
+    session = cooking_sessions.get(session_id, user["uid"])
+    if session is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cooking session not found or expired")
+    return session
+
+
+@router.post("", response_model=CookingSessionResponse, status_code=status.HTTP_201_CREATED)
+async def start_cooking_session(
+    body: CookingSessionCreate,
+    user: dict = Depends(get_current_user)
+):
+    """
+    Load a recipe once and start cooking it.
+
+    Returns the session ID, the ingredients (rescaled to ``servings`` and
+    converted to ``units`` when given) and the first step. Later calls
+    fetch one step at a time, so the agent never re-reads the recipe.
+    """
+    user_id = user["uid"]
+    recipe = await get_recipe(body.recipeId)
+    if recipe is None or recipe.get('userId') != user_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recipe not found")
+    if not recipe.get('instructions'):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Recipe has no steps")
+
+    original_servings = recipe.get('servings')
+    if body.servings is not None and not original_servings:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Recipe has no servings to scale from"
+        )
+    factor = body.servings / original_servings if body.servings else 1.0
+
+    session = cooking_sessions.create(
+        user_id=user_id,
+        recipe_id=body.recipeId,
+        title=recipe.get('title', ''),
+        servings=body.servings or original_servings,
+        ingredients=scale_ingredients(recipe.get('ingredients') or [], factor, body.units),
+        steps=recipe['instructions'],
+    )
+    return CookingSessionResponse(
+        id=session.id,
+        recipeId=session.recipe_id,
+        title=session.title,
+        servings=session.servings,
+        ingredients=list(session.ingredients),
+        step=CookingStep(**session.step()),
+    )
+
+
+@router.get("/{session_id}/current", response_model=CookingStep)
+async def get_current_step(session_id: str, user: dict = Depends(get_current_user)):
+    """The step the user is on."""
+    return _session(session_id, user).step()
+
+
+@router.get("/{session_id}/next", response_model=CookingStep)
+async def next_step(session_id: str, user: dict = Depends(get_current_user)):
+    """Move to the next step and return it (stays on the last step at the end)."""
+    return _session(session_id, user).advance(1)
+
+
+@router.get("/{session_id}/previous", response_model=CookingStep)
+async def previous_step(session_id: str, user: dict = Depends(get_current_user)):
+    """Go back one step and return it."""
+    return _session(session_id, user).advance(-1)
+
+
+@router.get("/{session_id}/timers", response_model=CookingTimersResponse)
+async def get_timers(session_id: str, user: dict = Depends(get_current_user)):
+    """The session's timers with their remaining time."""
+    session = _session(session_id, user)
+    return {"timers": session.timer_states(cooking_sessions.clock())}
+
+
+@router.post("/{session_id}/timers", response_model=CookingTimersResponse, status_code=status.HTTP_201_CREATED)
+async def start_timer(
+    session_id: str,
+    body: CookingTimerCreate,
+    user: dict = Depends(get_current_user)
+):
+    """Start a timer, by default for the duration the current step mentions."""
+    session = _session(session_id, user)
+    step = session.step()
+    seconds = body.seconds or (step["durations"][0] if step["durations"] else None)
+    if seconds is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The current step mentions no duration; pass seconds"
+        )
+
+    now = cooking_sessions.clock()
+    session.start_timer(body.label or f"Step {step['number']}", seconds, now)
+    return {"timers": session.timer_states(now)}
+
+
+@router.delete("/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def end_cooking_session(session_id: str, user: dict = Depends(get_current_user)):
+    """Finish cooking and free the session."""
+    if not cooking_sessions.delete(session_id, user["uid"]):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cooking session not found or expired")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
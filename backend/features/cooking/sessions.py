@@ -0,0 +1,168 @@
+import math
+import os
+import re
+import secrets
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from features.observability.metrics import registry
+
+COOK_SESSION_TTL_SECONDS = float(os.getenv("COOK_SESSION_TTL_SECONDS", "7200"))
+COOK_SESSION_MAX = int(os.getenv("COOK_SESSION_MAX", "10000"))
+
+# Timers kept per session; starting another drops the oldest
+MAX_TIMERS = 10
+
+_DURATION = re.compile(
+    r"(\d+(?:\.\d+)?)(?:\s*(?:-|–|to)\s*\d+(?:\.\d+)?)?\s*"
+    r"(hours?|hrs?|minutes?|mins?|seconds?|secs?)\b",
+    re.IGNORECASE,
+)
+_UNIT_SECONDS = {"h": 3600, "m": 60, "s": 1}
+
+
+def step_durations(text: str) -> Tuple[int, ...]:
+    """
+    Durations mentioned in an instruction, in seconds.
+
+    "Simmer for 10-12 minutes" -> (600,); ranges use their lower bound so a
+    timer goes off when it's time to check.
+    """
+    return tuple(
+        int(float(amount) * _UNIT_SECONDS[unit[0].lower()])
+        for amount, unit in _DURATION.findall(text)
+    )
+
+
+class CookingSession:
+    """
+    A user's progress through one recipe.
+
+    Only what the cook agent asks for per turn is kept: the instruction
+    strings, their precomputed durations, the (already scaled) ingredients,
+    the current position and any running timers.
+    """
+
+    __slots__ = (
+        "id", "user_id", "recipe_id", "title", "servings", "ingredients",
+        "steps", "durations", "position", "timers", "expires_at",
+    )
+
+    def __init__(self, session_id: str, user_id: str, recipe_id: str, title: str,
+                 servings: Optional[int], ingredients: List[Dict[str, Any]], steps: List[str]):
+        self.id = session_id
+        self.user_id = user_id
+        self.recipe_id = recipe_id
+        self.title = title
+        self.servings = servings
+        self.ingredients = tuple(ingredients)
+        self.steps = tuple(steps)
+        self.durations = tuple(step_durations(step) for step in self.steps)
+        self.position = 0
+        # [label, seconds, ends_at (monotonic)]
+        self.timers: List[List[Any]] = []
+        self.expires_at = 0.0
+
+    def step(self) -> Dict[str, Any]:
+        total = len(self.steps)
+        return {
+            "number": self.position + 1,
+            "total": total,
+            "text": self.steps[self.position],
+            "durations": list(self.durations[self.position]),
+            "isLast": self.position == total - 1,
+        }
+
+    def advance(self, by: int) -> Dict[str, Any]:
+        """Move ``by`` steps (negative to go back), staying within the recipe."""
+        self.position = min(max(self.position + by, 0), len(self.steps) - 1)
+        return self.step()
+
+    def start_timer(self, label: str, seconds: int, now: float) -> None:
+        self.timers.append([label, seconds, now + seconds])
+        del self.timers[:-MAX_TIMERS]
+
+    def timer_states(self, now: float) -> List[Dict[str, Any]]:
+        states = []
+        for label, seconds, ends_at in self.timers:
+            remaining = max(0, math.ceil(ends_at - now))
+            states.append({"label": label, "seconds": seconds, "remainingSeconds": remaining, "done": remaining == 0})
+        return states
+
+
+class CookingSessionStore:
+    """
+    In-process cooking sessions with idle-TTL expiry and a size cap.
+
+    Sessions are kept in access order, and every access pushes the expiry
+    back by the same TTL, so expired sessions are always at the front and
+    are dropped there as new sessions start. Past ``max_sessions`` the least
+    recently used session is evicted. Sessions live in the worker that
+    created them.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl: float = 7200.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.clock = clock
+        self.expired = 0
+        self.evicted = 0
+        self._sessions: "OrderedDict[str, CookingSession]" = OrderedDict()
+
+    def create(self, user_id: str, recipe_id: str, title: str, servings: Optional[int],
+               ingredients: List[Dict[str, Any]], steps: List[str]) -> CookingSession:
+        now = self.clock()
+        self._prune(now)
+        session = CookingSession(
+            secrets.token_urlsafe(12), user_id, recipe_id, title, servings, ingredients, steps)
+        session.expires_at = now + self.ttl
+        self._sessions[session.id] = session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+        return session
+
+    def get(self, session_id: str, user_id: str) -> Optional[CookingSession]:
+        """The user's session, with its expiry refreshed; None if unknown, expired or not theirs."""
+        session = self._sessions.get(session_id)
+        if session is None or session.user_id != user_id:
+            return None
+        now = self.clock()
+        if session.expires_at <= now:
+            del self._sessions[session_id]
+            self.expired += 1
+            return None
+        session.expires_at = now + self.ttl
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id: str, user_id: str) -> bool:
+        session = self._sessions.get(session_id)
+        if session is None or session.user_id != user_id:
+            return False
+        del self._sessions[session_id]
+        return True
+
+    def _prune(self, now: float) -> None:
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.expires_at > now:
+                return
+            del self._sessions[oldest.id]
+            self.expired += 1
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+cooking_sessions = CookingSessionStore(max_sessions=COOK_SESSION_MAX, ttl=COOK_SESSION_TTL_SECONDS)
+
+registry.register_collector(lambda: [
+    ("cook_sessions", "Cooking sessions held in this worker.", "gauge", [({}, len(cooking_sessions))]),
+    ("cook_sessions_expired_total", "Cooking sessions dropped after sitting idle.", "counter",
+     [({}, cooking_sessions.expired)]),
+    ("cook_sessions_evicted_total", "Active cooking sessions evicted at the size cap.", "counter",
+     [({}, cooking_sessions.evicted)]),
+])
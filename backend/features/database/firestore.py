@@ -1,54 +1,212 @@
+import asyncio
+import logging
 import os
-from typing import Dict, Any, Optional
-from datetime import datetime
+import time
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
-import firebase_admin
-from firebase_admin import firestore
+from features.database.timestamps import to_datetime
+from features.observability.metrics import track
+from features.services.container import services
 
-# Initialize Firestore Admin client
-# This uses the same Firebase Admin app initialized in auth.firebase
-if not firebase_admin._apps:
-    firebase_admin.initialize_app(options={
-        'projectId': os.getenv('FIREBASE_PROJECT_ID', 'chefmate-ai-fac55')
-    })
+logger = logging.getLogger(__name__)
 
-db = firestore.client()
+RECIPES_COLLECTION = "recipes"
+PLANS_COLLECTION = "meal_plans"
 
+FIRESTORE_MAX_CONCURRENCY = int(os.getenv("FIRESTORE_MAX_CONCURRENCY", "64"))
+FIRESTORE_SLOW_OP_MS = float(os.getenv("FIRESTORE_SLOW_OP_MS", "500"))
 
-def save_recipe(recipe_data: Dict[str, Any], user_id: str) -> str:
+# Firestore's limit on writes per batch commit
+MAX_BATCH_WRITES = 500
+
+
+
+class ConcurrentModificationError(Exception):
+    """A conditional write lost a race with another writer."""
+
+
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_db():
+    """
+    Return the process-wide async Firestore client, creating it on first use.
+
+    With ``FIRESTORE_BACKEND=memory`` an in-memory fake is returned instead.
+    """
+    return services.firestore_client()
+
+
+async def close_db() -> None:
+    """Close the Firestore client (called from the app lifespan)."""
+    await services.close()
+
+
+def _server_timestamp() -> Any:
+    return services.firestore().SERVER_TIMESTAMP
+
+
+@asynccontextmanager
+async def _operation(name: str, kind: str = "read"):
+    """
+    Bound in-flight Firestore calls and record the latency of ``name``.
+
+    The semaphore caps concurrent RPCs per worker at
+    ``FIRESTORE_MAX_CONCURRENCY`` so a burst of requests queues here rather
+    than flooding the gRPC channel. Latency is recorded (excluding the queue
+    wait) under the ``firestore_read`` or ``firestore_write`` dependency.
+    """
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(FIRESTORE_MAX_CONCURRENCY)
+
+    async with _semaphore:
+        started = time.perf_counter()
+        try:
+            async with track(f"firestore_{kind}", name):
+                yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms >= FIRESTORE_SLOW_OP_MS:
+                logger.warning(f"Slow Firestore operation {name}: {elapsed_ms:.1f}ms")
+
+
+async def save_recipe(recipe_data: Dict[str, Any], user_id: str) -> Tuple[str, datetime]:
     """
     Save a recipe to Firestore.
-    
+
     Args:
         recipe_data: Recipe data dictionary
         user_id: User ID from Firebase auth
-        
+
     Returns:
-        Document ID of the saved recipe
+        Tuple of (document ID, creation time). The creation time is the
+        write's commit time, which is the value SERVER_TIMESTAMP resolves
+        to, so callers never need to read the document back.
     """
     # Add user ID and timestamp
     recipe_data['userId'] = user_id
-    recipe_data['createdAt'] = firestore.SERVER_TIMESTAMP
-    
+    recipe_data['createdAt'] = _server_timestamp()
+
     # Add to recipes collection
-    # add() returns a tuple: (write_result, document_reference)
-    _, doc_ref = db.collection('recipes').add(recipe_data)
-    return doc_ref.id
+    # add() returns a tuple: (update_time, document_reference)
+    async with _operation("save_recipe", "write"):
+        update_time, doc_ref = await get_db().collection(RECIPES_COLLECTION).add(recipe_data)
+    return doc_ref.id, to_datetime(update_time)
 
 
-def get_recipe(recipe_id: str) -> Optional[Dict[str, Any]]:
+async def save_recipe_once(
+    recipe_data: Dict[str, Any], user_id: str, recipe_id: str
+) -> Tuple[Dict[str, Any], datetime, bool]:
+    """
+    Save a recipe under a deterministic ID unless that document already exists.
+
+    The existing document is read first, so a duplicate costs one read and
+    no write. A concurrent create of the same ID is caught by create()'s
+    existence precondition and resolved to the winner's document.
+
+    Args:
+        recipe_data: Recipe data dictionary
+        user_id: User ID from Firebase auth
+        recipe_id: Deterministic document ID (see recipes.fingerprint)
+
+    Returns:
+        Tuple of (recipe data, creation time, created): created is False when
+        the recipe already existed and its stored data is returned instead
+    """
+    doc_ref = get_db().collection(RECIPES_COLLECTION).document(recipe_id)
+    async with _operation("get_recipe"):
+        doc = await doc_ref.get()
+    if doc.exists:
+        existing = doc.to_dict()
+        return existing, to_datetime(existing.get('createdAt')), False
+
+    recipe_data['userId'] = user_id
+    recipe_data['createdAt'] = _server_timestamp()
+    try:
+        async with _operation("save_recipe", "write"):
+            write_result = await doc_ref.create(recipe_data)
+    except services.api_exceptions().AlreadyExists:
+        async with _operation("get_recipe"):
+            doc = await doc_ref.get()
+        existing = doc.to_dict()
+        return existing, to_datetime(existing.get('createdAt')), False
+    return recipe_data, to_datetime(write_result.update_time), True
+
+
+async def save_recipes(
+    recipes: List[Dict[str, Any]],
+    recipe_ids: Optional[List[str]] = None,
+) -> Tuple[List[Tuple[int, str]], List[Tuple[int, str]]]:
+    """
+    Save many recipes using batched writes.
+
+    Recipes are written in WriteBatch chunks of up to 500 (Firestore's
+    per-commit limit). Each chunk commits atomically, so a failed commit
+    fails exactly the recipes in that chunk.
+
+    Args:
+        recipes: Recipe data dictionaries, each already carrying its userId
+        recipe_ids: Deterministic document IDs, one per recipe. They are
+            created (not overwritten), so a chunk fails if any of its IDs
+            already exists; check with get_recipes first. None generates IDs.
+
+    Returns:
+        Tuple of (created, failed): created is a list of (position, document ID),
+        failed is a list of (position, error message)
+    """
+    db = get_db()
+    collection = db.collection(RECIPES_COLLECTION)
+
+    async def commit_chunk(offset: int, chunk: List[Dict[str, Any]]):
+        batch = db.batch()
+        doc_ids = []
+        for i, recipe_data in enumerate(chunk):
+            recipe_data['createdAt'] = _server_timestamp()
+            if recipe_ids is None:
+                doc_ref = collection.document()
+                batch.set(doc_ref, recipe_data)
+            else:
+                doc_ref = collection.document(recipe_ids[offset + i])
+                batch.create(doc_ref, recipe_data)
+            doc_ids.append(doc_ref.id)
+        try:
+            async with _operation("save_recipes_batch", "write"):
+                await batch.commit()
+        except Exception as e:
+            logger.error(f"Recipe batch commit failed at offset {offset}: {e}")
+            return [], [(offset + i, f"Failed to save recipe: {str(e)}") for i in range(len(chunk))]
+        return [(offset + i, doc_id) for i, doc_id in enumerate(doc_ids)], []
+
+    results = await asyncio.gather(*(
+        commit_chunk(offset, recipes[offset:offset + MAX_BATCH_WRITES])
+        for offset in range(0, len(recipes), MAX_BATCH_WRITES)
+    ))
+
+    created: List[Tuple[int, str]] = []
+    failed: List[Tuple[int, str]] = []
+    for chunk_created, chunk_failed in results:
+        created.extend(chunk_created)
+        failed.extend(chunk_failed)
+    return created, failed
+
+
+async def get_recipe(recipe_id: str) -> Optional[Dict[str, Any]]:
     """
     Get a recipe by ID.
-    
+
     Args:
         recipe_id: Recipe document ID
-        
+
     Returns:
         Recipe data dictionary or None if not found
     """
-    doc_ref = db.collection('recipes').document(recipe_id)
-    doc = doc_ref.get()
-    
+    doc_ref = get_db().collection(RECIPES_COLLECTION).document(recipe_id)
+    async with _operation("get_recipe"):
+        doc = await doc_ref.get()
+
     if doc.exists:
         data = doc.to_dict()
         data['id'] = doc.id
@@ -56,23 +214,233 @@ def get_recipe(recipe_id: str) -> Optional[Dict[str, Any]]:
     return None
 
 
-def get_user_recipes(user_id: str) -> list[Dict[str, Any]]:
+async def get_recipes(recipe_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Get several recipes in one batched read.
+
+    Args:
+        recipe_ids: Recipe document IDs; duplicates are fetched once
+
+    Returns:
+        Dictionary of recipe ID to recipe data, without the IDs that don't exist
+    """
+    if not recipe_ids:
+        return {}
+
+    db = get_db()
+    recipes_ref = db.collection(RECIPES_COLLECTION)
+    doc_refs = [recipes_ref.document(recipe_id) for recipe_id in dict.fromkeys(recipe_ids)]
+
+    recipes = {}
+    async with _operation("get_recipes"):
+        async for doc in db.get_all(doc_refs):
+            if doc.exists:
+                data = doc.to_dict()
+                data['id'] = doc.id
+                recipes[doc.id] = data
+    return recipes
+
+
+async def get_user_recipes(user_id: str) -> list[Dict[str, Any]]:
     """
     Get all recipes for a user.
-    
+
     Args:
         user_id: User ID from Firebase auth
-        
+
     Returns:
         List of recipe dictionaries
     """
-    recipes_ref = db.collection('recipes').where('userId', '==', user_id)
-    docs = recipes_ref.stream()
-    
+    recipes_ref = get_db().collection(RECIPES_COLLECTION).where('userId', '==', user_id)
+
     recipes = []
-    for doc in docs:
-        data = doc.to_dict()
-        data['id'] = doc.id
-        recipes.append(data)
-    
+    async with _operation("get_user_recipes"):
+        async for doc in recipes_ref.stream():
+            data = doc.to_dict()
+            data['id'] = doc.id
+            recipes.append(data)
+
+    return recipes
+
+
+async def list_user_recipes(
+    user_id: str,
+    limit: int,
+    fields: Optional[List[str]] = None,
+    start_after: Optional[Tuple[datetime, str]] = None,
+) -> List[Tuple[Dict[str, Any], Any]]:
+    """
+    Get one page of a user's recipes, newest first.
+
+    Pages are ordered by (createdAt, document ID) descending, so the cursor
+    of the last recipe on a page is stable even when timestamps collide.
+    Needs a composite index on userId ASC, createdAt DESC, __name__ DESC.
+
+    Args:
+        user_id: User ID from Firebase auth
+        limit: Maximum number of recipes to return
+        fields: Field projection; None returns full documents
+        start_after: (createdAt, document ID) cursor of the previous page's last recipe
+
+    Returns:
+        List of (recipe dictionary, document update_time) pairs
+    """
+    recipes_ref = get_db().collection(RECIPES_COLLECTION)
+    query = (
+        recipes_ref
+        .where('userId', '==', user_id)
+        .order_by('createdAt', direction=services.firestore().Query.DESCENDING)
+        .order_by('__name__', direction=services.firestore().Query.DESCENDING)
+    )
+    if fields is not None:
+        query = query.select(fields)
+    if start_after is not None:
+        created_at, doc_id = start_after
+        query = query.start_after({'createdAt': created_at, '__name__': recipes_ref.document(doc_id)})
+    query = query.limit(limit)
+
+    recipes = []
+    async with _operation("list_user_recipes"):
+        async for doc in query.stream():
+            data = doc.to_dict()
+            data['id'] = doc.id
+            recipes.append((data, doc.update_time))
     return recipes
+
+
+def array_union(values: List[Any]) -> Any:
+    """Field transform that appends ``values`` to an array field server-side."""
+    return services.firestore().ArrayUnion(values)
+
+
+def plan_doc_id(user_id: str, week_start: date) -> str:
+    """Deterministic plan document ID: one document per user and week."""
+    return f"{user_id}_{week_start.isoformat()}"
+
+
+def _plan_ref(user_id: str, week_start: date):
+    return get_db().collection(PLANS_COLLECTION).document(plan_doc_id(user_id, week_start))
+
+
+async def get_plan(user_id: str, week_start: date) -> Optional[Tuple[Dict[str, Any], Any]]:
+    """
+    Get a user's plan for one week.
+
+    Args:
+        user_id: User ID from Firebase auth
+        week_start: Monday of the week
+
+    Returns:
+        Tuple of (plan data dictionary, document update_time), or None if there is no plan
+    """
+    async with _operation("get_plan"):
+        doc = await _plan_ref(user_id, week_start).get()
+    if not doc.exists:
+        return None
+    return doc.to_dict(), doc.update_time
+
+
+async def replace_plan(
+    user_id: str,
+    week_start: date,
+    build: Callable[[Optional[Tuple[Dict[str, Any], Any]]], Dict[str, Any]],
+) -> Tuple[Dict[str, Any], Any]:
+    """
+    Replace a user's plan for one week with one derived from the current plan.
+
+    The read and the write run in one transaction: ``build`` gets what
+    get_plan would return (None if there is no plan) and returns the new
+    plan data, and if another save commits in between, Firestore retries
+    with the newer plan, so concurrent saves can't drop each other's
+    history entries.
+
+    Args:
+        user_id: User ID from Firebase auth
+        week_start: Monday of the week
+        build: Called with the current plan, possibly more than once;
+            the returned data keeps its createdAt if it has one
+
+    Raises:
+        ConcurrentModificationError: the plan kept changing and the transaction gave up
+
+    Returns:
+        Tuple of (the plan data written, the document update_time, which serves
+        as the plan's revision)
+    """
+    firestore = services.firestore()
+    plan_ref = _plan_ref(user_id, week_start)
+
+    @firestore.async_transactional
+    async def replace(transaction):
+        snapshot = await plan_ref.get(transaction=transaction)
+        plan_data = build((snapshot.to_dict(), snapshot.update_time) if snapshot.exists else None)
+        plan_data['userId'] = user_id
+        plan_data['weekStartDate'] = week_start.isoformat()
+        plan_data.setdefault('createdAt', _server_timestamp())
+        plan_data['updatedAt'] = _server_timestamp()
+        transaction.set(plan_ref, plan_data)
+        return plan_data
+
+    transaction = get_db().transaction()
+    try:
+        async with _operation("save_plan", "write"):
+            plan_data = await replace(transaction)
+    except ValueError as e:
+        # Raised once every attempt was aborted by a concurrent write
+        if isinstance(e.__cause__, services.api_exceptions().Aborted):
+            raise ConcurrentModificationError(str(e))
+        raise
+    return plan_data, transaction.write_results[0].update_time
+
+
+async def create_plan(plan_data: Dict[str, Any], user_id: str, week_start: date) -> Any:
+    """
+    Create a user's plan for one week, failing if it already exists.
+
+    Raises:
+        ConcurrentModificationError: another request created the plan first
+
+    Returns:
+        The document update_time
+    """
+    plan_data['userId'] = user_id
+    plan_data['weekStartDate'] = week_start.isoformat()
+    plan_data['createdAt'] = _server_timestamp()
+    plan_data['updatedAt'] = _server_timestamp()
+
+    try:
+        async with _operation("create_plan", "write"):
+            write_result = await _plan_ref(user_id, week_start).create(plan_data)
+    except services.api_exceptions().AlreadyExists as e:
+        raise ConcurrentModificationError(str(e))
+    return write_result.update_time
+
+
+async def update_plan_fields(
+    user_id: str,
+    week_start: date,
+    field_updates: Dict[str, Any],
+    last_update_time: Any,
+) -> Any:
+    """
+    Apply field-path updates (e.g. ``days.tuesday.dinner``) to a week's plan.
+
+    The write only succeeds if the document is unchanged since it was read
+    at ``last_update_time`` (optimistic concurrency).
+
+    Raises:
+        ConcurrentModificationError: the plan changed or was deleted since it was read
+
+    Returns:
+        The new document update_time
+    """
+    field_updates = dict(field_updates)
+    field_updates['updatedAt'] = _server_timestamp()
+    option = get_db().write_option(last_update_time=last_update_time)
+
+    try:
+        async with _operation("update_plan", "write"):
+            write_result = await _plan_ref(user_id, week_start).update(field_updates, option=option)
+    except (services.api_exceptions().FailedPrecondition, services.api_exceptions().NotFound) as e:
+        raise ConcurrentModificationError(str(e))
+    return write_result.update_time
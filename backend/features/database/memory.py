@@ -0,0 +1,383 @@
+"""
+In-memory stand-in for the async Firestore client.
+
+Implements the subset of the ``google.cloud.firestore.AsyncClient`` surface
+that the data layer uses (collections, documents, simple queries, batched
+writes, transactions, add/get/get_all/set/create/update/delete/stream,
+ArrayUnion and last-update-time preconditions), so the backend can run without Firestore or the
+emulator. Selected with ``FIRESTORE_BACKEND=memory``. Data lives only as long
+as the process.
+"""
+import copy
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+from firebase_admin import firestore
+from google.api_core import exceptions as google_exceptions
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _resolve_transforms(data: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Replace server-side sentinels (e.g. SERVER_TIMESTAMP) with values."""
+    resolved = {}
+    for key, value in data.items():
+        if value is firestore.SERVER_TIMESTAMP:
+            resolved[key] = now
+        elif isinstance(value, dict):
+            resolved[key] = _resolve_transforms(value, now)
+        else:
+            resolved[key] = copy.deepcopy(value)
+    return resolved
+
+
+class MemoryDocumentSnapshot:
+    def __init__(self, reference: "MemoryDocumentReference", data: Optional[Dict[str, Any]],
+                 create_time: Optional[datetime] = None, update_time: Optional[datetime] = None):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self.create_time = create_time
+        self.update_time = update_time
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field_path: str) -> Any:
+        value: Any = self._data
+        for part in field_path.split("."):
+            value = value[part]
+        return value
+
+
+class MemoryDocumentReference:
+    def __init__(self, store: "InMemoryFirestore", collection_id: str, document_id: str):
+        self._store = store
+        self.id = document_id
+        self.path = f"{collection_id}/{document_id}"
+        self._collection_id = collection_id
+
+    @property
+    def _docs(self) -> Dict[str, Dict[str, Any]]:
+        return self._store._collections.setdefault(self._collection_id, {})
+
+    def _snapshot(self) -> MemoryDocumentSnapshot:
+        entry = self._docs.get(self.id)
+        if entry is None:
+            return MemoryDocumentSnapshot(self, None)
+        return MemoryDocumentSnapshot(self, entry["data"], entry["create_time"], entry["update_time"])
+
+    async def get(self, field_paths=None, transaction=None) -> MemoryDocumentSnapshot:
+        snapshot = self._snapshot()
+        if transaction is not None:
+            transaction._record_read(snapshot)
+        return snapshot
+
+    async def set(self, document_data: Dict[str, Any], merge: bool = False) -> Any:
+        now = _now()
+        data = _resolve_transforms(document_data, now)
+        entry = self._docs.get(self.id)
+        if entry is not None and merge:
+            entry["data"].update(data)
+            entry["update_time"] = now
+        else:
+            create_time = entry["create_time"] if entry is not None else now
+            self._docs[self.id] = {"data": data, "create_time": create_time, "update_time": now}
+        return _WriteResult(now)
+
+    async def create(self, document_data: Dict[str, Any]) -> Any:
+        if self.id in self._docs:
+            raise google_exceptions.AlreadyExists(f"Document already exists: {self.path}")
+        return await self.set(document_data)
+
+    async def update(self, field_updates: Dict[str, Any], option: Optional["_WriteOption"] = None) -> Any:
+        entry = self._docs.get(self.id)
+        if entry is None:
+            raise google_exceptions.NotFound(f"No document to update: {self.path}")
+        if option is not None and option.last_update_time != entry["update_time"]:
+            raise google_exceptions.FailedPrecondition(f"Document changed since last read: {self.path}")
+
+        now = _now()
+        for field_path, value in _resolve_transforms(field_updates, now).items():
+            target = entry["data"]
+            parts = field_path.split(".")
+            for part in parts[:-1]:
+                if not isinstance(target.get(part), dict):
+                    target[part] = {}
+                target = target[part]
+            if isinstance(value, firestore.ArrayUnion):
+                current = target.get(parts[-1])
+                current = list(current) if isinstance(current, list) else []
+                value = current + [v for v in value.values if v not in current]
+            target[parts[-1]] = value
+        entry["update_time"] = now
+        return _WriteResult(now)
+
+    async def delete(self) -> None:
+        self._docs.pop(self.id, None)
+
+
+class _WriteResult:
+    def __init__(self, update_time: datetime):
+        self.update_time = update_time
+
+
+class _WriteOption:
+    def __init__(self, last_update_time: datetime):
+        self.last_update_time = last_update_time
+
+
+_OPERATORS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a is not None and a < b,
+    "<=": lambda a, b: a is not None and a <= b,
+    ">": lambda a, b: a is not None and a > b,
+    ">=": lambda a, b: a is not None and a >= b,
+    "in": lambda a, b: a in b,
+    "array_contains": lambda a, b: isinstance(a, list) and b in a,
+}
+
+
+def _sort_key(snapshot: MemoryDocumentSnapshot, field: str) -> Tuple[bool, Any]:
+    # Missing values sort first, like nulls do in Firestore
+    value = snapshot.id if field == "__name__" else snapshot._data.get(field)
+    return value is not None, value
+
+
+def _cursor_value(value: Any) -> Any:
+    # Cursors may reference documents by DocumentReference or by ID
+    return value.id if isinstance(value, MemoryDocumentReference) else value
+
+
+class MemoryQuery:
+    def __init__(self, store: "InMemoryFirestore", collection_id: str,
+                 filters: Tuple = (), orders: Tuple = (), limit_to: Optional[int] = None,
+                 projection: Optional[Tuple[str, ...]] = None, start_after_values: Optional[Tuple] = None):
+        self._store = store
+        self._collection_id = collection_id
+        self._filters = filters
+        self._orders = orders
+        self._limit = limit_to
+        self._projection = projection
+        self._start_after = start_after_values
+
+    def _copy(self, **changes) -> "MemoryQuery":
+        params = {
+            "filters": self._filters,
+            "orders": self._orders,
+            "limit_to": self._limit,
+            "projection": self._projection,
+            "start_after_values": self._start_after,
+        }
+        params.update(changes)
+        return MemoryQuery(self._store, self._collection_id, **params)
+
+    def where(self, field_path: str, op_string: str, value: Any) -> "MemoryQuery":
+        op = op_string.replace("-", "_")
+        if op not in _OPERATORS:
+            raise ValueError(f"Unsupported operator: {op_string}")
+        return self._copy(filters=self._filters + ((field_path, op, value),))
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> "MemoryQuery":
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count: int) -> "MemoryQuery":
+        return self._copy(limit_to=count)
+
+    def select(self, field_paths) -> "MemoryQuery":
+        return self._copy(projection=tuple(field_paths))
+
+    def start_after(self, document_fields) -> "MemoryQuery":
+        """Accepts a dict keyed by the order_by fields, or a list in order_by order."""
+        if isinstance(document_fields, dict):
+            values = tuple(_cursor_value(document_fields[field]) for field, _ in self._orders)
+        else:
+            values = tuple(_cursor_value(value) for value in document_fields)
+        return self._copy(start_after_values=values)
+
+    def _is_after_cursor(self, snapshot: MemoryDocumentSnapshot) -> bool:
+        for (field, direction), cursor in zip(self._orders, self._start_after):
+            value = _sort_key(snapshot, field)
+            cursor_key = (cursor is not None, cursor)
+            if value == cursor_key:
+                continue
+            if direction == "DESCENDING":
+                return value < cursor_key
+            return value > cursor_key
+        return False
+
+    def _matches(self) -> List[MemoryDocumentSnapshot]:
+        docs = self._store._collections.get(self._collection_id, {})
+        snapshots = []
+        for doc_id in list(docs):
+            snapshot = MemoryDocumentReference(self._store, self._collection_id, doc_id)._snapshot()
+            data = snapshot._data
+            if all(_OPERATORS[op](data.get(field), value) for field, op, value in self._filters):
+                snapshots.append(snapshot)
+
+        # Apply orderings last-to-first so the first one takes precedence
+        for field, direction in reversed(self._orders):
+            snapshots.sort(
+                key=lambda s, field=field: _sort_key(s, field),
+                reverse=direction == "DESCENDING",
+            )
+        if self._start_after is not None:
+            snapshots = [s for s in snapshots if self._is_after_cursor(s)]
+        if self._limit is not None:
+            snapshots = snapshots[:self._limit]
+        if self._projection is not None:
+            snapshots = [
+                MemoryDocumentSnapshot(
+                    s.reference,
+                    {field: s._data[field] for field in self._projection if field in s._data},
+                    s.create_time,
+                    s.update_time,
+                )
+                for s in snapshots
+            ]
+        return snapshots
+
+    async def stream(self, transaction=None):
+        for snapshot in self._matches():
+            yield snapshot
+
+    async def get(self, transaction=None) -> List[MemoryDocumentSnapshot]:
+        return self._matches()
+
+
+class MemoryCollectionReference(MemoryQuery):
+    def __init__(self, store: "InMemoryFirestore", collection_id: str):
+        super().__init__(store, collection_id)
+        self.id = collection_id
+
+    def document(self, document_id: Optional[str] = None) -> MemoryDocumentReference:
+        return MemoryDocumentReference(self._store, self._collection_id, document_id or uuid.uuid4().hex[:20])
+
+    async def add(self, document_data: Dict[str, Any], document_id: Optional[str] = None):
+        doc_ref = self.document(document_id)
+        write_result = await doc_ref.set(document_data)
+        return write_result.update_time, doc_ref
+
+
+class MemoryWriteBatch:
+    """Queues writes and applies them together on commit."""
+
+    def __init__(self):
+        self._writes: List[Tuple[str, MemoryDocumentReference, Dict[str, Any]]] = []
+
+    def set(self, reference: MemoryDocumentReference, document_data: Dict[str, Any], merge: bool = False):
+        self._writes.append(("set_merge" if merge else "set", reference, document_data))
+
+    def create(self, reference: MemoryDocumentReference, document_data: Dict[str, Any]):
+        self._writes.append(("create", reference, document_data))
+
+    def delete(self, reference: MemoryDocumentReference):
+        self._writes.append(("delete", reference, {}))
+
+    async def commit(self) -> List[_WriteResult]:
+        # All-or-nothing, like Firestore: check create preconditions up front
+        for kind, reference, _ in self._writes:
+            if kind == "create" and reference.id in reference._docs:
+                raise google_exceptions.AlreadyExists(f"Document already exists: {reference.path}")
+
+        results = []
+        for kind, reference, data in self._writes:
+            if kind == "create":
+                results.append(await reference.set(data))
+            elif kind == "delete":
+                await reference.delete()
+                results.append(_WriteResult(_now()))
+            else:
+                results.append(await reference.set(data, merge=kind == "set_merge"))
+        self._writes = []
+        return results
+
+
+class MemoryTransaction:
+    """
+    Optimistic transaction, driven by ``firestore.async_transactional``.
+
+    Implements the hooks the decorator calls (``_begin``, ``_commit``,
+    ``_rollback``, ``_clean_up``). Reads made with ``transaction=`` remember
+    the document's update time, and commit aborts (so the decorator retries)
+    if any of them changed since, as Firestore does for contended documents.
+    """
+
+    def __init__(self, max_attempts: int = 5, read_only: bool = False):
+        self._max_attempts = max_attempts
+        self._read_only = read_only
+        self._id: Optional[bytes] = None
+        self._reads: Dict[str, Tuple[MemoryDocumentReference, Optional[datetime]]] = {}
+        self._batch = MemoryWriteBatch()
+        self.write_results: Optional[List[_WriteResult]] = None
+
+    @property
+    def in_progress(self) -> bool:
+        return self._id is not None
+
+    def _record_read(self, snapshot: MemoryDocumentSnapshot) -> None:
+        self._reads.setdefault(snapshot.reference.path, (snapshot.reference, snapshot.update_time))
+
+    def set(self, reference: MemoryDocumentReference, document_data: Dict[str, Any], merge: bool = False):
+        self._batch.set(reference, document_data, merge=merge)
+
+    def create(self, reference: MemoryDocumentReference, document_data: Dict[str, Any]):
+        self._batch.create(reference, document_data)
+
+    def delete(self, reference: MemoryDocumentReference):
+        self._batch.delete(reference)
+
+    def _clean_up(self) -> None:
+        self._id = None
+        self._reads = {}
+        self._batch = MemoryWriteBatch()
+
+    async def _begin(self, retry_id: Optional[bytes] = None) -> None:
+        self._id = uuid.uuid4().bytes
+
+    async def _commit(self) -> List[_WriteResult]:
+        for reference, update_time in self._reads.values():
+            entry = reference._docs.get(reference.id)
+            if (entry["update_time"] if entry is not None else None) != update_time:
+                raise google_exceptions.Aborted(f"Document changed during the transaction: {reference.path}")
+        self.write_results = await self._batch.commit()
+        self._clean_up()
+        return self.write_results
+
+    async def _rollback(self) -> None:
+        self._clean_up()
+
+
+class InMemoryFirestore:
+    """Process-local fake of the async Firestore client."""
+
+    def __init__(self):
+        self._collections: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def collection(self, collection_id: str) -> MemoryCollectionReference:
+        return MemoryCollectionReference(self, collection_id)
+
+    @staticmethod
+    def write_option(last_update_time: datetime) -> _WriteOption:
+        return _WriteOption(last_update_time)
+
+    def batch(self) -> MemoryWriteBatch:
+        return MemoryWriteBatch()
+
+    def transaction(self, max_attempts: int = 5, read_only: bool = False) -> MemoryTransaction:
+        return MemoryTransaction(max_attempts=max_attempts, read_only=read_only)
+
+    async def get_all(self, references, field_paths=None, transaction=None):
+        for reference in references:
+            yield reference._snapshot()
+
+    def close(self) -> None:
+        self._collections.clear()
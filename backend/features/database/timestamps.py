@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+# Epoch values above this are taken to be milliseconds rather than seconds
+_EPOCH_MS_THRESHOLD = 1e11
+
+
+def to_datetime(value: Any) -> Optional[datetime]:
+    """
+    Normalize a Firestore timestamp value to a datetime.
+
+    Accepts Firestore ``Timestamp``/``DatetimeWithNanoseconds`` objects,
+    plain datetimes, ISO 8601 strings and epoch seconds or milliseconds.
+
+    Returns:
+        The datetime, or None if the value is missing or unrecognized
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value
+    if hasattr(value, 'ToDatetime'):
+        # protobuf Timestamp
+        return value.ToDatetime(tzinfo=timezone.utc)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        seconds = value / 1000 if value > _EPOCH_MS_THRESHOLD else value
+        try:
+            return datetime.fromtimestamp(seconds, tz=timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            return None
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return None
+
+
+def to_iso(value: Any) -> str:
+    """Normalize a Firestore timestamp value to an ISO string, defaulting to now."""
+    normalized = to_datetime(value)
+    if normalized is None:
+        normalized = datetime.now()
+    return normalized.isoformat()
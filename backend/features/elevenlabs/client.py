@@ -0,0 +1,73 @@
+import logging
+import os
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+ELEVENLABS_API_BASE_URL = os.getenv("ELEVENLABS_API_BASE_URL", "https://api.elevenlabs.io")
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    """HTTP/2 support in httpx needs the optional h2 package."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    timeout = httpx.Timeout(
+        connect=float(os.getenv("ELEVENLABS_CONNECT_TIMEOUT", "3")),
+        read=float(os.getenv("ELEVENLABS_READ_TIMEOUT", "10")),
+        write=float(os.getenv("ELEVENLABS_WRITE_TIMEOUT", "5")),
+        pool=float(os.getenv("ELEVENLABS_POOL_TIMEOUT", "2")),
+    )
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("ELEVENLABS_MAX_CONNECTIONS", "50")),
+        max_keepalive_connections=int(os.getenv("ELEVENLABS_MAX_KEEPALIVE", "20")),
+        keepalive_expiry=float(os.getenv("ELEVENLABS_KEEPALIVE_EXPIRY", "60")),
+    )
+    http2 = _http2_available()
+    if not http2:
+        logger.warning("h2 not installed, ElevenLabs client falling back to HTTP/1.1")
+
+    return httpx.AsyncClient(
+        base_url=ELEVENLABS_API_BASE_URL,
+        timeout=timeout,
+        limits=limits,
+        http2=http2,
+    )
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Create the app-lifetime ElevenLabs client (called from the app lifespan)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared pooled client.
+
+    Falls back to creating it on first use so the router still works when the
+    app is driven without its lifespan (e.g. from a script).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
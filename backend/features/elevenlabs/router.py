@@ -1,128 +1,50 @@
-import os
-import httpx
-
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
 
 from features.auth.firebase import get_current_user
+from features.elevenlabs.service import token_service
+from features.elevenlabs.token_pool import token_pool
+from features.observability.router import verify_debug_endpoint_key
+from features.ratelimit.limiter import RateLimit
 
 router = APIRouter(prefix="/elevenlabs", tags=["ElevenLabs"])
 
+# Every call can mint an upstream token, so keep this tight
+rate_limit = RateLimit.from_env("elevenlabs", per_minute=20, burst=5)
 
-@router.get("/conversation-token")
-async def get_conversation_token(user: dict = Depends(get_current_user)):
-    """Get ElevenLabs conversation token for authenticated users."""
-    api_key = os.getenv("ELEVENLABS_API_KEY")
-    agent_id = os.getenv("ELEVENLABS_DISCOVER_AGENT_ID")
-    
-    if not api_key:
-        raise HTTPException(
-            status_code=500,
-            detail="ELEVENLABS_API_KEY not configured"
-        )
-    
-    if not agent_id:
-        raise HTTPException(
-            status_code=500,
-            detail="ELEVENLABS_DISCOVER_AGENT_ID not configured"
-        )
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"https://api.elevenlabs.io/v1/convai/conversation/token?agent_id={agent_id}",
-            headers={"xi-api-key": api_key}
-        )
-        
-        if response.status_code != 200:
-            error_detail = f"ElevenLabs API error: {response.status_code}"
-            if response.status_code == 404:
-                error_detail = f"ElevenLabs agent not found. Check ELEVENLABS_DISCOVER_AGENT_ID: {agent_id}"
-            raise HTTPException(
-                status_code=502,  # Return 502 Bad Gateway for upstream errors
-                detail=error_detail
-            )
-        
-        data = response.json()
-        
-        if "token" not in data:
-            raise HTTPException(
-                status_code=502,
-                detail="Invalid response from ElevenLabs: missing token"
-            )
-        
-        return {"token": data["token"]}
+
+async def _conversation_token_response(agent: str) -> dict:
+    """
+    Serve a pre-minted token for ``agent`` from the pool, falling back to
+    minting one on the spot when the pool is empty or disabled.
+    """
+    token = token_pool.take(agent)
+    if token is None:
+        token = await token_service.mint_token(agent)
+    return {"token": token}
 
 
-@router.get("/conversation-token-cook")
+@router.get("/conversation-token", dependencies=[Depends(rate_limit.user)])
 async def get_conversation_token(user: dict = Depends(get_current_user)):
     """Get ElevenLabs conversation token for authenticated users."""
-    api_key = os.getenv("ELEVENLABS_API_KEY")
-    agent_id = os.getenv("ELEVENLABS_COOK_AGENT_ID")
-    
-    if not api_key:
-        raise HTTPException(
-            status_code=500,
-            detail="ELEVENLABS_API_KEY not configured"
-        )
-    
-    if not agent_id:
-        raise HTTPException(
-            status_code=500,
-            detail="ELEVENLABS_COOK_AGENT_ID not configured"
-        )
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"https://api.elevenlabs.io/v1/convai/conversation/token?agent_id={agent_id}",
-            headers={"xi-api-key": api_key}
-        )
-        
-        if response.status_code != 200:
-            error_detail = f"ElevenLabs API error: {response.status_code}"
-            if response.status_code == 404:
-                error_detail = f"ElevenLabs agent not found. Check ELEVENLABS_COOK_AGENT_ID: {agent_id}"
-            raise HTTPException(
-                status_code=502,  # Return 502 Bad Gateway for upstream errors
-                detail=error_detail
-            )
-        
-        data = response.json()
-        
-        if "token" not in data:
-            raise HTTPException(
-                status_code=502,
-                detail="Invalid response from ElevenLabs: missing token"
-            )
-        
-        return {"token": data["token"]}
+    return await _conversation_token_response("discover")
 
 
-@router.get("/conversation-token-planner")
+@router.get("/conversation-token-cook", dependencies=[Depends(rate_limit.user)])
+async def get_conversation_token_cook(user: dict = Depends(get_current_user)):
+    """Get ElevenLabs conversation token for the cook agent."""
+    return await _conversation_token_response("cook")
+
+
+@router.get("/conversation-token-planner", dependencies=[Depends(rate_limit.user)])
 async def get_conversation_token_planner(user: dict = Depends(get_current_user)):
     """Get ElevenLabs conversation token for planner agent."""
-    api_key = os.getenv("ELEVENLABS_API_KEY")
-    agent_id = os.getenv("ELEVENLABS_PLANNER_AGENT_ID")
-    
-    if not api_key:
-        raise HTTPException(status_code=500, detail="ELEVENLABS_API_KEY not configured")
-    
-    if not agent_id:
-        raise HTTPException(
-            status_code=500, 
-            detail="ELEVENLABS_PLANNER_AGENT_ID not configured"
-        )
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"https://api.elevenlabs.io/v1/convai/conversation/token?agent_id={agent_id}",
-            headers={"xi-api-key": api_key}
-        )
-        
-        if response.status_code != 200:
-            logger.error(f"ElevenLabs Error: {response.text}")
-            raise HTTPException(
-                status_code=502,
-                detail=f"ElevenLabs API error: {response.status_code}"
-            )
-        
-        data = response.json()
-        return {"token": data["token"]}
+    return await _conversation_token_response("planner")
+
+
+@router.get("/token-pool/stats", dependencies=[Depends(verify_debug_endpoint_key)])
+async def get_token_pool_stats():
+    """
+    Pool size, hit rate and refill latency for each agent's token pool.
+    Requires the debug-endpoint-key header, like the other debug endpoints.
+    """
+    return token_pool.stats()
@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Dict, Optional
+
+import httpx
+from fastapi import HTTPException
+
+from features.elevenlabs.client import get_http_client
+from features.observability.metrics import track
+
+logger = logging.getLogger(__name__)
+
+# Agent name -> environment variable holding its ElevenLabs agent ID
+AGENT_ENV_VARS = {
+    "discover": "ELEVENLABS_DISCOVER_AGENT_ID",
+    "cook": "ELEVENLABS_COOK_AGENT_ID",
+    "planner": "ELEVENLABS_PLANNER_AGENT_ID",
+}
+
+TOKEN_PATH = "/v1/convai/conversation/token"
+
+# Upstream statuses worth retrying; everything else fails fast
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class UpstreamUnavailableError(HTTPException):
+    """ElevenLabs could not be reached or kept failing after retries."""
+
+    def __init__(self, detail: str):
+        super().__init__(status_code=502, detail=detail)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` failures in a row the circuit opens and calls
+    are rejected for ``reset_timeout`` seconds. The first call after that is
+    let through as a trial: success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        """Give back a half-open trial slot that was never used."""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+
+class ConversationTokenService:
+    """
+    Mints ElevenLabs conversation tokens for any configured agent.
+
+    All agents share the pooled HTTP client. Each agent gets its own
+    concurrency limit and circuit breaker, so one slow or failing agent
+    cannot pile up coroutines or take the others down with it.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 2,
+        backoff_base: float = 0.2,
+        max_concurrency: int = 10,
+        queue_timeout: float = 5.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def _semaphore(self, agent: str) -> asyncio.Semaphore:
+        if agent not in self._semaphores:
+            self._semaphores[agent] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[agent]
+
+    def breaker(self, agent: str) -> CircuitBreaker:
+        if agent not in self._breakers:
+            self._breakers[agent] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return self._breakers[agent]
+
+    @staticmethod
+    def resolve_agent_id(agent: str) -> str:
+        """Look up the agent ID for an agent name, raising 500 if unset."""
+        env_var = AGENT_ENV_VARS[agent]
+        agent_id = os.getenv(env_var)
+        if not agent_id:
+            raise HTTPException(status_code=500, detail=f"{env_var} not configured")
+        return agent_id
+
+    async def mint_token(self, agent: str) -> str:
+        """Fetch a fresh conversation token for ``agent`` from ElevenLabs."""
+        api_key = os.getenv("ELEVENLABS_API_KEY")
+        if not api_key:
+            raise HTTPException(status_code=500, detail="ELEVENLABS_API_KEY not configured")
+        agent_id = self.resolve_agent_id(agent)
+
+        breaker = self.breaker(agent)
+        # Only the call that gets a half-open circuit through holds its trial
+        trial = breaker.state == "half-open"
+        if not breaker.allow_request():
+            raise HTTPException(
+                status_code=503,
+                detail="ElevenLabs temporarily unavailable, please retry shortly"
+            )
+
+        try:
+            semaphore = self._semaphore(agent)
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                # Not an upstream failure, so leave the breaker alone
+                raise HTTPException(status_code=503, detail="Too many pending ElevenLabs requests")
+
+            try:
+                token = await self._request_with_retries(agent, agent_id, api_key)
+            except UpstreamUnavailableError:
+                breaker.record_failure()
+                raise
+            except HTTPException:
+                # ElevenLabs answered (e.g. 404 for a bad agent ID): it is up
+                breaker.record_success()
+                raise
+            finally:
+                semaphore.release()
+        except BaseException:
+            # A queue timeout, a cancellation (client disconnect, token_pool.stop()
+            # mid-refill) or an unexpected error records no outcome; give back the
+            # trial slot so the circuit can't stay stuck half-open
+            if trial:
+                breaker.release_trial()
+            raise
+
+        breaker.record_success()
+        return token
+
+    async def _request_with_retries(self, agent: str, agent_id: str, api_key: str) -> str:
+        client = get_http_client()
+        env_var = AGENT_ENV_VARS[agent]
+
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            try:
+                async with track("elevenlabs", "conversation_token") as call:
+                    response = await client.get(
+                        TOKEN_PATH,
+                        params={"agent_id": agent_id},
+                        headers={"xi-api-key": api_key},
+                    )
+                    if response.status_code != 200:
+                        call.mark_error()
+            except httpx.HTTPError as e:
+                logger.warning(f"ElevenLabs request failed for {agent} agent: {e!r}")
+                if last_attempt:
+                    raise UpstreamUnavailableError("ElevenLabs API unreachable")
+                await self._backoff(attempt)
+                continue
+
+            if response.status_code == 200:
+                data = response.json()
+                if "token" not in data:
+                    raise HTTPException(
+                        status_code=502,
+                        detail="Invalid response from ElevenLabs: missing token"
+                    )
+                return data["token"]
+
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                if not last_attempt:
+                    await self._backoff(attempt)
+                    continue
+                logger.error(f"ElevenLabs Error ({agent}): {response.text}")
+                raise UpstreamUnavailableError(f"ElevenLabs API error: {response.status_code}")
+
+            logger.error(f"ElevenLabs Error ({agent}): {response.text}")
+            error_detail = f"ElevenLabs API error: {response.status_code}"
+            if response.status_code == 404:
+                error_detail = f"ElevenLabs agent not found. Check {env_var}: {agent_id}"
+            raise HTTPException(
+                status_code=502,  # Return 502 Bad Gateway for upstream errors
+                detail=error_detail
+            )
+
+        # Unreachable: the final attempt always returns or raises
+        raise UpstreamUnavailableError("ElevenLabs API error")
+
+    async def _backoff(self, attempt: int) -> None:
+        """Exponential backoff with full jitter."""
+        await asyncio.sleep(random.uniform(0, self.backoff_base * (2 ** attempt)))
+
+
+token_service = ConversationTokenService(
+    max_retries=int(os.getenv("ELEVENLABS_MAX_RETRIES", "2")),
+    backoff_base=float(os.getenv("ELEVENLABS_BACKOFF_BASE", "0.2")),
+    max_concurrency=int(os.getenv("ELEVENLABS_MAX_CONCURRENCY_PER_AGENT", "10")),
+    queue_timeout=float(os.getenv("ELEVENLABS_QUEUE_TIMEOUT", "5")),
+    failure_threshold=int(os.getenv("ELEVENLABS_BREAKER_THRESHOLD", "5")),
+    reset_timeout=float(os.getenv("ELEVENLABS_BREAKER_RESET_SECONDS", "30")),
+)
@@ -0,0 +1,273 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, Any, Optional, Tuple
+
+from features.elevenlabs.service import AGENT_ENV_VARS, ConversationTokenService, token_service
+from features.observability.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class TokenPool:
+    """
+    Pre-minted conversation tokens for a single agent.
+
+    Tokens are kept oldest-first in a deque, so taking one is O(1). Tokens
+    with less than ``min_remaining`` seconds of their ``ttl`` left are
+    discarded instead of being handed out. The target size follows an
+    exponentially weighted estimate of the request rate: enough tokens to
+    cover ``horizon`` seconds of demand, clamped to ``[min_size, max_size]``.
+    """
+
+    def __init__(
+        self,
+        agent: str,
+        min_size: int = 1,
+        max_size: int = 3,
+        ttl: float = 600.0,
+        min_remaining: float = 60.0,
+        horizon: float = 30.0,
+        rate_alpha: float = 0.3,
+    ):
+        self.agent = agent
+        self.min_size = min_size
+        self.max_size = max_size
+        self.ttl = ttl
+        self.min_remaining = min_remaining
+        self.horizon = horizon
+        self.rate_alpha = rate_alpha
+
+        self._tokens: Deque[Tuple[str, float]] = deque()
+        self._requests_since_sample = 0
+        self._last_sample = time.monotonic()
+        self.request_rate = 0.0
+
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+        self.refills = 0
+        self.refill_failures = 0
+        self.last_refill_latency: Optional[float] = None
+        self.avg_refill_latency: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    @property
+    def target_size(self) -> int:
+        wanted = math.ceil(self.request_rate * self.horizon)
+        return max(self.min_size, min(self.max_size, wanted))
+
+    def _is_fresh(self, minted_at: float, now: float) -> bool:
+        return now - minted_at < self.ttl - self.min_remaining
+
+    def take(self) -> Optional[str]:
+        """Pop the oldest still-fresh token, or None on a pool miss."""
+        self._requests_since_sample += 1
+        now = time.monotonic()
+        while self._tokens:
+            token, minted_at = self._tokens.popleft()
+            if self._is_fresh(minted_at, now):
+                self.hits += 1
+                return token
+            self.discarded += 1
+        self.misses += 1
+        return None
+
+    def put(self, token: str, minted_at: float) -> None:
+        self._tokens.append((token, minted_at))
+
+    def purge_stale(self) -> None:
+        """Drop tokens that are too close to expiry to hand out."""
+        now = time.monotonic()
+        while self._tokens and not self._is_fresh(self._tokens[0][1], now):
+            self._tokens.popleft()
+            self.discarded += 1
+
+    def sample_rate(self, min_window: float) -> None:
+        """
+        Fold requests seen since the last sample into the rate estimate, once
+        at least ``min_window`` seconds have passed (short windows are noisy).
+        """
+        now = time.monotonic()
+        elapsed = now - self._last_sample
+        if elapsed < min_window or elapsed <= 0:
+            return
+        observed = self._requests_since_sample / elapsed
+        self.request_rate = self.rate_alpha * observed + (1 - self.rate_alpha) * self.request_rate
+        self._requests_since_sample = 0
+        self._last_sample = now
+
+    def record_refill(self, latency: float) -> None:
+        self.refills += 1
+        self.last_refill_latency = latency
+        if self.avg_refill_latency is None:
+            self.avg_refill_latency = latency
+        else:
+            self.avg_refill_latency = 0.2 * latency + 0.8 * self.avg_refill_latency
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._tokens),
+            "targetSize": self.target_size,
+            "requestRate": round(self.request_rate, 4),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": self.hits / lookups if lookups else 0.0,
+            "discarded": self.discarded,
+            "refills": self.refills,
+            "refillFailures": self.refill_failures,
+            "lastRefillLatency": self.last_refill_latency,
+            "avgRefillLatency": self.avg_refill_latency,
+        }
+
+
+class TokenPoolManager:
+    """
+    Keeps one TokenPool per configured agent topped up from a background task.
+
+    The refill loop wakes whenever a token is taken, and at least every
+    ``refill_interval`` seconds to purge stale tokens and re-sample the
+    request rate. Mint failures back off instead of hammering ElevenLabs;
+    the token service's circuit breaker covers longer outages.
+    """
+
+    def __init__(
+        self,
+        service: ConversationTokenService,
+        min_size: int = 1,
+        max_size: int = 3,
+        ttl: float = 600.0,
+        min_remaining: float = 60.0,
+        horizon: float = 30.0,
+        refill_interval: float = 5.0,
+    ):
+        self.service = service
+        self.min_size = min_size
+        self.max_size = max_size
+        self.ttl = ttl
+        self.min_remaining = min_remaining
+        self.horizon = horizon
+        self.refill_interval = refill_interval
+        self.pools: Dict[str, TokenPool] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._failure_backoff = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def take(self, agent: str) -> Optional[str]:
+        """Serve a pooled token for ``agent`` if one is available."""
+        pool = self.pools.get(agent)
+        if pool is None:
+            return None
+        token = pool.take()
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return token
+
+    async def start(self) -> None:
+        """Create pools for every configured agent and start refilling."""
+        if not self.enabled or self._task is not None:
+            return
+        if not os.getenv("ELEVENLABS_API_KEY"):
+            logger.info("ELEVENLABS_API_KEY not set, token pool disabled")
+            return
+
+        for agent, env_var in AGENT_ENV_VARS.items():
+            if os.getenv(env_var):
+                self.pools[agent] = TokenPool(
+                    agent,
+                    min_size=self.min_size,
+                    max_size=self.max_size,
+                    ttl=self.ttl,
+                    min_remaining=self.min_remaining,
+                    horizon=self.horizon,
+                )
+        if not self.pools:
+            return
+
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._refill_loop())
+        logger.info(f"Token pool started for agents: {', '.join(self.pools)}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.pools.clear()
+        self._wakeup = None
+
+    async def _refill_loop(self) -> None:
+        while True:
+            self._wakeup.clear()
+            for pool in self.pools.values():
+                pool.sample_rate(self.refill_interval)
+                pool.purge_stale()
+                await self._refill(pool)
+
+            if self._failure_backoff:
+                await asyncio.sleep(self._failure_backoff)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _refill(self, pool: TokenPool) -> None:
+        while len(pool) < pool.target_size:
+            started = time.monotonic()
+            try:
+                token = await self.service.mint_token(pool.agent)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                pool.refill_failures += 1
+                self._failure_backoff = min(max(self._failure_backoff * 2, 1.0), 60.0)
+                logger.warning(f"Token pool refill failed for {pool.agent} agent: {e!r}")
+                return
+            # Age the token from when the request was sent, to stay conservative
+            pool.record_refill(time.monotonic() - started)
+            pool.put(token, started)
+            self._failure_backoff = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {agent: pool.stats() for agent, pool in self.pools.items()}
+
+
+token_pool = TokenPoolManager(
+    token_service,
+    min_size=int(os.getenv("ELEVENLABS_TOKEN_POOL_MIN_SIZE", "1")),
+    max_size=int(os.getenv("ELEVENLABS_TOKEN_POOL_MAX_SIZE", "3")),
+    ttl=float(os.getenv("ELEVENLABS_TOKEN_TTL_SECONDS", "600")),
+    min_remaining=float(os.getenv("ELEVENLABS_TOKEN_MIN_REMAINING_SECONDS", "60")),
+    horizon=float(os.getenv("ELEVENLABS_TOKEN_POOL_HORIZON_SECONDS", "30")),
+    refill_interval=float(os.getenv("ELEVENLABS_TOKEN_POOL_REFILL_INTERVAL", "5")),
+)
+
+
+def _pool_metrics():
+    pools = token_pool.pools.items()
+    return [
+        ("elevenlabs_token_pool_size", "Pre-minted conversation tokens ready per agent.", "gauge",
+         [({"agent": agent}, len(pool)) for agent, pool in pools]),
+        ("elevenlabs_token_pool_target_size", "Current refill target per agent.", "gauge",
+         [({"agent": agent}, pool.target_size) for agent, pool in pools]),
+        ("elevenlabs_token_pool_hits_total", "Token requests served from the pool.", "counter",
+         [({"agent": agent}, pool.hits) for agent, pool in pools]),
+        ("elevenlabs_token_pool_misses_total", "Token requests that had to mint inline.", "counter",
+         [({"agent": agent}, pool.misses) for agent, pool in pools]),
+    ]
+
+
+registry.register_collector(_pool_metrics)
@@ -0,0 +1 @@
+# Change events feature module
@@ -0,0 +1,190 @@
+"""
+In-process pub/sub for per-user change events.
+
+Request handlers ``publish`` after a write; each open ``GET /events`` stream
+holds a ``Subscription`` and relays what arrives. Publishing never waits on
+subscribers: an event is encoded once and appended to every subscriber's
+bounded queue. A subscriber that falls a full queue behind loses its oldest
+events and is told to resync (refetch) instead, so a stalled client costs a
+fixed amount of memory and never slows down the writer.
+
+Subscribers only see events published in their own worker; run a single
+worker, or route a user's requests to one worker, for cross-request
+delivery.
+"""
+import asyncio
+import os
+import signal
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from features.observability.metrics import registry
+from features.serialization.responses import dumps
+
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "64"))
+EVENTS_MAX_SUBSCRIBERS_PER_USER = int(os.getenv("EVENTS_MAX_SUBSCRIBERS_PER_USER", "5"))
+
+events_published = registry.counter(
+    "events_published_total", "Change events published, by type.", ("type",))
+events_dropped = registry.counter(
+    "events_dropped_total", "Events dropped from full subscriber queues.")
+
+
+def encode_event(event_type: str, data: Any, event_id: int) -> bytes:
+    """One event in the text/event-stream format."""
+    return f"id: {event_id}\nevent: {event_type}\ndata: ".encode() + dumps(data) + b"\n\n"
+
+
+# Sent to a subscriber in place of the events it missed
+RESYNC = encode_event("resync", {}, 0)
+
+
+class Subscription:
+    """A bounded queue of encoded events for one stream."""
+
+    def __init__(self, hub: "EventHub", user_id: str, max_size: int):
+        self.hub = hub
+        self.user_id = user_id
+        self.closed = False
+        self.lagged = False
+        self._queue: Deque[bytes] = deque(maxlen=max_size)
+        self._ready = asyncio.Event()
+
+    def push(self, payload: bytes) -> None:
+        if len(self._queue) == self._queue.maxlen:
+            # deque(maxlen) drops the oldest; remember to send a resync
+            self.lagged = True
+            events_dropped.inc()
+        self._queue.append(payload)
+        self._ready.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._ready.set()
+
+    async def next(self, timeout: float) -> Optional[bytes]:
+        """
+        The next encoded event, or None if nothing arrived within ``timeout``
+        or the subscription was closed.
+        """
+        if not self._queue and not self.closed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self.lagged:
+            self.lagged = False
+            self._queue.clear()
+            return RESYNC
+        return self._queue.popleft() if self._queue else None
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.hub.unsubscribe(self)
+
+
+class EventHub:
+    """
+    Fans events out to the subscriptions of the user they belong to.
+
+    Each user can hold ``max_subscribers`` streams; opening another closes
+    the oldest, which bounds memory if a client leaks connections.
+    """
+
+    def __init__(self, queue_size: int = 64, max_subscribers: int = 5):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: Dict[str, List[Subscription]] = {}
+        self._next_id = 0
+        self.closed = False
+
+    def start(self) -> None:
+        """Accept subscribers again after ``close`` (a new app lifespan)."""
+        self.closed = False
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscription = Subscription(self, user_id, self.queue_size)
+        if self.closed:
+            # Shutting down: the stream ends right after its ready event
+            subscription.close()
+            return subscription
+        subscribers = self._subscribers.setdefault(user_id, [])
+        subscribers.append(subscription)
+        while len(subscribers) > self.max_subscribers:
+            subscribers.pop(0).close()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is None:
+            return
+        if subscription in subscribers:
+            subscribers.remove(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id: str, event_type: str, data: Any) -> int:
+        """Queue an event for the user's open streams; returns how many there were."""
+        events_published.inc(event_type)
+        subscribers = self._subscribers.get(user_id)
+        if not subscribers:
+            return 0
+        self._next_id += 1
+        payload = encode_event(event_type, data, self._next_id)
+        for subscription in subscribers:
+            subscription.push(payload)
+        return len(subscribers)
+
+    def close(self) -> None:
+        """End every stream, e.g. on shutdown, so open responses finish."""
+        self.closed = True
+        for subscribers in list(self._subscribers.values()):
+            for subscription in subscribers:
+                subscription.close()
+        self._subscribers.clear()
+
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+def close_on_server_exit() -> None:
+    """
+    Close ``event_hub`` as soon as the server is told to exit.
+
+    uvicorn waits for open connections to finish before it runs lifespan
+    shutdown, and an event stream never finishes by itself, so closing the
+    hub from lifespan shutdown would wait forever (or until the graceful
+    shutdown timeout). Instead, the SIGINT/SIGTERM handlers the server has
+    installed by the time lifespan starts are wrapped so they first schedule
+    ``event_hub.close`` on the serving loop (safe from a signal handler),
+    then run as before. Call it from lifespan startup.
+    """
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous = signal.getsignal(sig)
+        if not callable(previous):
+            # Default or ignored: no server handler to chain onto
+            continue
+
+        def handler(signum, frame, previous=previous):
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(event_hub.close)
+            previous(signum, frame)
+
+        try:
+            signal.signal(sig, handler)
+        except ValueError:
+            # Not the main thread (e.g. an in-process test client); nothing to hook
+            return
+
+
+event_hub = EventHub(queue_size=EVENTS_QUEUE_SIZE, max_subscribers=EVENTS_MAX_SUBSCRIBERS_PER_USER)
+
+registry.register_collector(lambda: [
+    ("events_subscribers", "Open event streams in this worker.", "gauge",
+     [({}, event_hub.subscriber_count())]),
+])
@@ -0,0 +1,43 @@
+import os
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from features.auth.firebase import get_current_user
+from features.events.hub import event_hub
+
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+async def _stream(user_id: str):
+    with event_hub.subscribe(user_id) as subscription:
+        # Reconnect delay for EventSource clients, then a marker that the stream is live
+        yield b"retry: 3000\nevent: ready\ndata: {}\n\n"
+        while not subscription.closed:
+            payload = await subscription.next(EVENTS_HEARTBEAT_SECONDS)
+            if payload is None:
+                if subscription.closed:
+                    break
+                # Comment line: keeps proxies from timing out an idle stream
+                # and surfaces dead connections as a failed write
+                yield b": ping\n\n"
+                continue
+            yield payload
+
+
+@router.get("")
+async def stream_events(user: dict = Depends(get_current_user)):
+    """
+    Server-sent events for changes to the user's data.
+
+    Events: ``planner.updated`` (with the saved plan, so clients needn't
+    refetch), ``recipe.created`` and ``recipes.created``. ``resync`` means
+    events were missed and the client should refetch what it shows.
+    """
+    return StreamingResponse(
+        _stream(user["uid"]),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1 @@
+# Observability feature module
@@ -0,0 +1,181 @@
+"""
+Structured access log.
+
+One single-line JSON record per sampled request, carrying the request's
+timing. Records go through a queue to a background thread, which formats
+and writes them, so no log I/O or JSON encoding happens on the event loop.
+Headers are never logged.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, Optional
+
+from features.observability.metrics import registry
+
+ACCESS_LOG_ENABLED = os.getenv("ACCESS_LOG_ENABLED", "true").lower() in ("1", "true", "yes")
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0"))
+ACCESS_LOG_EXCLUDE_PATHS = os.getenv("ACCESS_LOG_EXCLUDE_PATHS", "/health,/metrics")
+# Requests at least this slow are always logged, whatever the sample rate
+ACCESS_LOG_SLOW_MS = float(os.getenv("ACCESS_LOG_SLOW_MS", "1000"))
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records whose ``msg`` is a dict as one line of JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = record.msg if isinstance(record.msg, dict) else {"message": record.getMessage()}
+        return json.dumps(fields, separators=(",", ":"), default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    # The stock QueueHandler formats the record before queueing it; leave
+    # that to the listener thread. Records are built fresh per request and
+    # never mutated afterwards, so handing them over as-is is safe.
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class AccessLog:
+    """
+    Sampling front end and queue-backed writer for the access log.
+
+    ``start`` and ``stop`` run the listener thread for the app's lifetime.
+    ``should_log`` decides per request: excluded paths are skipped, server
+    errors and slow requests are always kept, and the rest is sampled at
+    ``sample_rate``.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        sample_rate: float = 1.0,
+        exclude_paths: FrozenSet[str] = frozenset(),
+        slow_ms: float = 1000.0,
+        stream=None,
+    ):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.exclude_paths = exclude_paths
+        self.slow_ms = slow_ms
+
+        self.logger = logging.getLogger("access")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+
+        self._queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self._handler = logging.StreamHandler(stream or sys.stdout)
+        self._handler.setFormatter(JsonFormatter())
+        self._listener: Optional[logging.handlers.QueueListener] = None
+
+        self.logged = 0
+        self.sampled_out = 0
+
+    def start(self) -> None:
+        if not self.enabled or self._listener is not None:
+            return
+        self.logger.addHandler(_DeferredQueueHandler(self._queue))
+        self._listener = logging.handlers.QueueListener(self._queue, self._handler)
+        self._listener.start()
+
+    def stop(self) -> None:
+        """Flush queued records and stop the listener thread."""
+        if self._listener is None:
+            return
+        self._listener.stop()
+        self._listener = None
+        for handler in list(self.logger.handlers):
+            if isinstance(handler, _DeferredQueueHandler):
+                self.logger.removeHandler(handler)
+
+    def is_excluded(self, path: str) -> bool:
+        return not self.enabled or path in self.exclude_paths
+
+    def should_log(self, status_code: int, duration_ms: float) -> bool:
+        if status_code >= 500 or duration_ms >= self.slow_ms:
+            return True
+        if self.sample_rate >= 1.0 or random.random() < self.sample_rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+    def log(self, record: Dict[str, Any]) -> None:
+        """Queue one access record (a dict of JSON-serializable fields)."""
+        self.logged += 1
+        self.logger.info(record)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "sampleRate": self.sample_rate,
+            "logged": self.logged,
+            "sampledOut": self.sampled_out,
+        }
+
+
+class AccessLogMiddleware:
+    """
+    ASGI middleware that times each HTTP request and hands it to ``access_log``.
+
+    Pure ASGI rather than ``@app.middleware("http")`` so the response body
+    isn't re-wrapped in a streaming response on every request.
+    """
+
+    def __init__(self, app, log: Optional[AccessLog] = None):
+        self.app = app
+        self.log = log
+
+    async def __call__(self, scope, receive, send):
+        # Resolved per call so the module-level access_log can be reconfigured
+        log = self.log or access_log
+        if scope["type"] != "http" or log.is_excluded(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+        response_bytes = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if log.should_log(status_code, duration_ms):
+                client = scope.get("client")
+                log.log({
+                    "ts": datetime.now(timezone.utc).isoformat(),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "durationMs": round(duration_ms, 2),
+                    "bytes": response_bytes,
+                    "client": client[0] if client else None,
+                })
+
+
+access_log = AccessLog(
+    enabled=ACCESS_LOG_ENABLED,
+    sample_rate=ACCESS_LOG_SAMPLE_RATE,
+    exclude_paths=frozenset(p.strip() for p in ACCESS_LOG_EXCLUDE_PATHS.split(",") if p.strip()),
+    slow_ms=ACCESS_LOG_SLOW_MS,
+)
+
+registry.register_collector(lambda: [
+    ("access_log_records_total", "Access log records written.", "counter", [({}, access_log.logged)]),
+    ("access_log_sampled_out_total", "Requests skipped by access log sampling.", "counter",
+     [({}, access_log.sampled_out)]),
+])
@@ -0,0 +1,335 @@
+"""
+Prometheus-style metrics with no client library dependency.
+
+Metrics live in a process-local registry and are rendered in the text
+exposition format by ``GET /metrics``. Recording is a dict lookup plus a
+bisect into the histogram's buckets, cheap enough to leave on everywhere.
+
+Feature modules time their downstream calls with ``track``, which works as
+an async context manager or as a decorator for coroutine functions::
+
+    async with track("firestore_read", "get_plan"):
+        doc = await ref.get()
+
+    @track("elevenlabs", "conversation_token")
+    async def fetch(): ...
+
+Routes are timed by ``MetricsMiddleware`` and event-loop lag is sampled by
+``EventLoopLagMonitor``.
+"""
+import asyncio
+import bisect
+import functools
+import logging
+import math
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+METRICS_LOOP_LAG_INTERVAL_SECONDS = float(os.getenv("METRICS_LOOP_LAG_INTERVAL_SECONDS", "0.5"))
+
+# Seconds; covers token-cache hits (sub-ms) through slow upstream calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Tuple[Any, ...]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return tuple(str(label) for label in labels)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: Any, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *labels: Any, value: float) -> None:
+        self._values[self._key(labels)] = value
+
+    def dec(self, *labels: Any, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (non-cumulative) + overflow, sum, count]
+        self._series: Dict[LabelValues, List[Any]] = {}
+
+    def observe(self, *labels: Any, value: float) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def count(self, *labels: Any) -> int:
+        series = self._series.get(self._key(labels))
+        return series[2] if series else 0
+
+    def samples(self) -> Iterable[str]:
+        for key, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {count}"
+
+
+class MetricsRegistry:
+    """
+    Named metrics plus collectors for values read at scrape time.
+
+    A collector is a callable returning ``(name, documentation, kind,
+    [(labels dict, value), ...])`` tuples; use it for state a feature already
+    tracks (cache sizes, pool depths) instead of mirroring it on every change.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Tuple[Dict[str, Any], float]]]]]] = []
+
+    def _register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        blocks = [metric.render() for metric in self._metrics.values()]
+        for collector in self._collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {collector!r} failed: {e!r}")
+                continue
+            for name, documentation, kind, samples in families:
+                lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+                for labels, value in samples:
+                    names = tuple(labels)
+                    label_str = _format_labels(names, tuple(str(labels[n]) for n in names))
+                    lines.append(f"{name}{label_str} {_format_value(value)}")
+                blocks.append("\n".join(lines))
+        return "\n".join(blocks) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route"))
+http_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.")
+
+dependency_duration = registry.histogram(
+    "dependency_duration_seconds", "Latency of calls to downstream dependencies.", ("dependency", "operation"))
+dependency_errors = registry.counter(
+    "dependency_errors_total", "Failed calls to downstream dependencies.", ("dependency", "operation"))
+dependency_in_flight = registry.gauge(
+    "dependency_in_flight", "Downstream calls currently in progress.", ("dependency",))
+
+event_loop_lag = registry.histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a scheduled wakeup.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+
+
+class track:
+    """
+    Time a downstream call as ``dependency``/``operation``.
+
+    Records latency, in-flight count and (on exceptions, or when
+    ``mark_error`` is called) an error. Usable as ``async with`` or as a
+    decorator on coroutine functions.
+    """
+
+    __slots__ = ("dependency", "operation", "_started", "_failed")
+
+    def __init__(self, dependency: str, operation: str):
+        self.dependency = dependency
+        self.operation = operation
+        self._started = 0.0
+        self._failed = False
+
+    def mark_error(self) -> None:
+        """Count this call as failed even though it didn't raise."""
+        self._failed = True
+
+    async def __aenter__(self) -> "track":
+        dependency_in_flight.inc(self.dependency)
+        self._started = time.perf_counter()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self._started
+        dependency_in_flight.dec(self.dependency)
+        dependency_duration.observe(self.dependency, self.operation, value=elapsed)
+        if exc_type is not None or self._failed:
+            dependency_errors.inc(self.dependency, self.operation)
+
+    def __call__(self, func: Callable) -> Callable:
+        dependency, operation = self.dependency, self.operation
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            # A fresh tracker per call; this instance only carries the names
+            async with track(dependency, operation):
+                return await func(*args, **kwargs)
+        return wrapper
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency, status counts and in-flight requests.
+
+    Requests are labelled with the matched route template (``/planner/{day}/{meal}``),
+    not the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_in_flight.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            http_request_duration.observe(scope["method"], route_path, value=elapsed)
+            http_requests.inc(scope["method"], route_path, status_code)
+
+
+class EventLoopLagMonitor:
+    """
+    Samples event-loop lag: how much later than requested a sleep wakes up.
+
+    Sustained lag means something is blocking the loop (sync I/O, CPU-heavy
+    work outside a thread).
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.last_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time()
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, loop.time() - scheduled - self.interval)
+            event_loop_lag.observe(value=self.last_lag)
+
+
+loop_lag_monitor = EventLoopLagMonitor(METRICS_LOOP_LAG_INTERVAL_SECONDS)
+
+registry.register_collector(lambda: [(
+    "event_loop_lag_last_seconds", "Most recent event-loop lag sample.", "gauge",
+    [({}, loop_lag_monitor.last_lag)],
+)])
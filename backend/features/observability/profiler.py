@@ -0,0 +1,98 @@
+"""
+On-demand stack-sampling profiler.
+
+A sampler thread exists only while a profile is being taken: it reads every
+thread's current frame via ``sys._current_frames()`` at a fixed interval and
+counts the collapsed stacks. Nothing is installed (no tracing or profiling
+hooks), so an idle worker pays nothing and a sampling worker pays one stack
+walk per thread per interval.
+
+Output is the collapsed ("folded") stack format, one ``frame;frame;... count``
+line per distinct stack, which flamegraph.pl, speedscope and inferno read
+directly.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+
+# Leaf frames of threads that are parked, not working
+_IDLE_LEAVES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+class ProfileInProgressError(Exception):
+    """Another profile is already running in this worker."""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _collapse(frame, thread_name: str, include_idle: bool) -> Optional[str]:
+    leaf = frame.f_code
+    if not include_idle and (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE_LEAVES:
+        return None
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    labels.reverse()
+    return ";".join(labels)
+
+
+class StackSampler:
+    """Collects collapsed stacks of every thread but its own for a fixed window."""
+
+    def __init__(self, interval: float = 0.005, include_idle: bool = False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.samples = 0
+        self.stacks: Counter = Counter()
+
+    def run(self, seconds: float) -> Counter:
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names: Dict[int, str] = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = _collapse(frame, names.get(thread_id, f"thread-{thread_id}"), self.include_idle)
+                if stack is not None:
+                    self.stacks[stack] += 1
+            self.samples += 1
+            time.sleep(self.interval)
+        return self.stacks
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+_profile_lock = asyncio.Lock()
+
+
+async def profile(seconds: float, interval: float = 0.005, include_idle: bool = False) -> StackSampler:
+    """
+    Sample all threads for ``seconds`` and return the sampler with its stacks.
+
+    The sampler runs in a worker thread, so the event loop keeps serving (and
+    being profiled) meanwhile. One profile at a time per worker.
+    """
+    if _profile_lock.locked():
+        raise ProfileInProgressError()
+    async with _profile_lock:
+        sampler = StackSampler(interval, include_idle)
+        await asyncio.to_thread(sampler.run, min(seconds, PROFILER_MAX_SECONDS))
+        return sampler
@@ -0,0 +1,80 @@
+import os
+import secrets
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse
+
+from features.observability.metrics import registry
+from features.observability.profiler import PROFILER_MAX_SECONDS, ProfileInProgressError, profile
+from features.observability.startup import startup_report
+
+router = APIRouter(tags=["Observability"])
+
+
+async def verify_debug_endpoint_key(request: Request):
+    """
+    Verify the debug-endpoint-key header matches DEBUG_ENDPOINT_KEY.
+    Uses constant-time string comparison to prevent timing attacks.
+    Debug endpoints don't exist (404) unless the key is configured.
+    """
+    header_key = request.headers.get("debug-endpoint-key")
+    expected_key = os.getenv("DEBUG_ENDPOINT_KEY")
+
+    if not expected_key:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    if not header_key:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing debug-endpoint-key header"
+        )
+
+    # Use constant-time comparison to prevent timing attacks
+    if not secrets.compare_digest(header_key, expected_key):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid debug endpoint key"
+        )
+
+    return True
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/debug/startup")
+async def get_startup_report(_: bool = Depends(verify_debug_endpoint_key)):
+    """Import and initialization cost of each startup phase, including lazy ones since."""
+    return startup_report.summary()
+
+
+@router.get("/debug/profile", response_class=PlainTextResponse)
+async def get_profile(
+    seconds: float = Query(10, gt=0, le=PROFILER_MAX_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    include_idle: bool = False,
+    _: bool = Depends(verify_debug_endpoint_key)
+):
+    """
+    Sample this worker's threads for ``seconds`` and return collapsed stacks.
+
+    The response is flamegraph-ready, e.g. ``flamegraph.pl profile.folded``
+    or drop it into speedscope.
+    """
+    try:
+        sampler = await profile(seconds, interval_ms / 1000, include_idle)
+    except ProfileInProgressError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+
+    filename = f"profile-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.folded"
+    return PlainTextResponse(
+        sampler.folded(),
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Samples": str(sampler.samples),
+        },
+    )
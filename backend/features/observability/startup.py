@@ -0,0 +1,60 @@
+"""
+Startup timing report.
+
+``main`` wraps its imports and lifespan steps in ``startup_report.phase``,
+and the service container records its lazy initializations the same way,
+so one report shows where a cold start spends its time. It is logged once
+the app is ready and served at ``GET /debug/startup``.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Measured from the first import of this module, which main does first thing
+_T0 = time.perf_counter()
+
+
+class StartupReport:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases: List[Dict[str, Any]] = []
+        self.ready_ms: Optional[float] = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the enclosed block as ``name``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self.phases.append({
+                    "phase": name,
+                    "startMs": round((started - _T0) * 1000, 1),
+                    "durationMs": round((finished - started) * 1000, 1),
+                    "thread": threading.current_thread().name,
+                })
+
+    def mark_ready(self) -> None:
+        """Record that the app is ready to serve requests."""
+        self.ready_ms = round((time.perf_counter() - _T0) * 1000, 1)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p["startMs"])
+        return {"readyMs": self.ready_ms, "phases": phases}
+
+    def format(self) -> str:
+        summary = self.summary()
+        lines = [f"Ready in {summary['readyMs']}ms"]
+        lines.extend(
+            f"  {p['durationMs']:>8.1f}ms  {p['phase']}"
+            + (f" [{p['thread']}]" if p["thread"] != "MainThread" else "")
+            for p in summary["phases"]
+        )
+        return "\n".join(lines)
+
+
+startup_report = StartupReport()
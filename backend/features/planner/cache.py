@@ -0,0 +1,64 @@
+import os
+from datetime import date
+from typing import Dict, Any, Optional
+
+from features.cache.backends import CacheBackend, create_backend
+
+# Cached in place of a plan for weeks that have none, so an empty
+# planner tab doesn't query Firestore on every open either
+NO_PLAN = {"__empty__": True}
+
+
+class PlanCache:
+    """
+    Read-through cache of users' weekly plans, keyed by user and week.
+
+    Values are ``{"plan": <WeeklyPlan.model_dump(mode="json")>, "etag": ...}``
+    so any backend can store them. Writers replace the entry after saving
+    (write-through), which keeps a shared backend coherent across workers;
+    the TTL bounds staleness for anything written elsewhere.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = 300.0):
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(user_id: str, week_start: date) -> str:
+        return f"plan:{user_id}:{week_start.isoformat()}"
+
+    async def get(self, user_id: str, week_start: date) -> Optional[Dict[str, Any]]:
+        """Return the cached entry, NO_PLAN, or None on a miss."""
+        return await self.backend.get(self._key(user_id, week_start))
+
+    async def set(self, user_id: str, week_start: date, entry: Dict[str, Any]) -> None:
+        """Cache ``entry`` (or NO_PLAN) for the user's week."""
+        await self.backend.set(self._key(user_id, week_start), entry, self.ttl)
+
+    async def invalidate(self, user_id: str, week_start: date) -> None:
+        await self.backend.delete(self._key(user_id, week_start))
+
+    @staticmethod
+    def _shopping_key(user_id: str, week_start: date, etag: str, servings: Optional[int]) -> str:
+        # Keyed by plan revision, so saving the plan makes old lists unreachable
+        return f"shopping:{user_id}:{week_start.isoformat()}:{etag}:{servings or 0}"
+
+    async def get_shopping_list(
+        self, user_id: str, week_start: date, etag: str, servings: Optional[int]
+    ) -> Optional[Dict[str, Any]]:
+        """Return the shopping list built from the plan revision ``etag``, or None."""
+        return await self.backend.get(self._shopping_key(user_id, week_start, etag, servings))
+
+    async def set_shopping_list(
+        self, user_id: str, week_start: date, etag: str, servings: Optional[int], shopping_list: Dict[str, Any]
+    ) -> None:
+        await self.backend.set(self._shopping_key(user_id, week_start, etag, servings), shopping_list, self.ttl)
+
+
+plan_cache = PlanCache(
+    create_backend(
+        os.getenv("CACHE_REDIS_URL"),
+        max_size=int(os.getenv("PLANNER_CACHE_MAX_USERS", "10000")),
+    ),
+    ttl=float(os.getenv("PLANNER_CACHE_TTL_SECONDS", "300")),
+)
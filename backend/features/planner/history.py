@@ -0,0 +1,61 @@
+import copy
+import os
+from typing import Dict, Any, List
+
+from features.planner.storage import MEALS
+
+# How many past revisions to keep per weekly plan
+PLANNER_HISTORY_RETENTION = int(os.getenv("PLANNER_HISTORY_RETENTION", "20"))
+
+
+def diff_days(old_days: Dict[str, Any], new_days: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Reverse diff between two stored day maps.
+
+    Returns ``{"<day>.<meal>": old items}`` for every slot that changed, which
+    is all that is needed to turn the new revision back into the old one.
+    """
+    changes = {}
+    for day in set(old_days) | set(new_days):
+        old_meals = old_days.get(day) or {}
+        new_meals = new_days.get(day) or {}
+        for meal in MEALS:
+            old_items = old_meals.get(meal, [])
+            if old_items != new_meals.get(meal, []):
+                changes[f"{day}.{meal}"] = old_items
+    return changes
+
+
+def history_entry(revision_time: str, changes: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """A history record for the revision that was current until ``revision_time``."""
+    return {"revisionTime": revision_time, "changes": changes}
+
+
+def compact(history: List[Dict[str, Any]], retention: int = PLANNER_HISTORY_RETENTION) -> List[Dict[str, Any]]:
+    """Keep only the newest ``retention`` history entries (oldest first)."""
+    if retention <= 0:
+        return []
+    return history[-retention:]
+
+
+def append_entry(
+    history: List[Dict[str, Any]],
+    old_days: Dict[str, Any],
+    new_days: Dict[str, Any],
+    revision_time: str,
+) -> List[Dict[str, Any]]:
+    """Record the change from ``old_days`` to ``new_days`` and compact."""
+    changes = diff_days(old_days, new_days)
+    if not changes:
+        return compact(history)
+    return compact(history + [history_entry(revision_time, changes)])
+
+
+def revert(days: Dict[str, Any], history: List[Dict[str, Any]], steps: int) -> Dict[str, Any]:
+    """Rebuild the day map as it was ``steps`` revisions ago."""
+    restored = copy.deepcopy(days)
+    for entry in reversed(history[len(history) - steps:] if steps else []):
+        for path, items in entry["changes"].items():
+            day, meal = path.split(".")
+            restored.setdefault(day, {m: [] for m in MEALS})[meal] = items
+    return restored
@@ -0,0 +1,126 @@
+"""
+One-off migration of legacy meal_plans documents into the week-keyed layout.
+
+Before plans were keyed by user and week, every save added a new document to
+meal_plans. This folds those documents into one document per user and week:
+the newest revision becomes the plan and the older ones become its
+diff-encoded history (trimmed to PLANNER_HISTORY_RETENTION).
+
+Usage (from backend/):
+    python -m features.planner.migrate --dry-run
+    python -m features.planner.migrate [--keep-legacy]
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import asyncio
+import logging
+from typing import Dict, Any, List, Tuple
+
+from features.database.firestore import MAX_BATCH_WRITES, PLANS_COLLECTION, get_db, plan_doc_id
+from features.database.timestamps import to_datetime, to_iso
+from features.planner.history import append_entry, compact, revert
+from features.planner.storage import days_from_storage, days_to_storage, week_start_of
+
+logger = logging.getLogger(__name__)
+
+
+def fold_revisions(revisions: List[Tuple[Any, Dict[str, Any]]], history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Turn (time, day map) revisions, oldest first, into history entries
+    appended to ``history``. The last revision is the current plan, so it
+    gets no entry of its own.
+    """
+    for (old_time, old_days), (_, new_days) in zip(revisions, revisions[1:]):
+        history = append_entry(history, old_days, new_days, to_iso(old_time))
+    return history
+
+
+async def migrate(dry_run: bool, keep_legacy: bool) -> Dict[str, int]:
+    db = get_db()
+    collection = db.collection(PLANS_COLLECTION)
+
+    legacy: Dict[Tuple[str, str], List[Tuple[Any, str, Dict[str, Any]]]] = {}
+    current: Dict[str, Dict[str, Any]] = {}
+    skipped = 0
+    async for doc in collection.stream():
+        data = doc.to_dict()
+        if data.get("weekStartDate"):
+            current[doc.id] = data
+            continue
+        created_at = to_datetime(data.get("createdAt"))
+        if not data.get("userId") or created_at is None:
+            skipped += 1
+            continue
+        week_start = week_start_of(created_at.date())
+        legacy.setdefault((data["userId"], week_start.isoformat()), []).append((created_at, doc.id, data))
+
+    writes: List[Tuple[str, Any, Dict[str, Any]]] = []
+    for (user_id, week_iso), documents in legacy.items():
+        documents.sort(key=lambda item: item[0])
+        revisions = [
+            (created_at, days_to_storage(days_from_storage(data.get("days"))))
+            for created_at, _, data in documents
+        ]
+        doc_id = plan_doc_id(user_id, week_start_of(documents[0][0].date()))
+        existing = current.get(doc_id)
+
+        if existing is not None:
+            # The week-keyed plan is newer than every legacy revision, and its
+            # own history already leads from its oldest revision to now, so
+            # the legacy revisions fold into that oldest revision
+            existing_history = existing.get("history") or []
+            existing_days = days_to_storage(days_from_storage(existing.get("days")))
+            oldest_days = revert(existing_days, existing_history, len(existing_history))
+            revisions.append((existing.get("createdAt"), oldest_days))
+            history = fold_revisions(revisions, [])
+            plan = dict(existing)
+            plan["history"] = compact(history + existing_history)
+            plan["createdAt"] = documents[0][0]
+        else:
+            plan = {
+                "userId": user_id,
+                "weekStartDate": week_iso,
+                "days": revisions[-1][1],
+                "history": fold_revisions(revisions, []),
+                "createdAt": documents[0][0],
+                "updatedAt": documents[-1][0],
+            }
+
+        writes.append(("set", collection.document(doc_id), plan))
+        if not keep_legacy:
+            writes.extend(("delete", collection.document(legacy_id), {}) for _, legacy_id, _ in documents)
+
+    if not dry_run:
+        for offset in range(0, len(writes), MAX_BATCH_WRITES):
+            batch = db.batch()
+            for kind, doc_ref, data in writes[offset:offset + MAX_BATCH_WRITES]:
+                if kind == "set":
+                    batch.set(doc_ref, data)
+                else:
+                    batch.delete(doc_ref)
+            await batch.commit()
+
+    return {
+        "legacyDocuments": sum(len(documents) for documents in legacy.values()),
+        "weeklyPlans": len(legacy),
+        "skipped": skipped,
+        "writes": len(writes),
+        "commits": 0 if dry_run else -(-len(writes) // MAX_BATCH_WRITES),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--keep-legacy", action="store_true", help="Keep the old documents after folding them")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    summary = asyncio.run(migrate(args.dry_run, args.keep_legacy))
+    logger.info(f"Migration {'dry run ' if args.dry_run else ''}summary: {summary}")
+
+
+if __name__ == "__main__":
+    main()
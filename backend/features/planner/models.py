@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict, Optional
+from typing import List, Dict, Literal, Optional
 from datetime import datetime
 
 class MealItem(BaseModel):
@@ -23,3 +23,38 @@ class WeeklyPlanCreate(BaseModel):
     days: Dict[str, Dict[str, List[str]]] 
     # Structure: { "monday": { "breakfast": ["Eggs"], ... } }
     # Simplified input to make it easier for the Agent to generate JSON
+
+WEEK_DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Shared, never-mutated days of an empty week, used when a user has no plan yet
+EMPTY_WEEK_DAYS = tuple(DayPlan(day=d) for d in WEEK_DAYS)
+
+
+class MealPatch(BaseModel):
+    """
+    Field-level change to one meal slot, e.g. Tuesday dinner.
+
+    - add: append ``item``
+    - remove: drop the items named ``name`` (case-insensitive)
+    - replace: swap the item named ``name`` for ``item``; without ``name``,
+      replace the whole slot with ``items`` (or just ``item``)
+    """
+    op: Literal["add", "remove", "replace"]
+    item: Optional[MealItem] = None
+    items: Optional[List[MealItem]] = None
+    name: Optional[str] = None
+
+
+class ShoppingListItem(BaseModel):
+    name: str
+    amount: Optional[float] = None  # None when no linked recipe gives a quantity
+    unit: Optional[str] = None
+    recipes: List[str] = []
+
+
+class ShoppingList(BaseModel):
+    week_start_date: datetime
+    servings: Optional[int] = None
+    items: List[ShoppingListItem]
+    unlinked_meals: List[str] = []  # Planned meals without a recipe_id
+    missing_recipes: List[str] = []  # Linked recipe IDs that don't exist (or aren't the user's)
@@ -0,0 +1,182 @@
+"""
+Normalization of the loose weekly-plan JSON the planner agent sends.
+
+Accepted shapes, all in a single pass over the input:
+
+- ``{"planJson": "<json string>"}`` or ``{"planJson": {...}}`` wrappers
+- day-keyed dicts, any key case: ``{"Monday": {"breakfast": ..., ...}, ...}``
+- a day given as a plain string, taken as that day's dinner: ``{"monday": "Pasta"}``
+- meals as comma-joined strings (``"Eggs, Toast"``), lists of strings or
+  lists of ``{"name"|"title", "emoji"}`` objects
+- ``{"days": [{"day": "Monday", "breakfast": [...], ...}, ...]}``
+- ``{"days": {"monday": {...}, ...}}``, of which ``WeeklyPlanCreate`` (day ->
+  meal -> list of names) takes a strict fast path that checks and builds in
+  one pass, without the per-item shape dispatch
+
+The result is plain, JSON-ready ``DayPlan``/``MealItem`` dicts rather than
+models: every value is already converted to its field type here, and
+instantiating ~50 models per plan (validated or via ``model_construct``,
+which is pure Python in pydantic v2) cost more than the rest of the parse.
+The dicts go straight into storage and the response.
+"""
+import logging
+from typing import Dict, Any, List, Optional
+
+from features.planner.models import WEEK_DAYS
+
+try:
+    import orjson
+
+    def _loads(value: str) -> Any:
+        return orjson.loads(value)
+except ImportError:  # pragma: no cover - orjson is optional
+    import json
+
+    def _loads(value: str) -> Any:
+        return json.loads(value)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMOJI = "🍽️"
+
+_DAY_NAMES = {day.lower(): day for day in WEEK_DAYS}
+
+
+def _item(name: str, emoji: str = DEFAULT_EMOJI, recipe_id: Optional[str] = None) -> Dict[str, Any]:
+    # Same keys and order as MealItem.model_dump()
+    return {"name": name, "emoji": emoji, "recipe_id": recipe_id}
+
+
+def parse_meals(meal_input: Any) -> List[Dict[str, Any]]:
+    """Convert a string, list of strings or list of objects into MealItem dicts."""
+    if isinstance(meal_input, list):
+        result = []
+        for item in meal_input:
+            if isinstance(item, str):
+                result.append(_item(item))
+            elif isinstance(item, dict):
+                # If agent sends objects, try to find name/emoji
+                name = item.get("name") or item.get("title") or "Unknown"
+                emoji = item.get("emoji") or DEFAULT_EMOJI
+                recipe_id = item.get("recipe_id") or item.get("recipeId")
+                result.append(_item(
+                    str(name),
+                    str(emoji),
+                    recipe_id if isinstance(recipe_id, str) else None,
+                ))
+        return result
+    if isinstance(meal_input, str):
+        # Split by comma if it's a combined string like "Eggs, Toast"
+        return [_item(part) for part in (x.strip() for x in meal_input.split(",")) if part]
+    return []
+
+
+def _parse_day(day_name: str, day_content: Any) -> Dict[str, Any]:
+    if isinstance(day_content, str):
+        # Treat the string as the main meal (dinner)
+        return {"day": day_name, "breakfast": [], "lunch": [], "dinner": parse_meals(day_content)}
+    if isinstance(day_content, dict):
+        return {
+            "day": day_name,
+            "breakfast": parse_meals(day_content.get("breakfast")),
+            "lunch": parse_meals(day_content.get("lunch")),
+            "dinner": parse_meals(day_content.get("dinner")),
+        }
+    return {"day": day_name, "breakfast": [], "lunch": [], "dinner": []}
+
+
+def _strict_days(plan_data: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """
+    The days of a plan in exactly the WeeklyPlanCreate shape, else None.
+
+    Checks and builds in the same pass, with the MealItem dicts inlined,
+    and gives up on the first value that doesn't fit.
+    """
+    days = plan_data.get("days")
+    if len(plan_data) != 1 or not isinstance(days, dict):
+        return None
+    by_day: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    for key, day_content in days.items():
+        day_name = _DAY_NAMES.get(key.lower()) if isinstance(key, str) else None
+        if day_name is None or not isinstance(day_content, dict):
+            return None
+        meals = {}
+        for meal, names in day_content.items():
+            if not isinstance(names, list):
+                return None
+            items = []
+            for name in names:
+                if not isinstance(name, str):
+                    return None
+                items.append({"name": name, "emoji": DEFAULT_EMOJI, "recipe_id": None})
+            meals[meal] = items
+        by_day[day_name] = meals
+
+    result = []
+    for day_name in WEEK_DAYS:
+        meals = by_day.get(day_name, {})
+        result.append({
+            "day": day_name,
+            "breakfast": meals.get("breakfast", []),
+            "lunch": meals.get("lunch", []),
+            "dinner": meals.get("dinner", []),
+        })
+    return result
+
+
+def _unwrap(plan_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Handle the case where the plan is wrapped in a "planJson" key."""
+    wrapped = plan_data.get("planJson")
+    if isinstance(wrapped, dict):
+        return wrapped
+    if isinstance(wrapped, (str, bytes)):
+        try:
+            parsed = _loads(wrapped)
+        except ValueError as e:
+            # Continue with original data if parsing fails, might still work
+            logger.error(f"Failed to parse planJson: {e}")
+            return plan_data
+        if isinstance(parsed, dict):
+            return parsed
+    return plan_data
+
+
+def _collect_days(mapping: Dict[str, Any], by_day: Dict[str, Any]) -> None:
+    """Add the entries of ``mapping`` whose key is a day name (any case) to ``by_day``."""
+    for key, value in mapping.items():
+        day_name = _DAY_NAMES.get(key.lower()) if isinstance(key, str) else None
+        if day_name:
+            by_day[day_name] = value
+
+
+def normalize_plan(plan_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Normalize any accepted plan shape into seven ``DayPlan`` dicts, Monday first,
+    equal to what ``DayPlan(...).model_dump()`` would give.
+
+    Unknown keys are ignored and missing days are empty.
+    """
+    plan_data = _unwrap(plan_data)
+
+    strict = _strict_days(plan_data)
+    if strict is not None:
+        return strict
+
+    by_day: Dict[str, Any] = {}
+    days = plan_data.get("days")
+    if isinstance(days, list):
+        for day in days:
+            if isinstance(day, dict) and isinstance(day.get("day"), str):
+                day_name = _DAY_NAMES.get(day["day"].lower())
+                if day_name:
+                    by_day[day_name] = day
+    elif isinstance(days, dict):
+        _collect_days(days, by_day)
+
+    # Top-level day keys win over the same day under "days"
+    _collect_days(plan_data, by_day)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Normalizing plan with days: {sorted(by_day)}")
+
+    return [_parse_day(day_name, by_day.get(day_name)) for day_name in WEEK_DAYS]
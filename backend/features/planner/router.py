@@ -1,165 +1,388 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
-from typing import Dict, Any, List
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, Response, status
+from typing import Dict, Any, List, Optional
 from features.auth.firebase import get_current_user
-from features.planner.models import WeeklyPlan, WeeklyPlanCreate, DayPlan, MealItem
-from google.cloud import firestore
-from datetime import datetime
+from features.planner.models import (
+    WeeklyPlan,
+    MealPatch,
+    ShoppingList,
+    EMPTY_WEEK_DAYS,
+    WEEK_DAYS,
+)
+from features.planner.cache import plan_cache, NO_PLAN
+from features.planner.parsing import normalize_plan
+from features.serialization.responses import fast_json
+from features.planner.shopping import build_shopping_list, linked_recipe_ids
+from features.planner.history import PLANNER_HISTORY_RETENTION, append_entry, history_entry, revert
+from features.ratelimit.limiter import RateLimit
+from features.events.hub import event_hub
+from features.planner.storage import (
+    MEALS,
+    current_week_start,
+    days_from_storage,
+    days_to_storage,
+    plan_from_doc,
+    week_start_of,
+)
+from features.database.firestore import (
+    ConcurrentModificationError,
+    array_union,
+    create_plan,
+    get_plan,
+    get_recipes,
+    replace_plan,
+    update_plan_fields,
+)
+from features.database.timestamps import to_iso
+from datetime import date, datetime, timedelta, timezone
 import logging
 
-# Initialize Firestore connection
-from features.database.firestore import db
+rate_limit = RateLimit.from_env("planner", per_minute=120, burst=30)
 
-router = APIRouter(prefix="/planner", tags=["Planner"])
+# Every planner route is per-user, so the limit applies router-wide
+router = APIRouter(prefix="/planner", tags=["Planner"], dependencies=[Depends(rate_limit.user)])
 logger = logging.getLogger(__name__)
 
-PLANS_COLLECTION = "meal_plans"
+def _etag(update_time) -> str:
+    return f'"{to_iso(update_time)}"'
+
+
+async def _requested_week(
+    week: Optional[date] = Query(None, description="Any date in the week"),
+    tz_offset_minutes: Optional[int] = Query(
+        None, ge=-840, le=840, description="The client's UTC offset, e.g. 120 for UTC+2"
+    ),
+) -> date:
+    """
+    Monday of the requested week (any date in it), defaulting to this week.
+
+    "This week" follows the client's calendar when it sends its UTC offset;
+    otherwise it's the UTC week, which for a client far from UTC flips a
+    few hours before or after its own Monday midnight.
+
+    Async so FastAPI runs it on the event loop instead of sending every
+    planner request through the threadpool.
+    """
+    if week:
+        return week_start_of(week)
+    now = datetime.now(timezone.utc)
+    if tz_offset_minutes:
+        now += timedelta(minutes=tz_offset_minutes)
+    return current_week_start(now.date())
+
+
+async def _cached_plan(user_id: str, week_start: date) -> Dict[str, Any]:
+    """The user's plan cache entry for the week (or NO_PLAN), filling the cache on a miss."""
+    cached = await plan_cache.get(user_id, week_start)
+    if cached is None:
+        existing = await get_plan(user_id, week_start)
+
+        if existing:
+            plan_data, update_time = existing
+            # Map Firestore camelCase to Pydantic snake_case
+            plan = WeeklyPlan.model_validate(plan_from_doc(plan_data))
+            cached = {"plan": plan.model_dump(mode="json"), "etag": _etag(update_time)}
+        else:
+            cached = NO_PLAN
+        await plan_cache.set(user_id, week_start, cached)
+    return cached
+
+
+async def _plan_saved(user_id: str, week_start: date, plan_json: Dict[str, Any], etag: str) -> None:
+    """Write a just-saved plan through to the cache and push it to the user's open event streams."""
+    await plan_cache.set(user_id, week_start, {"plan": plan_json, "etag": etag})
+    event_hub.publish(user_id, "planner.updated", {
+        "weekStartDate": week_start.isoformat(), "etag": etag, "plan": plan_json,
+    })
+
 
 @router.get("", response_model=WeeklyPlan)
-async def get_current_plan(user: dict = Depends(get_current_user)):
-    """Get the latest weekly plan for the user."""
+async def get_current_plan(
+    response: Response,
+    week_start: date = Depends(_requested_week),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Get the user's plan for ``week`` (any date in the week; defaults to the current week).
+
+    Plans are keyed by user and week, so this is a direct document get.
+    """
     user_id = user["uid"]
-    
-    # Query for the most recent plan
-    docs = (
-        db.collection(PLANS_COLLECTION)
-        .where("userId", "==", user_id)
-        .order_by("createdAt", direction=firestore.Query.DESCENDING)
-        .limit(1)
-        .stream()
-    )
-    
-    plan_data = None
-    for doc in docs:
-        plan_data = doc.to_dict()
-        # id is not usually in to_dict() unless explicitly put there
-        # but our model might expect it. for now let's just trust the data structure matches
-        break
-    
-    if not plan_data:
+
+    cached = await _cached_plan(user_id, week_start)
+    if cached.get("__empty__"):
         # Return empty default plan structure if nothing found
-        default_days = [
-            DayPlan(day=d, breakfast=[], lunch=[], dinner=[])
-            for d in ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-        ]
-        return WeeklyPlan(days=default_days, user_id=user_id, created_at=datetime.now())
-        
-    # Map Firestore camelCase to Pydantic snake_case
-    if "userId" in plan_data:
-        plan_data["user_id"] = plan_data.pop("userId")
-    if "createdAt" in plan_data:
-        plan_data["created_at"] = plan_data.pop("createdAt")
-        
-    return plan_data
+        return fast_json(WeeklyPlan.model_construct(
+            days=list(EMPTY_WEEK_DAYS),
+            user_id=user_id,
+            created_at=datetime.now(),
+            week_start_date=datetime.combine(week_start, datetime.min.time()),
+        ))
+
+    # Cached plans were validated before caching; in fast mode they go out as-is
+    response.headers["ETag"] = cached["etag"]
+    return fast_json(cached["plan"], response)
+
+
+@router.get("/shopping-list", response_model=ShoppingList)
+async def get_shopping_list(
+    response: Response,
+    week_start: date = Depends(_requested_week),
+    servings: Optional[int] = Query(None, ge=1, le=100),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Aggregated shopping list for the user's plan for ``week``.
+
+    Ingredients of every meal linked to a recipe are merged across the week,
+    with units normalized and quantities scaled to ``servings`` per meal.
+    Linked recipes are fetched in one batched read and the list is cached
+    per plan revision.
+    """
+    user_id = user["uid"]
+    week_start_date = datetime.combine(week_start, datetime.min.time())
+
+    cached = await _cached_plan(user_id, week_start)
+    if cached.get("__empty__"):
+        return ShoppingList(week_start_date=week_start_date, servings=servings, items=[])
+
+    etag = cached["etag"]
+    response.headers["ETag"] = etag
+    shopping_list = await plan_cache.get_shopping_list(user_id, week_start, etag, servings)
+    if shopping_list is not None:
+        return shopping_list
+
+    days = cached["plan"]["days"]
+    recipes = await get_recipes(linked_recipe_ids(days))
+    # Only the user's own recipes count; anything else is reported as missing
+    recipes = {recipe_id: recipe for recipe_id, recipe in recipes.items() if recipe.get("userId") == user_id}
+
+    shopping_list = ShoppingList(
+        week_start_date=week_start_date,
+        servings=servings,
+        **build_shopping_list(days, recipes, servings),
+    ).model_dump(mode="json")
+    await plan_cache.set_shopping_list(user_id, week_start, etag, servings, shopping_list)
+    return shopping_list
+
+
+@router.get("/history", response_model=WeeklyPlan)
+async def get_plan_revision(
+    week_start: date = Depends(_requested_week),
+    steps: int = Query(1, ge=1),
+    user: dict = Depends(get_current_user)
+):
+    """Get the user's plan for ``week`` as it was ``steps`` revisions ago."""
+    user_id = user["uid"]
+
+    existing = await get_plan(user_id, week_start)
+    if existing is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No plan for this week")
+    plan_data, _ = existing
+
+    history = plan_data.get("history") or []
+    if steps > len(history):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Only {len(history)} earlier revisions are kept"
+        )
+
+    plan_data["days"] = revert(days_to_storage(days_from_storage(plan_data.get("days"))), history, steps)
+    return WeeklyPlan.model_validate(plan_from_doc(plan_data))
+
 
 @router.post("", response_model=WeeklyPlan)
 async def save_weekly_plan(
     plan_data: Dict[str, Any],
+    response: Response,
+    week_start: date = Depends(_requested_week),
     user: dict = Depends(get_current_user)
 ):
     """
     Save a weekly plan generated by the agent.
     Accepts loose JSON structure (e.g. dict with days as keys) and converts to strict model.
+    Replaces the plan for ``week`` (any date in the week; defaults to the current week).
     """
     user_id = user["uid"]
     logger.info(f"Received plan create request for user {user_id}")
+
+    # Normalize the loose agent JSON into DayPlan dicts; they're built with
+    # the field types already, so they go to storage and the response as-is
+    days = normalize_plan(plan_data)
+
+    # Store days as a day-keyed map so single meals can be patched in place;
+    # replace_plan sets userId, weekStartDate and the timestamps
+    new_days = days_to_storage(days)
+
+    def replace(existing) -> Dict[str, Any]:
+        # Replacing an existing plan keeps its creation time and records what
+        # changed as a compact reverse diff in the plan's history. This runs
+        # inside the save's transaction, so it always sees the latest plan
+        doc_data = {"days": new_days, "history": []}
+        if existing is not None:
+            old_data, old_update_time = existing
+            old_days = days_to_storage(days_from_storage(old_data.get("days")))
+            doc_data["history"] = append_entry(
+                old_data.get("history") or [], old_days, new_days, to_iso(old_update_time)
+            )
+            if old_data.get("createdAt") is not None:
+                doc_data["createdAt"] = old_data["createdAt"]
+        return doc_data
+
+    # Save to Firestore, then write the new plan through to the cache
+    try:
+        doc_data, update_time = await replace_plan(user_id, week_start, replace)
+    except ConcurrentModificationError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Plan is being changed by another request, please retry"
+        )
+    created_at = doc_data["createdAt"]
+    if not isinstance(created_at, datetime):
+        # Still a SERVER_TIMESTAMP sentinel for a just-created plan
+        created_at = datetime.now()
+    etag = _etag(update_time)
+    # Only the plan's metadata goes through the model
+    plan_json = WeeklyPlan(
+        days=[],
+        user_id=user_id,
+        created_at=created_at,
+        week_start_date=datetime.combine(week_start, datetime.min.time()),
+    ).model_dump(mode="json")
+    plan_json["days"] = days
+    await _plan_saved(user_id, week_start, plan_json, etag)
+    response.headers["ETag"] = etag
+
+    # The same JSON-ready dump serves the cache and the response
+    return fast_json(plan_json, response)
+
+
+def _apply_meal_patch(items: List[Dict[str, Any]], patch: MealPatch) -> List[Dict[str, Any]]:
+    """Return the meal slot's items with ``patch`` applied."""
+    def named(item: Dict[str, Any]) -> bool:
+        return item.get("name", "").strip().lower() == patch.name.strip().lower()
+
+    if patch.op == "add":
+        if patch.item is None:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="'add' needs an item")
+        return items + [patch.item.model_dump()]
+
+    if patch.op == "remove":
+        if not patch.name:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="'remove' needs a name")
+        remaining = [item for item in items if not named(item)]
+        if len(remaining) == len(items):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No meal named '{patch.name}'")
+        return remaining
+
+    # replace
+    if patch.name:
+        if patch.item is None:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="'replace' needs an item")
+        if not any(named(item) for item in items):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No meal named '{patch.name}'")
+        return [patch.item.model_dump() if named(item) else item for item in items]
+
+    replacement = patch.items if patch.items is not None else ([patch.item] if patch.item else None)
+    if replacement is None:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="'replace' needs item or items")
+    return [item.model_dump() for item in replacement]
+
+
+# Retries when a concurrent write wins the race and the client did not pin a revision
+PATCH_MAX_ATTEMPTS = 3
+
+
+@router.patch("/{day}/{meal}", response_model=WeeklyPlan)
+async def patch_meal(
+    day: str,
+    meal: str,
+    patch: MealPatch,
+    response: Response,
+    week_start: date = Depends(_requested_week),
+    if_match: Optional[str] = Header(None),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Add, remove or replace a meal in one slot of the user's weekly plan.
+
+    Only the ``days.<day>.<meal>`` field is written, guarded by the document's
+    update time (optimistic concurrency). Pass the ETag from a previous
+    response as If-Match to fail with 412 instead of applying the change on
+    top of a newer plan.
+    """
     user_id = user["uid"]
-    logger.info(f"Received plan create request for user {user_id}")
+    day_key = day.lower()
+    meal_key = meal.lower()
+    if day_key not in {d.lower() for d in WEEK_DAYS}:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown day '{day}'")
+    if meal_key not in MEALS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown meal '{meal}'")
 
-    
-    # Handle the case where the plan is wrapped in a "planJson" key (from frontend or agent)
-    if "planJson" in plan_data:
-        import json
-        try:
-            potential_json = plan_data["planJson"]
-            if isinstance(potential_json, str):
-                plan_data = json.loads(potential_json)
-            elif isinstance(potential_json, dict):
-                plan_data = potential_json
-            logger.info(f"Parsed planJson: {plan_data}")
-        except Exception as e:
-            logger.error(f"Failed to parse planJson: {e}")
-            # Continue with original data if parsing fails, might still work
-
-
-    # Helper to convert various inputs (string, list of strings, list of objects) into List[MealItem]
-    def process_meals(meal_input) -> List[MealItem]:
-        if isinstance(meal_input, str):
-             # Split by comma if it's a combined string like "Eggs, Toast"
-             items = [x.strip() for x in meal_input.split(',')]
-             return [MealItem(name=item, emoji="🍽️") for item in items if item]
-        elif isinstance(meal_input, list):
-            # Could be list of strings or list of objects
-            result = []
-            for item in meal_input:
-                if isinstance(item, str):
-                    result.append(MealItem(name=item, emoji="🍽️"))
-                elif isinstance(item, dict):
-                    # If agent sends objects, try to find name/emoji
-                    name = item.get("name") or item.get("title") or "Unknown"
-                    emoji = item.get("emoji") or "🍽️"
-                    result.append(MealItem(name=name, emoji=emoji))
-            return result
-        return []
-
-    # Logic to normalize the input JSON into our DayPlan list
-    days_list = []
-    week_days_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    
-    # 1. Check if input is ALREADY in the shape of { "days": [...] }
-    if "days" in plan_data and isinstance(plan_data["days"], list):
-        # Allow Pydantic to validate it directly later, or process if needed.
-        # Ideally we trust the structure if it matches, but let's be robust.
-        # For simplicity, let's treat the root dict as the source of truth if keys match day names.
-        pass
-
-    # 2. Heuristic: Check if keys are day names (e.g. { "monday": {...}, "tuesday": ... })
-    # Normalize keys to lowercase for checking
-    plan_data_lower = {k.lower(): v for k, v in plan_data.items()}
-    
-    for day_name in week_days_order:
-        day_key = day_name.lower()
-        day_content = plan_data_lower.get(day_key, {})
-        
-        # Handle simplified format where day value is just a string (e.g. "Monday": "Pasta")
-        if isinstance(day_content, str):
-            # Treat the string as the main meal (dinner)
-            breakfast = []
-            lunch = []
-            dinner = process_meals(day_content)
+    for _ in range(PATCH_MAX_ATTEMPTS):
+        existing = await get_plan(user_id, week_start)
+        if existing is not None:
+            plan_data, update_time = existing
+            if if_match is not None and if_match != _etag(update_time):
+                raise HTTPException(
+                    status_code=status.HTTP_412_PRECONDITION_FAILED,
+                    detail="Plan has changed since it was read"
+                )
         else:
-            # Standard object format
-            breakfast = process_meals(day_content.get("breakfast", []))
-            lunch = process_meals(day_content.get("lunch", []))
-            dinner = process_meals(day_content.get("dinner", []))
-        
-        days_list.append(DayPlan(
-            day=day_name,
-            breakfast=breakfast,
-            lunch=lunch,
-            dinner=dinner
-        ))
+            if if_match is not None:
+                raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Plan does not exist")
+            plan_data, update_time = {"days": days_to_storage([{"day": d} for d in WEEK_DAYS])}, None
 
-    # Create the Plan object
-    new_plan = WeeklyPlan(
-        days=days_list,
-        user_id=user_id,
-        created_at=datetime.now()
+        # Older list-shaped plans are converted and written back whole
+        days = plan_data.get("days")
+        whole_days = not isinstance(days, dict) or day_key not in days
+        plan_data["days"] = days = days_to_storage(days_from_storage(days))
+
+        old_items = days[day_key][meal_key]
+        new_items = _apply_meal_patch(old_items, patch)
+        days[day_key][meal_key] = new_items
+
+        try:
+            if update_time is None:
+                plan_data["history"] = []
+                update_time = await create_plan(plan_data, user_id, week_start)
+            else:
+                field_updates = {"days": days} if whole_days else {f"days.{day_key}.{meal_key}": new_items}
+                if old_items != new_items:
+                    # Append the reverse diff without rewriting the history,
+                    # unless it is due for compaction
+                    entry = history_entry(to_iso(update_time), {f"{day_key}.{meal_key}": old_items})
+                    history = plan_data.get("history") or []
+                    if len(history) < PLANNER_HISTORY_RETENTION:
+                        field_updates["history"] = array_union([entry])
+                        plan_data["history"] = history + [entry]
+                    else:
+                        plan_data["history"] = field_updates["history"] = append_entry(
+                            history, {day_key: {meal_key: old_items}}, {day_key: {meal_key: new_items}},
+                            to_iso(update_time),
+                        )
+                update_time = await update_plan_fields(user_id, week_start, field_updates, update_time)
+        except ConcurrentModificationError:
+            if if_match is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_412_PRECONDITION_FAILED,
+                    detail="Plan has changed since it was read"
+                )
+            continue
+
+        plan_data["userId"] = user_id
+        plan_data["weekStartDate"] = week_start.isoformat()
+        if not isinstance(plan_data.get("createdAt"), datetime):
+            # Still a SERVER_TIMESTAMP sentinel for a just-created plan
+            plan_data.pop("createdAt", None)
+        plan = WeeklyPlan.model_validate(plan_from_doc(plan_data))
+
+        etag = _etag(update_time)
+        plan_json = plan.model_dump(mode="json")
+        await _plan_saved(user_id, week_start, plan_json, etag)
+        response.headers["ETag"] = etag
+        return plan_json
+
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Plan is being changed by another request, please retry"
     )
-    
-    # Dump to dict for Firestore
-    doc_data = new_plan.model_dump()
-    
-    # Convert to camelCase for Firestore (to match index)
-    doc_data['userId'] = doc_data.pop('user_id')
-    doc_data['createdAt'] = firestore.SERVER_TIMESTAMP 
-    if 'created_at' in doc_data:
-        del doc_data['created_at']
-
-    # Save to Firestore
-    _, doc_ref = db.collection(PLANS_COLLECTION).add(doc_data)
-    
-    # Return response (keep snake_case for Pydantic response model)
-    response_model = new_plan.model_copy()
-    # Ideally fetch the real ID? or just return what we have
-    # response_model.id = doc_ref.id # WeeklyPlan model doesn't have an ID field yet, skipping
-    return response_model
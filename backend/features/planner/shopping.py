@@ -0,0 +1,87 @@
+from typing import Dict, Any, List, Optional, Tuple
+
+from features.planner.storage import MEALS
+from features.recipes.ingredients import normalize_ingredient_name
+from features.recipes.units import for_display, parse_amount, to_base
+
+
+def linked_recipe_ids(days: List[Dict[str, Any]]) -> List[str]:
+    """Recipe IDs linked from a plan's meals, in plan order, without duplicates."""
+    ids = (
+        item.get("recipe_id")
+        for day in days
+        for meal in MEALS
+        for item in day.get(meal) or []
+    )
+    return list(dict.fromkeys(recipe_id for recipe_id in ids if recipe_id))
+
+
+def build_shopping_list(
+    days: List[Dict[str, Any]],
+    recipes: Dict[str, Dict[str, Any]],
+    servings: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Merge the ingredients of every linked meal in a plan into one list.
+
+    Each planned meal counts once, so a recipe planned twice is bought for
+    twice. Ingredients are grouped by normalized name and base unit, so
+    500 g + 1 kg of flour is one "1.5 kg" line while "2 cloves" of garlic
+    stays separate from "1 tsp" of garlic. With ``servings``, each recipe is
+    scaled from its own serving count (recipes without one are left as is).
+
+    Args:
+        days: DayPlan dicts
+        recipes: Recipe ID to recipe data for the linked recipes that were found
+        servings: Servings to buy for per meal
+
+    Returns:
+        ``items``, ``unlinked_meals`` and ``missing_recipes`` for a ShoppingList
+    """
+    totals: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+    unlinked: List[str] = []
+    missing: List[str] = []
+
+    for day in days:
+        for meal in MEALS:
+            for item in day.get(meal) or []:
+                recipe_id = item.get("recipe_id")
+                if not recipe_id:
+                    unlinked.append(item.get("name", ""))
+                    continue
+                recipe = recipes.get(recipe_id)
+                if recipe is None:
+                    if recipe_id not in missing:
+                        missing.append(recipe_id)
+                    continue
+
+                scale = 1.0
+                if servings and recipe.get("servings"):
+                    scale = servings / recipe["servings"]
+                title = recipe.get("title", "")
+
+                for ingredient in recipe.get("ingredients") or []:
+                    if isinstance(ingredient, str):
+                        ingredient = {"name": ingredient}
+                    name = normalize_ingredient_name(ingredient.get("name") or "")
+                    if not name:
+                        continue
+                    amount = parse_amount(ingredient.get("amount"))
+                    base_unit = None
+                    if amount is not None:
+                        amount, base_unit = to_base(amount * scale, ingredient.get("unit"))
+
+                    entry = totals.setdefault((name, base_unit), {"name": name, "amount": None, "recipes": []})
+                    if amount is not None:
+                        entry["amount"] = (entry["amount"] or 0.0) + amount
+                    if title and title not in entry["recipes"]:
+                        entry["recipes"].append(title)
+
+    items = []
+    for (_, base_unit), entry in sorted(totals.items(), key=lambda kv: (kv[0][0], kv[0][1] or "")):
+        amount, unit = entry["amount"], base_unit
+        if amount is not None:
+            amount, unit = for_display(amount, base_unit)
+        items.append({"name": entry["name"], "amount": amount, "unit": unit, "recipes": entry["recipes"]})
+
+    return {"items": items, "unlinked_meals": unlinked, "missing_recipes": missing}
@@ -0,0 +1,62 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional
+
+from features.planner.models import WEEK_DAYS
+
+MEALS = ("breakfast", "lunch", "dinner")
+
+
+def current_week_start(today: Optional[date] = None) -> date:
+    """Monday of the week containing ``today`` (UTC)."""
+    today = today or datetime.now(timezone.utc).date()
+    return today - timedelta(days=today.weekday())
+
+
+def week_start_of(value: date) -> date:
+    """Monday of the week containing ``value``."""
+    return value - timedelta(days=value.weekday())
+
+
+def days_to_storage(days: List[Dict[str, Any]]) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """
+    Convert a list of DayPlan dicts into the stored map layout.
+
+    Plans are stored as ``{"monday": {"breakfast": [...], ...}, ...}`` so a
+    single meal can be updated with a ``days.monday.dinner`` field path.
+    """
+    return {
+        day["day"].lower(): {meal: day.get(meal, []) for meal in MEALS}
+        for day in days
+    }
+
+
+def days_from_storage(value: Any) -> List[Dict[str, Any]]:
+    """
+    Convert stored days back into an ordered list of DayPlan dicts.
+
+    Accepts the map layout and the older list layout, where each plan
+    document held ``days`` as a list of DayPlan dicts.
+    """
+    if isinstance(value, list):
+        return value
+
+    value = value or {}
+    return [
+        {"day": day_name, **{meal: (value.get(day_name.lower()) or {}).get(meal, []) for meal in MEALS}}
+        for day_name in WEEK_DAYS
+    ]
+
+
+def plan_from_doc(plan_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a stored plan document onto WeeklyPlan's field names."""
+    plan = {
+        "days": days_from_storage(plan_data.get("days")),
+        "user_id": plan_data.get("userId", plan_data.get("user_id")),
+        "week_start_date": plan_data.get("weekStartDate", plan_data.get("week_start_date")),
+    }
+    created_at = plan_data.get("createdAt", plan_data.get("created_at"))
+    if created_at is not None:
+        plan["created_at"] = created_at
+    if isinstance(plan["week_start_date"], str):
+        plan["week_start_date"] = datetime.fromisoformat(plan["week_start_date"])
+    return plan
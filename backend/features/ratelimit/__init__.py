@@ -0,0 +1 @@
+# Rate limiting feature module
@@ -0,0 +1,145 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketBackend:
+    """
+    Storage for token buckets, keyed by an opaque string.
+
+    A bucket holds up to ``capacity`` tokens and refills at ``rate`` tokens
+    per second. ``acquire`` takes ``cost`` tokens if available and returns 0,
+    otherwise it takes nothing and returns the seconds until enough tokens
+    will have refilled.
+    """
+
+    async def acquire(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        raise NotImplementedError
+
+
+class InMemoryTokenBucketBackend(TokenBucketBackend):
+    """
+    Process-local token buckets in an LRU capped at ``max_keys``.
+
+    A bucket left alone until it refills completely is indistinguishable
+    from one that was never created, so such buckets are dropped from the
+    cold end of the LRU as new keys arrive; memory tracks the keys active
+    within one refill period rather than every key ever seen. When the cap
+    is hit anyway, the least recently used bucket is evicted, which at worst
+    lets that key start over with a full burst.
+
+    Also serves as the local fake of a shared backend in tests; pass a
+    ``clock`` to control time.
+    """
+
+    # Idle buckets dropped per acquire, keeping each call O(1)
+    _PRUNE_PER_CALL = 2
+
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self.evictions = 0
+        # key -> [tokens, updated_at, full_at]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    async def acquire(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        now = self.clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = capacity
+            self._prune(now)
+        else:
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+
+        if tokens >= cost:
+            tokens -= cost
+            wait = 0.0
+        else:
+            wait = (cost - tokens) / rate
+
+        full_at = now + (capacity - tokens) / rate
+        if bucket is None:
+            self._buckets[key] = [tokens, now, full_at]
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            bucket[0], bucket[1], bucket[2] = tokens, now, full_at
+            self._buckets.move_to_end(key)
+        return wait
+
+    def _prune(self, now: float) -> None:
+        for _ in range(self._PRUNE_PER_CALL):
+            if not self._buckets:
+                return
+            oldest_key = next(iter(self._buckets))
+            if self._buckets[oldest_key][2] > now:
+                return
+            del self._buckets[oldest_key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# Refill, take and store in one round trip so concurrent workers can't both
+# spend the same token. Keys expire once the bucket would be full again.
+_ACQUIRE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+if tokens == nil then
+    tokens = capacity
+else
+    tokens = math.min(capacity, tokens + (now - tonumber(state[2])) * rate)
+end
+
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+
+class RedisTokenBucketBackend(TokenBucketBackend):
+    """Token buckets in Redis, so a limit holds across all uvicorn workers."""
+
+    def __init__(self, url: str, prefix: str = "chefmate:ratelimit:"):
+        # Optional dependency: only needed when a Redis URL is configured
+        import redis.asyncio as redis
+
+        self.prefix = prefix
+        self._redis = redis.from_url(url)
+        self._acquire = self._redis.register_script(_ACQUIRE_SCRIPT)
+
+    async def acquire(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        try:
+            wait = await self._acquire(keys=[self.prefix + key], args=[rate, capacity, cost])
+        except Exception as e:
+            # Fail open: an unreachable Redis shouldn't take the API down with it
+            logger.warning(f"Rate limit check for {key} failed, allowing request: {e!r}")
+            return 0.0
+        return float(wait)
+
+
+def create_backend(redis_url: Optional[str], max_keys: int) -> TokenBucketBackend:
+    """Use Redis when a URL is configured and redis is installed, else in-process."""
+    if redis_url:
+        try:
+            return RedisTokenBucketBackend(redis_url)
+        except ImportError:
+            logger.warning("RATE_LIMIT_REDIS_URL is set but redis is not installed; using in-process buckets")
+    return InMemoryTokenBucketBackend(max_keys=max_keys)
@@ -0,0 +1,102 @@
+"""
+Token-bucket rate limits as FastAPI dependencies.
+
+Each router declares its own ``RateLimit`` with ``RateLimit.from_env``, so
+limits are configured separately per router::
+
+    rate_limit = RateLimit.from_env("planner", per_minute=120, burst=30)
+
+    @router.post("", dependencies=[Depends(rate_limit.user)])
+
+``rate_limit.user`` keys buckets by Firebase uid (it depends on
+``get_current_user``, which FastAPI resolves once per request, so there's no
+second token verification). Routes authenticated some other way call
+``rate_limit.check(key)`` from their own dependency, after verifying the
+caller.
+"""
+import hashlib
+import math
+import os
+from typing import Optional
+
+from fastapi import Depends, HTTPException, status
+
+from features.auth.firebase import get_current_user
+from features.observability.metrics import registry
+from features.ratelimit.backends import InMemoryTokenBucketBackend, TokenBucketBackend, create_backend
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+
+backend: TokenBucketBackend = create_backend(RATE_LIMIT_REDIS_URL, RATE_LIMIT_MAX_KEYS)
+
+rate_limit_rejections = registry.counter(
+    "rate_limit_rejections_total", "Requests rejected by a rate limit.", ("limit",))
+
+
+def _backend_metrics():
+    if not isinstance(backend, InMemoryTokenBucketBackend):
+        return []
+    return [
+        ("rate_limit_buckets", "Token buckets held in this process.", "gauge", [({}, len(backend))]),
+        ("rate_limit_evictions_total", "Active buckets evicted because the key cap was reached.",
+         "counter", [({}, backend.evictions)]),
+    ]
+
+
+registry.register_collector(_backend_metrics)
+
+
+def hash_key(secret: str) -> str:
+    """Stable, non-reversible bucket key for a secret such as an agent key."""
+    return hashlib.sha256(secret.encode()).hexdigest()[:16]
+
+
+class RateLimit:
+    """
+    A named limit of ``per_minute`` requests with bursts of up to ``burst``.
+
+    ``per_minute <= 0`` disables the limit. Buckets live in the shared
+    ``backend`` under ``<name>:<key>``, so each limit counts separately.
+    """
+
+    def __init__(self, name: str, per_minute: float, burst: int,
+                 backend: Optional[TokenBucketBackend] = None, enabled: bool = True):
+        self.name = name
+        self.per_minute = per_minute
+        self.burst = max(1, burst)
+        self.enabled = enabled and per_minute > 0
+        self._backend = backend
+
+    @classmethod
+    def from_env(cls, name: str, per_minute: float, burst: int) -> "RateLimit":
+        """
+        Build the limit for a router from ``RATE_LIMIT_<NAME>_PER_MINUTE`` and
+        ``RATE_LIMIT_<NAME>_BURST``, falling back to the given defaults.
+        """
+        prefix = f"RATE_LIMIT_{name.upper()}"
+        return cls(
+            name,
+            per_minute=float(os.getenv(f"{prefix}_PER_MINUTE", str(per_minute))),
+            burst=int(os.getenv(f"{prefix}_BURST", str(burst))),
+            enabled=RATE_LIMIT_ENABLED,
+        )
+
+    async def check(self, key: str) -> None:
+        """Spend one token from ``key``'s bucket or raise 429 with Retry-After."""
+        if not self.enabled:
+            return
+        wait = await (self._backend or backend).acquire(
+            f"{self.name}:{key}", rate=self.per_minute / 60, capacity=self.burst)
+        if wait > 0:
+            rate_limit_rejections.inc(self.name)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
+    async def user(self, user: dict = Depends(get_current_user)) -> None:
+        """Dependency limiting the authenticated user by uid."""
+        await self.check(user["uid"])
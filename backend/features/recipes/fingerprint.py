@@ -0,0 +1,56 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from features.recipes.ingredients import normalize_ingredient_name
+from features.recipes.units import normalize_unit, parse_amount
+
+
+def _normalize_text(value: Any) -> str:
+    return " ".join(str(value or "").lower().split())
+
+
+def recipe_content_hash(recipe: Dict[str, Any]) -> str:
+    """
+    Canonical hash of what makes two recipes the same dish.
+
+    Covers the title, ingredients and instructions, normalized so that case,
+    whitespace, ingredient order, plural/synonym spellings ("Scallions" vs
+    "green onion") and amount formatting ("1/2" vs 0.5) don't matter.
+    Description, times and servings are left out: re-saving a recipe with a
+    reworded blurb is still a re-save.
+    """
+    ingredients = []
+    for ingredient in recipe.get("ingredients") or []:
+        if isinstance(ingredient, str):
+            ingredient = {"name": ingredient}
+        amount = parse_amount(ingredient.get("amount"))
+        ingredients.append([
+            normalize_ingredient_name(ingredient.get("name") or ""),
+            amount if amount is not None else _normalize_text(ingredient.get("amount")),
+            normalize_unit(ingredient.get("unit")) or "",
+        ])
+    ingredients.sort(key=lambda item: json.dumps(item))
+
+    canonical = json.dumps(
+        {
+            "title": _normalize_text(recipe.get("title")),
+            "ingredients": ingredients,
+            "instructions": [_normalize_text(step) for step in recipe.get("instructions") or []],
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def recipe_doc_id(user_id: str, content_hash: str, idempotency_key: Optional[str] = None) -> str:
+    """
+    Deterministic recipe document ID for a user's recipe.
+
+    Derived from the Idempotency-Key when the client sends one (a retried
+    request maps to the same document even if its body changed), otherwise
+    from the content hash (the same recipe saved twice maps to one document).
+    """
+    source = f"key:{idempotency_key}" if idempotency_key else f"content:{content_hash}"
+    return hashlib.sha256(f"{user_id}\0{source}".encode("utf-8")).hexdigest()[:32]
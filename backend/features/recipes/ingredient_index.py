@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Any, FrozenSet, List, Optional, Set, Tuple
+
+from features.database.firestore import get_user_recipes
+from features.recipes.ingredients import ingredient_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class UserIngredientIndex:
+    """
+    Inverted index from ingredient token to recipe IDs for one user.
+
+    Each recipe also keeps the token set of every ingredient, so coverage
+    can be scored for the few candidate recipes without touching the rest.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Set[str]] = {}
+        self.recipes: Dict[str, Tuple[str, List[Tuple[str, FrozenSet[str]]]]] = {}
+        self.built_at = time.monotonic()
+
+    def add(self, recipe_id: str, recipe: Dict[str, Any]) -> None:
+        if recipe_id in self.recipes:
+            self.remove(recipe_id)
+
+        ingredients = []
+        for ingredient in recipe.get('ingredients') or []:
+            name = ingredient.get('name') if isinstance(ingredient, dict) else ingredient
+            if not isinstance(name, str):
+                continue
+            tokens = ingredient_tokens(name)
+            if not tokens:
+                continue
+            ingredients.append((name, tokens))
+            for token in tokens:
+                self.postings.setdefault(token, set()).add(recipe_id)
+
+        self.recipes[recipe_id] = (recipe.get('title', ''), ingredients)
+
+    def remove(self, recipe_id: str) -> None:
+        entry = self.recipes.pop(recipe_id, None)
+        if entry is None:
+            return
+        for _, tokens in entry[1]:
+            for token in tokens:
+                posting = self.postings.get(token)
+                if posting is not None:
+                    posting.discard(recipe_id)
+                    if not posting:
+                        del self.postings[token]
+
+    def _recipes_with(self, tokens: FrozenSet[str]) -> Set[str]:
+        """Recipes containing every token, intersecting smallest postings first."""
+        postings = sorted((self.postings.get(token, set()) for token in tokens), key=len)
+        if not postings or not postings[0]:
+            return set()
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+        return result
+
+    def search(self, have: List[str], limit: int) -> List[Dict[str, Any]]:
+        """
+        Rank recipes by how well the ingredients in ``have`` cover them.
+
+        Recipes are ordered by the number of ``have`` items they use, then by
+        the fraction of their own ingredients that ``have`` covers.
+        """
+        wanted = [(name, ingredient_tokens(name)) for name in have]
+        wanted = [(name, tokens) for name, tokens in wanted if tokens]
+
+        candidates: Dict[str, int] = {}
+        for _, tokens in wanted:
+            for recipe_id in self._recipes_with(tokens):
+                candidates[recipe_id] = candidates.get(recipe_id, 0) + 1
+
+        results = []
+        for recipe_id, used in candidates.items():
+            title, ingredients = self.recipes[recipe_id]
+            matched, missing = [], []
+            for name, tokens in ingredients:
+                if any(wanted_tokens <= tokens for _, wanted_tokens in wanted):
+                    matched.append(name)
+                else:
+                    missing.append(name)
+            coverage = len(matched) / len(ingredients) if ingredients else 0.0
+            results.append({
+                "id": recipe_id,
+                "title": title,
+                "matched": matched,
+                "missing": missing,
+                "coverage": round(coverage, 4),
+                "_used": used,
+            })
+
+        results.sort(key=lambda r: (r["_used"], r["coverage"]), reverse=True)
+        for result in results:
+            del result["_used"]
+        return results[:limit]
+
+
+class IngredientIndexRegistry:
+    """
+    Per-user ingredient indexes, built lazily and kept up to date in-process.
+
+    A user's index is built from ``get_user_recipes`` on their first search,
+    then updated incrementally as recipes are saved through this worker. Since
+    other workers may also write recipes, an index is rebuilt once it is older
+    than ``ttl`` seconds. At most ``max_users`` indexes are kept (LRU).
+    """
+
+    def __init__(self, max_users: int = 1000, ttl: float = 600.0):
+        self.max_users = max_users
+        self.ttl = ttl
+        self._indexes: "OrderedDict[str, UserIngredientIndex]" = OrderedDict()
+        self._build_locks: Dict[str, asyncio.Lock] = {}
+
+    def _fresh(self, user_id: str) -> Optional[UserIngredientIndex]:
+        index = self._indexes.get(user_id)
+        if index is None:
+            return None
+        if time.monotonic() - index.built_at > self.ttl:
+            del self._indexes[user_id]
+            return None
+        self._indexes.move_to_end(user_id)
+        return index
+
+    async def get(self, user_id: str) -> UserIngredientIndex:
+        """Return the user's index, building it from Firestore if needed."""
+        index = self._fresh(user_id)
+        if index is not None:
+            return index
+
+        lock = self._build_locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            try:
+                index = self._fresh(user_id)
+                if index is not None:
+                    return index
+
+                index = UserIngredientIndex()
+                for recipe in await get_user_recipes(user_id):
+                    index.add(recipe['id'], recipe)
+
+                self._indexes[user_id] = index
+                while len(self._indexes) > self.max_users:
+                    self._indexes.popitem(last=False)
+                return index
+            finally:
+                # Drop the lock while still holding it, and only if a newer
+                # build hasn't replaced it, so a failed build doesn't leak it
+                if self._build_locks.get(user_id) is lock:
+                    del self._build_locks[user_id]
+
+    def add_recipe(self, user_id: str, recipe_id: str, recipe: Dict[str, Any]) -> None:
+        """Index a newly saved recipe if the user's index is loaded."""
+        index = self._indexes.get(user_id)
+        if index is not None:
+            index.add(recipe_id, recipe)
+
+
+ingredient_indexes = IngredientIndexRegistry(
+    max_users=int(os.getenv("INGREDIENT_INDEX_MAX_USERS", "1000")),
+    ttl=float(os.getenv("INGREDIENT_INDEX_TTL_SECONDS", "600")),
+)
@@ -0,0 +1,114 @@
+import re
+from functools import lru_cache
+from typing import FrozenSet, Iterable
+
+# Common synonyms, mapped to the name used in the index
+SYNONYMS = {
+    "scallion": "green onion",
+    "spring onion": "green onion",
+    "cilantro": "coriander",
+    "courgette": "zucchini",
+    "aubergine": "eggplant",
+    "garbanzo": "chickpea",
+    "garbanzo bean": "chickpea",
+    "capsicum": "bell pepper",
+    "rocket": "arugula",
+    "prawn": "shrimp",
+    "minced beef": "ground beef",
+    "beef mince": "ground beef",
+    "caster sugar": "sugar",
+    "granulated sugar": "sugar",
+    "icing sugar": "powdered sugar",
+    "confectioner sugar": "powdered sugar",
+    "plain flour": "flour",
+    "all purpose flour": "flour",
+    "double cream": "heavy cream",
+    "corn starch": "cornstarch",
+    "cornflour": "cornstarch",
+}
+
+# Preparation and size words that don't change what the ingredient is
+DESCRIPTORS = {
+    "fresh", "freshly", "large", "small", "medium", "chopped", "diced", "minced",
+    "sliced", "grated", "shredded", "crushed", "ground", "peeled", "finely",
+    "roughly", "thinly", "whole", "raw", "cooked", "frozen", "dried", "optional",
+    "to", "taste", "of", "and", "or", "a", "an", "the", "some", "extra", "virgin",
+    "boneless", "skinless", "ripe", "softened", "melted", "beaten",
+}
+
+# Words that keep "ground" meaningful (ground beef is not beef)
+_KEEP_GROUND = {"beef", "pork", "turkey", "chicken", "lamb"}
+
+# Irregular plurals; regular ones are handled by singularize
+IRREGULAR_PLURALS = {
+    "leaves": "leaf",
+    "loaves": "loaf",
+    "halves": "half",
+    "knives": "knife",
+    "potatoes": "potato",
+    "tomatoes": "tomato",
+    "mangoes": "mango",
+    "radishes": "radish",
+    "dishes": "dish",
+    "peaches": "peach",
+    "anchovies": "anchovy",
+    "molasses": "molasses",
+    "couscous": "couscous",
+    "hummus": "hummus",
+    "asparagus": "asparagus",
+    "swiss": "swiss",
+    "oats": "oat",
+}
+
+_NON_WORD = re.compile(r"[^a-z\s]+")
+
+
+def singularize(word: str) -> str:
+    if word in IRREGULAR_PLURALS:
+        return IRREGULAR_PLURALS[word]
+    if len(word) <= 3 or word.endswith("ss") or word.endswith("us"):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("ches", "shes", "xes", "zes")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+@lru_cache(maxsize=8192)
+def normalize_ingredient_name(name: str) -> str:
+    """
+    Normalize an ingredient name for matching.
+
+    Lowercases, strips punctuation and quantities, singularizes plurals,
+    drops preparation words ("fresh", "chopped", ...) and maps common
+    synonyms, e.g. "Fresh Chopped Scallions" -> "green onion".
+    """
+    words = _NON_WORD.sub(" ", name.lower().replace("-", " ")).split()
+    words = [singularize(word) for word in words]
+
+    phrase = " ".join(words)
+    if phrase in SYNONYMS:
+        return SYNONYMS[phrase]
+
+    kept = []
+    for i, word in enumerate(words):
+        if word == "ground" and i + 1 < len(words) and words[i + 1] in _KEEP_GROUND:
+            kept.append(word)
+        elif word not in DESCRIPTORS:
+            kept.append(word)
+
+    normalized = " ".join(kept)
+    return SYNONYMS.get(normalized, normalized)
+
+
+def ingredient_tokens(name: str) -> FrozenSet[str]:
+    """Index tokens for an ingredient name, e.g. "green onion" -> {"green", "onion"}."""
+    return frozenset(normalize_ingredient_name(name).split())
+
+
+def parse_ingredient_list(value: str) -> Iterable[str]:
+    """Split a comma-separated query such as ``eggs, spinach`` into names."""
+    return [item.strip() for item in value.split(",") if item.strip()]
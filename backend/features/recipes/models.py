@@ -75,3 +75,82 @@ class RecipeResponse(BaseModel):
     cookTime: Optional[int] = None
     servings: Optional[int] = None
     createdAt: str  # ISO format datetime string
+
+
+class ScaledIngredient(Ingredient):
+    """Ingredient with its amount rounded for the kitchen, e.g. amountText "1 1/2" """
+    amountText: Optional[str] = None
+
+
+class ScaledRecipeResponse(RecipeResponse):
+    """Recipe rescaled to ``servings`` and converted to the ``units`` system"""
+    ingredients: List[ScaledIngredient]
+    originalServings: Optional[int] = None
+    units: Optional[str] = None
+
+
+class RecipeSummary(BaseModel):
+    """Projected recipe for list views"""
+    id: str
+    title: str
+    prepTime: Optional[int] = None
+    cookTime: Optional[int] = None
+    servings: Optional[int] = None
+    createdAt: str  # ISO format datetime string
+
+
+class RecipeListResponse(BaseModel):
+    """One page of recipes. Pass nextCursor back as ``cursor`` for the next page."""
+    recipes: List[RecipeSummary]
+    nextCursor: Optional[str] = None
+
+
+class IngredientMatch(BaseModel):
+    """A recipe that can be (partly) cooked with the given ingredients"""
+    id: str
+    title: str
+    matched: List[str]
+    missing: List[str]
+    coverage: float  # fraction of the recipe's ingredients covered
+
+
+class IngredientSearchResponse(BaseModel):
+    """Recipes ranked by ingredient coverage"""
+    results: List[IngredientMatch]
+
+
+class TextMatch(BaseModel):
+    """A recipe matching a full-text query"""
+    id: str
+    title: str
+    score: float
+
+
+class TextSearchResponse(BaseModel):
+    """Recipes ranked by BM25 relevance"""
+    results: List[TextMatch]
+
+
+class RecipeBatchCreate(BaseModel):
+    """Bulk recipe creation request. Items are validated individually so one
+    bad recipe does not reject the whole batch."""
+    recipes: List[Dict[str, Any]] = Field(..., min_length=1)
+
+
+class RecipeBatchCreated(BaseModel):
+    """A recipe from the batch that was written (or already existed, if duplicate)"""
+    index: int
+    id: str
+    duplicate: bool = False
+
+
+class RecipeBatchFailure(BaseModel):
+    """A recipe from the batch that was rejected or failed to write"""
+    index: int
+    error: str
+
+
+class RecipeBatchResponse(BaseModel):
+    """Bulk recipe creation result, with positions referring to the request"""
+    created: List[RecipeBatchCreated]
+    failed: List[RecipeBatchFailure]
@@ -1,14 +1,49 @@
+import base64
+import hashlib
+import json
 import os
 import secrets
+from typing import Dict, List, Literal, Optional, Tuple, Union
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from pydantic import ValidationError
 
 from features.auth.firebase import get_current_user
-from features.database.firestore import save_recipe, get_recipe
-from features.recipes.models import RecipeCreate, RecipeResponse
+from features.database.firestore import get_recipe, get_recipes, save_recipe_once, save_recipes, list_user_recipes
+from features.database.timestamps import to_datetime, to_iso
+from features.events.hub import event_hub
+from features.recipes.fingerprint import recipe_content_hash, recipe_doc_id
+from features.recipes.ingredient_index import ingredient_indexes
+from features.recipes.ingredients import parse_ingredient_list
+from features.recipes.scaling import scale_ingredients, scaled_recipes
+from features.recipes.text_index import text_indexes
+from features.observability.router import verify_debug_endpoint_key
+from features.ratelimit.limiter import RateLimit, hash_key
+from features.recipes.models import (
+    RecipeCreate,
+    RecipeResponse,
+    RecipeBatchCreate,
+    RecipeBatchCreated,
+    RecipeBatchFailure,
+    RecipeBatchResponse,
+    RecipeListResponse,
+    RecipeSummary,
+    ScaledRecipeResponse,
+    IngredientSearchResponse,
+    TextSearchResponse,
+)
 
 router = APIRouter(prefix="/recipes", tags=["Recipes"])
 
+RECIPES_BATCH_MAX_SIZE = int(os.getenv("RECIPES_BATCH_MAX_SIZE", "5000"))
+
+rate_limit = RateLimit.from_env("recipes", per_minute=120, burst=30)
+agent_rate_limit = RateLimit.from_env("recipes_agent", per_minute=60, burst=20)
+
+# Fields fetched for list views (createdAt is needed for the page cursor)
+SUMMARY_FIELDS = ['title', 'prepTime', 'cookTime', 'servings', 'createdAt']
+
 
 async def verify_agent_endpoint_key(request: Request):
     """
@@ -40,53 +75,33 @@ async def verify_agent_endpoint_key(request: Request):
     return True
 
 
-def _save_and_return_recipe(recipe_dict: dict, user_id: str) -> RecipeResponse:
+async def agent_rate_limited(request: Request, _: bool = Depends(verify_agent_endpoint_key)):
+    """
+    Limit agent routes per agent key. Runs after the key is verified, so
+    unauthenticated callers can't fill the limiter with buckets.
+    """
+    await agent_rate_limit.check(hash_key(request.headers["discover-agent-endpoint-key"]))
+
+
+async def _save_and_return_recipe(
+    recipe_dict: dict, user_id: str, response: Response, idempotency_key: Optional[str] = None
+) -> RecipeResponse:
     """
     Helper function to save a recipe and return the response.
     Reused by both user and agent endpoints.
+
+    Creates are idempotent: the document ID is derived from the
+    Idempotency-Key, or else from the recipe's content hash, so saving the
+    same recipe again returns the stored one (200 instead of 201) without
+    a write. The response for a new recipe is built from the data just
+    written plus the write's commit time, so no read-back is needed.
     """
+    recipe_dict['contentHash'] = recipe_content_hash(recipe_dict)
+    recipe_id = recipe_doc_id(user_id, recipe_dict['contentHash'], idempotency_key)
+
     try:
         # Save to Firestore
-        recipe_id = save_recipe(recipe_dict, user_id)
-        
-        # Fetch the saved recipe to get the timestamp
-        saved_recipe = get_recipe(recipe_id)
-        
-        if not saved_recipe:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to retrieve saved recipe"
-            )
-        
-        # Convert Firestore timestamp to ISO string
-        created_at = saved_recipe.get('createdAt')
-        if created_at is None:
-            created_at_str = datetime.now().isoformat()
-        elif hasattr(created_at, 'to_datetime'):
-            # Firestore Timestamp object
-            created_at_str = created_at.to_datetime().isoformat()
-        elif isinstance(created_at, datetime):
-            created_at_str = created_at.isoformat()
-        else:
-            # Fallback: try to convert to datetime
-            try:
-                created_at_str = datetime.fromtimestamp(created_at).isoformat()
-            except (TypeError, ValueError):
-                created_at_str = datetime.now().isoformat()
-        
-        # Return recipe response
-        return RecipeResponse(
-            id=recipe_id,
-            userId=saved_recipe['userId'],
-            title=saved_recipe['title'],
-            description=saved_recipe.get('description', ''),
-            ingredients=saved_recipe['ingredients'],
-            instructions=saved_recipe['instructions'],
-            prepTime=saved_recipe.get('prepTime'),
-            cookTime=saved_recipe.get('cookTime'),
-            servings=saved_recipe.get('servings'),
-            createdAt=created_at_str,
-        )
+        stored, created_at, created = await save_recipe_once(recipe_dict, user_id, recipe_id)
     except HTTPException:
         raise
     except Exception as e:
@@ -95,16 +110,49 @@ def _save_and_return_recipe(recipe_dict: dict, user_id: str) -> RecipeResponse:
             detail=f"Failed to save recipe: {str(e)}"
         )
 
+    if created:
+        ingredient_indexes.add_recipe(user_id, recipe_id, stored)
+        text_indexes.add_recipe(user_id, recipe_id, stored)
+        scaled_recipes.invalidate(recipe_id)
+        event_hub.publish(user_id, "recipe.created", {"id": recipe_id, "title": stored.get('title')})
+    else:
+        response.status_code = status.HTTP_200_OK
+    return _recipe_response(recipe_id, stored, created_at)
+
+
+def _recipe_response(recipe_id: str, recipe: dict, created_at=None) -> RecipeResponse:
+    """Build a RecipeResponse from Firestore recipe data."""
+    if created_at is None:
+        created_at = recipe.get('createdAt')
 
-@router.post("", response_model=RecipeResponse, status_code=status.HTTP_201_CREATED)
+    return RecipeResponse(
+        id=recipe_id,
+        userId=recipe['userId'],
+        title=recipe['title'],
+        description=recipe.get('description', ''),
+        ingredients=recipe['ingredients'],
+        instructions=recipe['instructions'],
+        prepTime=recipe.get('prepTime'),
+        cookTime=recipe.get('cookTime'),
+        servings=recipe.get('servings'),
+        createdAt=to_iso(created_at),
+    )
+
+
+@router.post("", response_model=RecipeResponse, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(rate_limit.user)])
 async def create_recipe(
     recipe: RecipeCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
     user: dict = Depends(get_current_user)
 ):
     """
     Create a new recipe.
     
     The userId in the recipe must match the authenticated user's ID.
+    Re-saving the same recipe (or retrying with the same Idempotency-Key)
+    returns the existing recipe with 200.
     """
     user_id = user.get('uid') or user.get('user_id')
     
@@ -119,20 +167,23 @@ async def create_recipe(
     recipe_dict = recipe.model_dump()
     
     # Save and return recipe using shared helper function
-    return _save_and_return_recipe(recipe_dict, user_id)
+    return await _save_and_return_recipe(recipe_dict, user_id, response, idempotency_key)
 
 
 @router.post("/agent", response_model=RecipeResponse, status_code=status.HTTP_201_CREATED)
 async def create_recipe_agent(
     recipe: RecipeCreate,
     request: Request,
-    _: bool = Depends(verify_agent_endpoint_key)
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    _: None = Depends(agent_rate_limited)
 ):
     """
     Create a new recipe via AI agent.
     
     This endpoint is for private AI agents only and uses header-based authentication.
     The request must include the discover-agent-endpoint-key header.
+    Saving the same recipe again returns the existing one with 200.
     """
     # Convert Pydantic model to dict for Firestore
     recipe_dict = recipe.model_dump()
@@ -141,4 +192,332 @@ async def create_recipe_agent(
     user_id = recipe.userId
     
     # Save and return recipe using shared helper function
-    return _save_and_return_recipe(recipe_dict, user_id)
+    return await _save_and_return_recipe(recipe_dict, user_id, response, idempotency_key)
+
+
+def _validation_message(error: ValidationError) -> str:
+    """Flatten a pydantic ValidationError into one readable line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'recipe'}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+async def _save_recipe_batch(batch: RecipeBatchCreate, user_id: Optional[str]) -> RecipeBatchResponse:
+    """
+    Validate every recipe in one pass, then write the valid ones in batches.
+
+    Args:
+        batch: Raw batch request
+        user_id: Authenticated user ID that every recipe must belong to,
+            or None for the agent endpoint (recipes keep their own userId)
+    """
+    if len(batch.recipes) > RECIPES_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds the maximum of {RECIPES_BATCH_MAX_SIZE} recipes"
+        )
+
+    valid_positions = []
+    recipe_dicts = []
+    failed = []
+    for index, raw_recipe in enumerate(batch.recipes):
+        try:
+            recipe = RecipeCreate.model_validate(raw_recipe)
+        except ValidationError as e:
+            failed.append(RecipeBatchFailure(index=index, error=_validation_message(e)))
+            continue
+
+        if user_id is not None and recipe.userId != user_id:
+            failed.append(RecipeBatchFailure(
+                index=index,
+                error="Recipe userId must match authenticated user"
+            ))
+            continue
+
+        valid_positions.append(index)
+        recipe_dicts.append(recipe.model_dump())
+
+    # Deterministic IDs make the batch idempotent: recipes that already
+    # exist (checked with one batched read) are reported as duplicates
+    # instead of being written again. A recipe repeated within the batch is
+    # written once; its repeats share the first copy's outcome, so they're
+    # only duplicates if that write succeeded
+    recipe_ids = []
+    for recipe_dict in recipe_dicts:
+        recipe_dict['contentHash'] = recipe_content_hash(recipe_dict)
+        recipe_ids.append(recipe_doc_id(recipe_dict['userId'], recipe_dict['contentHash']))
+    existing = await get_recipes(recipe_ids) if recipe_ids else {}
+
+    created = []
+    new_positions = []
+    repeats: Dict[str, List[int]] = {}
+    for position, recipe_id in enumerate(recipe_ids):
+        if recipe_id in existing:
+            created.append(RecipeBatchCreated(index=valid_positions[position], id=recipe_id, duplicate=True))
+        elif recipe_id in repeats:
+            repeats[recipe_id].append(valid_positions[position])
+        else:
+            repeats[recipe_id] = []
+            new_positions.append(position)
+
+    if new_positions:
+        saved, write_failures = await save_recipes(
+            [recipe_dicts[position] for position in new_positions],
+            [recipe_ids[position] for position in new_positions],
+        )
+        created_per_user: Dict[str, int] = {}
+        for new_position, recipe_id in saved:
+            recipe_dict = recipe_dicts[new_positions[new_position]]
+            ingredient_indexes.add_recipe(recipe_dict['userId'], recipe_id, recipe_dict)
+            text_indexes.add_recipe(recipe_dict['userId'], recipe_id, recipe_dict)
+            scaled_recipes.invalidate(recipe_id)
+            created_per_user[recipe_dict['userId']] = created_per_user.get(recipe_dict['userId'], 0) + 1
+        # One event per user and batch, however many recipes it held
+        for owner_id, count in created_per_user.items():
+            event_hub.publish(owner_id, "recipes.created", {"count": count})
+        for new_position, recipe_id in saved:
+            created.append(RecipeBatchCreated(index=valid_positions[new_positions[new_position]], id=recipe_id))
+            created.extend(
+                RecipeBatchCreated(index=index, id=recipe_id, duplicate=True)
+                for index in repeats[recipe_id]
+            )
+        for new_position, error in write_failures:
+            position = new_positions[new_position]
+            failed.append(RecipeBatchFailure(index=valid_positions[position], error=error))
+            failed.extend(
+                RecipeBatchFailure(index=index, error=error)
+                for index in repeats[recipe_ids[position]]
+            )
+
+    created.sort(key=lambda item: item.index)
+
+    failed.sort(key=lambda failure: failure.index)
+    return RecipeBatchResponse(created=created, failed=failed)
+
+
+@router.post("/batch", response_model=RecipeBatchResponse, status_code=status.HTTP_201_CREATED,
+             dependencies=[Depends(rate_limit.user)])
+async def create_recipes_batch(
+    batch: RecipeBatchCreate,
+    user: dict = Depends(get_current_user)
+):
+    """
+    Create many recipes at once.
+
+    Every recipe's userId must match the authenticated user. Invalid recipes
+    are reported in ``failed`` without blocking the rest of the batch.
+    """
+    user_id = user.get('uid') or user.get('user_id')
+    return await _save_recipe_batch(batch, user_id)
+
+
+@router.post("/agent/batch", response_model=RecipeBatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_recipes_batch_agent(
+    batch: RecipeBatchCreate,
+    _: None = Depends(agent_rate_limited)
+):
+    """
+    Create many recipes at once via AI agent.
+
+    Uses the same header-based authentication as ``POST /recipes/agent``.
+    """
+    return await _save_recipe_batch(batch, None)
+
+
+def _encode_cursor(created_at: datetime, recipe_id: str) -> str:
+    payload = json.dumps({"t": created_at.isoformat(), "id": recipe_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), payload["id"]
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+@router.get("", response_model=RecipeListResponse,
+            dependencies=[Depends(rate_limit.user)])
+async def list_recipes(
+    request: Request,
+    response: Response,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    user: dict = Depends(get_current_user)
+):
+    """
+    List the authenticated user's recipes, newest first, one page at a time.
+
+    Returns projected summaries (title, times and servings). The ETag covers
+    the IDs and update times of the page, so a client sending it back in
+    If-None-Match gets 304 when nothing on the page changed.
+    """
+    user_id = user.get('uid') or user.get('user_id')
+    start_after = _decode_cursor(cursor) if cursor else None
+
+    # Fetch one extra recipe to learn whether there is a next page
+    page = await list_user_recipes(user_id, limit + 1, SUMMARY_FIELDS, start_after)
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    fingerprint = hashlib.sha256()
+    fingerprint.update(f"{cursor or ''}|{limit}|{has_more}".encode())
+    for recipe, update_time in page:
+        fingerprint.update(f"|{recipe['id']}:{to_iso(update_time)}".encode())
+    etag = f'W/"{fingerprint.hexdigest()[:32]}"'
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+
+    summaries = [
+        RecipeSummary(
+            id=recipe['id'],
+            title=recipe.get('title', ''),
+            prepTime=recipe.get('prepTime'),
+            cookTime=recipe.get('cookTime'),
+            servings=recipe.get('servings'),
+            createdAt=to_iso(recipe.get('createdAt')),
+        )
+        for recipe, _ in page
+    ]
+
+    next_cursor = None
+    if has_more and page:
+        last_recipe = page[-1][0]
+        last_created_at = to_datetime(last_recipe.get('createdAt'))
+        if last_created_at is not None:
+            next_cursor = _encode_cursor(last_created_at, last_recipe['id'])
+
+    return RecipeListResponse(recipes=summaries, nextCursor=next_cursor)
+
+
+async def _search(user_id: str, q: Optional[str], have: Optional[str], limit: int):
+    """
+    Run a full-text (``q``) or ingredient (``have``) search for a user.
+
+    Both are served from in-process indexes that are built on first use.
+    """
+    if q and have:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Use either 'q' or 'have', not both"
+        )
+
+    if q:
+        results = await text_indexes.search(user_id, q, limit)
+        return TextSearchResponse(results=results)
+
+    have_items = parse_ingredient_list(have or "")
+    if not have_items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide a query in 'q' or at least one ingredient in 'have'"
+        )
+
+    index = await ingredient_indexes.get(user_id)
+    return IngredientSearchResponse(results=index.search(have_items, limit))
+
+
+@router.get("/search", response_model=Union[TextSearchResponse, IngredientSearchResponse],
+            dependencies=[Depends(rate_limit.user)])
+async def search_recipes(
+    q: Optional[str] = Query(None, description="Words to find, e.g. keto or italian"),
+    have: Optional[str] = Query(None, description="Comma-separated ingredients, e.g. eggs,spinach"),
+    limit: int = Query(10, ge=1, le=50),
+    user: dict = Depends(get_current_user)
+):
+    """
+    Search the authenticated user's recipes.
+
+    With ``q``, ranks recipes by BM25 relevance over title, description and
+    instructions. With ``have``, ranks recipes by how many of the given
+    ingredients they use and how much of the recipe those cover.
+    """
+    user_id = user.get('uid') or user.get('user_id')
+    return await _search(user_id, q, have, limit)
+
+
+@router.get("/agent/search", response_model=Union[TextSearchResponse, IngredientSearchResponse])
+async def search_recipes_agent(
+    userId: str,
+    q: Optional[str] = None,
+    have: Optional[str] = None,
+    limit: int = Query(5, ge=1, le=50),
+    _: None = Depends(agent_rate_limited)
+):
+    """
+    Search a user's recipes via AI agent.
+
+    Same as ``GET /recipes/search`` but authenticated with the
+    discover-agent-endpoint-key header, with the user passed as ``userId``
+    and a smaller default page suited to tool calls.
+    """
+    return await _search(userId, q, have, limit)
+
+
+@router.get("/search/stats", dependencies=[Depends(verify_debug_endpoint_key)])
+async def get_search_stats():
+    """
+    Shard count, memory estimate and query latency percentiles of the text index.
+    Requires the debug-endpoint-key header, like the other debug endpoints.
+    """
+    return text_indexes.stats()
+
+
+def _scaled_view(recipe: dict, servings: Optional[int], units: Optional[str]) -> dict:
+    """Build the JSON of a recipe scaled to ``servings`` in the ``units`` system."""
+    original_servings = recipe.get('servings')
+    if servings is not None and not original_servings:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Recipe has no servings to scale from"
+        )
+    factor = servings / original_servings if servings else 1.0
+
+    view = _recipe_response(recipe['id'], recipe).model_dump()
+    view.update(
+        ingredients=scale_ingredients(recipe['ingredients'], factor, units),
+        servings=servings or original_servings,
+        originalServings=original_servings,
+        units=units,
+    )
+    return ScaledRecipeResponse.model_validate(view).model_dump(mode="json")
+
+
+@router.get("/{recipe_id}", response_model=ScaledRecipeResponse,
+            dependencies=[Depends(rate_limit.user)])
+async def get_scaled_recipe(
+    recipe_id: str,
+    servings: Optional[int] = Query(None, ge=1, le=100),
+    units: Optional[Literal["metric", "imperial"]] = None,
+    user: dict = Depends(get_current_user)
+):
+    """
+    Get one of the user's recipes, rescaled to ``servings`` and converted to
+    ``units`` (metric or imperial; stored units if omitted).
+
+    Amounts are rounded to what a cook would measure. Views are cached per
+    recipe, servings and unit system for a couple of minutes
+    (``SCALED_RECIPE_CACHE_TTL_SECONDS``), so repeated lookups while cooking
+    don't touch Firestore.
+    """
+    user_id = user.get('uid') or user.get('user_id')
+
+    view = scaled_recipes.get(recipe_id, servings, units)
+    if view is None:
+        recipe = await get_recipe(recipe_id)
+        if recipe is None or recipe.get('userId') != user_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recipe not found")
+        view = _scaled_view(recipe, servings, units)
+        scaled_recipes.set(recipe_id, servings, units, view)
+    elif view['userId'] != user_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recipe not found")
+
+    return view
@@ -0,0 +1,117 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from features.observability.metrics import registry
+from features.recipes.units import convert, kitchen_round, parse_amount
+
+SCALED_RECIPE_CACHE_SIZE = int(os.getenv("SCALED_RECIPE_CACHE_SIZE", "5000"))
+SCALED_RECIPE_CACHE_TTL_SECONDS = float(os.getenv("SCALED_RECIPE_CACHE_TTL_SECONDS", "120"))
+
+ScaledKey = Tuple[str, Optional[int], Optional[str]]
+
+
+def scale_ingredients(
+    ingredients: List[Any], factor: float, units: Optional[str]
+) -> List[Dict[str, Any]]:
+    """
+    Multiply ingredient amounts by ``factor``, convert them to the ``units``
+    system ("metric" or "imperial"; None keeps the stored units) and round
+    them for the kitchen.
+
+    Ingredients without a parseable amount ("a pinch") pass through as-is.
+    """
+    scaled = []
+    for ingredient in ingredients:
+        if isinstance(ingredient, str):
+            ingredient = {"name": ingredient}
+        amount = parse_amount(ingredient.get("amount"))
+        unit = ingredient.get("unit")
+        if amount is None:
+            scaled.append({"name": ingredient["name"], "amount": None, "unit": unit, "amountText": None})
+            continue
+        amount *= factor
+        if units:
+            amount, unit = convert(amount, unit, units)
+        amount, text = kitchen_round(amount, unit)
+        scaled.append({"name": ingredient["name"], "amount": amount, "unit": unit, "amountText": text})
+    return scaled
+
+
+class ScaledRecipeCache:
+    """
+    Bounded LRU of scaled recipe views keyed by (recipe, servings, unit system).
+
+    During a cooking session the same view is fetched for every step, so
+    after the first lookup it's served without a Firestore read. Each recipe
+    remembers which variants are cached, and ``invalidate`` drops them all
+    when the backend changes the recipe.
+
+    The app edits and deletes recipes straight in Firestore, without telling
+    the backend, so views also expire ``ttl`` seconds after they were built:
+    that bounds how stale a view can be, and is still far longer than the
+    gap between two steps of a cooking session.
+    """
+
+    def __init__(self, max_size: int = 5000, ttl: float = 120,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        # key -> (expires_at, view)
+        self._entries: "OrderedDict[ScaledKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._variants: Dict[str, Set[ScaledKey]] = {}
+
+    def get(self, recipe_id: str, servings: Optional[int], units: Optional[str]) -> Optional[Dict[str, Any]]:
+        key = (recipe_id, servings, units)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= self.clock():
+            del self._entries[key]
+            self._forget(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, recipe_id: str, servings: Optional[int], units: Optional[str], view: Dict[str, Any]) -> None:
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        key = (recipe_id, servings, units)
+        self._entries[key] = (self.clock() + self.ttl, view)
+        self._entries.move_to_end(key)
+        self._variants.setdefault(recipe_id, set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._forget(self._entries.popitem(last=False)[0])
+
+    def invalidate(self, recipe_id: str) -> None:
+        """Drop every cached view of a recipe."""
+        for key in self._variants.pop(recipe_id, ()):
+            self._entries.pop(key, None)
+
+    def _forget(self, key: ScaledKey) -> None:
+        variants = self._variants.get(key[0])
+        if variants is not None:
+            variants.discard(key)
+            if not variants:
+                del self._variants[key[0]]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+scaled_recipes = ScaledRecipeCache(max_size=SCALED_RECIPE_CACHE_SIZE, ttl=SCALED_RECIPE_CACHE_TTL_SECONDS)
+
+registry.register_collector(lambda: [
+    ("scaled_recipe_cache_hits_total", "Scaled recipe views served from the cache.", "counter",
+     [({}, scaled_recipes.hits)]),
+    ("scaled_recipe_cache_misses_total", "Scaled recipe views that had to be built.", "counter",
+     [({}, scaled_recipes.misses)]),
+    ("scaled_recipe_cache_size", "Scaled recipe views currently cached.", "gauge",
+     [({}, len(scaled_recipes))]),
+])
@@ -0,0 +1,357 @@
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Any, List, Optional
+
+from features.database.firestore import get_user_recipes
+from features.observability.metrics import registry
+from features.recipes.ingredients import singularize
+
+logger = logging.getLogger(__name__)
+
+# Per-field term weights (BM25F-style): a title hit counts most
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "description": 1.5,
+    "instructions": 1.0,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "if",
+    "in", "into", "is", "it", "its", "of", "on", "or", "so", "than", "that",
+    "the", "then", "this", "to", "until", "up", "with", "your", "you", "about",
+    "add", "all", "some", "minute", "minutes",
+}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Rough per-entry costs used to keep shards under the memory budget
+_BYTES_PER_POSTING = 120
+_BYTES_PER_DOC = 400
+
+# Bumped when the snapshot layout changes; other versions are ignored on load
+SNAPSHOT_VERSION = 1
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split into words, drop stopwords and singularize."""
+    return [
+        singularize(word)
+        for word in _WORD.findall(text.lower())
+        if word not in STOPWORDS and len(word) > 1
+    ]
+
+
+class UserTextIndex:
+    """
+    BM25 index over one user's recipe titles, descriptions and instructions.
+
+    Postings map a term to ``{recipe_id: weighted term frequency}``, so adding
+    a recipe only touches its own terms.
+    """
+
+    def __init__(self, built_at: Optional[float] = None):
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.doc_lengths: Dict[str, float] = {}
+        self.titles: Dict[str, str] = {}
+        self.total_length = 0.0
+        self.posting_count = 0
+        # Wall-clock time, so snapshots carry their age across restarts
+        self.built_at = built_at if built_at is not None else time.time()
+        # Start of the TTL; a shard loaded from a snapshot counts from the load
+        self.fresh_since = self.built_at
+        self.last_used = time.monotonic()
+
+    @property
+    def estimated_bytes(self) -> int:
+        return self.posting_count * _BYTES_PER_POSTING + len(self.doc_lengths) * _BYTES_PER_DOC
+
+    def add(self, recipe_id: str, recipe: Dict[str, Any]) -> None:
+        if recipe_id in self.doc_lengths:
+            self.remove(recipe_id)
+
+        frequencies: Dict[str, float] = {}
+        length = 0.0
+        for field, weight in FIELD_WEIGHTS.items():
+            value = recipe.get(field) or ""
+            if isinstance(value, list):
+                value = " ".join(item for item in value if isinstance(item, str))
+            for term in tokenize(value):
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+                length += weight
+
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[recipe_id] = frequency
+        self.posting_count += len(frequencies)
+        self.doc_lengths[recipe_id] = length
+        self.total_length += length
+        self.titles[recipe_id] = recipe.get("title", "")
+
+    def remove(self, recipe_id: str) -> None:
+        length = self.doc_lengths.pop(recipe_id, None)
+        if length is None:
+            return
+        self.total_length -= length
+        self.titles.pop(recipe_id, None)
+        for term in list(self.postings):
+            posting = self.postings[term]
+            if posting.pop(recipe_id, None) is not None:
+                self.posting_count -= 1
+                if not posting:
+                    del self.postings[term]
+
+    def to_snapshot(self) -> Dict[str, Any]:
+        return {
+            "builtAt": self.built_at,
+            "postings": self.postings,
+            "docLengths": self.doc_lengths,
+            "titles": self.titles,
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: Dict[str, Any]) -> "UserTextIndex":
+        shard = cls(built_at=float(data["builtAt"]))
+        shard.postings = {
+            str(term): {str(recipe_id): float(frequency) for recipe_id, frequency in posting.items()}
+            for term, posting in data["postings"].items()
+        }
+        shard.doc_lengths = {str(recipe_id): float(length) for recipe_id, length in data["docLengths"].items()}
+        shard.titles = {str(recipe_id): str(title) for recipe_id, title in data["titles"].items()}
+        shard.total_length = sum(shard.doc_lengths.values())
+        shard.posting_count = sum(len(posting) for posting in shard.postings.values())
+        return shard
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Score recipes matching any query term with BM25, best first."""
+        doc_count = len(self.doc_lengths)
+        if doc_count == 0:
+            return []
+        avg_length = self.total_length / doc_count or 1.0
+
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for recipe_id, frequency in posting.items():
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[recipe_id] / avg_length)
+                scores[recipe_id] = scores.get(recipe_id, 0.0) + idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [
+            {"id": recipe_id, "title": self.titles.get(recipe_id, ""), "score": round(score, 4)}
+            for recipe_id, score in best
+        ]
+
+
+class TextIndexRegistry:
+    """
+    Per-user text index shards with a memory budget and disk snapshots.
+
+    Shards are built lazily from ``get_user_recipes`` and updated
+    incrementally on create. When the estimated size of all shards exceeds
+    ``memory_budget`` bytes, the least recently used shards are evicted;
+    shards idle longer than ``idle_timeout`` are evicted as well. Shards older
+    than ``ttl`` are rebuilt, since other workers may have written recipes.
+    ``save_snapshot``/``load_snapshot`` persist shards across restarts as JSON;
+    snapshotted shards built within ``snapshot_max_age`` are restored and get
+    a fresh ``ttl`` from the load.
+    """
+
+    def __init__(
+        self,
+        memory_budget: int = 64 * 1024 * 1024,
+        idle_timeout: float = 1800.0,
+        ttl: float = 600.0,
+        snapshot_path: Optional[str] = None,
+        snapshot_max_age: float = 86400.0,
+        latency_window: int = 1024,
+    ):
+        self.memory_budget = memory_budget
+        self.idle_timeout = idle_timeout
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self.snapshot_max_age = snapshot_max_age
+        self._shards: "OrderedDict[str, UserTextIndex]" = OrderedDict()
+        self._build_locks: Dict[str, asyncio.Lock] = {}
+        self._latencies_ms: Deque[float] = deque(maxlen=latency_window)
+        self.evictions = 0
+
+    def _fresh(self, user_id: str) -> Optional[UserTextIndex]:
+        shard = self._shards.get(user_id)
+        if shard is None:
+            return None
+        if time.time() - shard.fresh_since > self.ttl:
+            del self._shards[user_id]
+            return None
+        shard.last_used = time.monotonic()
+        self._shards.move_to_end(user_id)
+        return shard
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for user_id in [u for u, s in self._shards.items() if now - s.last_used > self.idle_timeout]:
+            del self._shards[user_id]
+            self.evictions += 1
+
+        total = sum(shard.estimated_bytes for shard in self._shards.values())
+        # Always keep the most recently used shard, even if it alone is over budget
+        while total > self.memory_budget and len(self._shards) > 1:
+            _, shard = self._shards.popitem(last=False)
+            total -= shard.estimated_bytes
+            self.evictions += 1
+
+    async def get(self, user_id: str) -> UserTextIndex:
+        """Return the user's shard, building it from Firestore if needed."""
+        shard = self._fresh(user_id)
+        if shard is not None:
+            return shard
+
+        lock = self._build_locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            try:
+                shard = self._fresh(user_id)
+                if shard is not None:
+                    return shard
+
+                shard = UserTextIndex()
+                for recipe in await get_user_recipes(user_id):
+                    shard.add(recipe['id'], recipe)
+
+                self._shards[user_id] = shard
+                self._evict()
+                return shard
+            finally:
+                # Drop the lock while still holding it, and only if a newer
+                # build hasn't replaced it, so a failed build doesn't leak it
+                if self._build_locks.get(user_id) is lock:
+                    del self._build_locks[user_id]
+
+    def add_recipe(self, user_id: str, recipe_id: str, recipe: Dict[str, Any]) -> None:
+        """Index a newly saved recipe if the user's shard is loaded."""
+        shard = self._shards.get(user_id)
+        if shard is not None:
+            shard.add(recipe_id, recipe)
+            self._evict()
+
+    async def search(self, user_id: str, query: str, limit: int) -> List[Dict[str, Any]]:
+        shard = await self.get(user_id)
+        started = time.perf_counter()
+        results = shard.search(query, limit)
+        self._latencies_ms.append((time.perf_counter() - started) * 1000)
+        return results
+
+    def latency_percentiles(self) -> Dict[str, Optional[float]]:
+        """p50/p95/p99 of recent query latencies (ms), excluding shard builds."""
+        if not self._latencies_ms:
+            return {"p50": None, "p95": None, "p99": None}
+        ordered = sorted(self._latencies_ms)
+
+        def percentile(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 4)
+
+        return {"p50": percentile(0.50), "p95": percentile(0.95), "p99": percentile(0.99)}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "shards": len(self._shards),
+            "estimatedBytes": sum(shard.estimated_bytes for shard in self._shards.values()),
+            "memoryBudget": self.memory_budget,
+            "evictions": self.evictions,
+            "queryLatencyMs": self.latency_percentiles(),
+        }
+
+    def save_snapshot(self) -> None:
+        """
+        Write all shards to ``snapshot_path`` as JSON, atomically.
+
+        Each process writes its own temporary file next to the snapshot and
+        renames it into place, so workers shutting down together don't
+        clobber each other's half-written files. Failures are logged, never
+        raised: a missing snapshot only means a cold index after restart.
+        """
+        if not self.snapshot_path:
+            return
+        directory = os.path.dirname(os.path.abspath(self.snapshot_path))
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=directory, prefix=f"{os.path.basename(self.snapshot_path)}.", suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(
+                    {"version": SNAPSHOT_VERSION,
+                     "shards": {user_id: shard.to_snapshot() for user_id, shard in self._shards.items()}},
+                    f, separators=(",", ":"),
+                )
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception as e:
+            logger.warning(f"Could not save text index snapshot to {self.snapshot_path}: {e!r}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+        logger.info(f"Saved {len(self._shards)} text index shards to {self.snapshot_path}")
+
+    def load_snapshot(self) -> None:
+        """
+        Restore shards from ``snapshot_path``.
+
+        Shards built more than ``snapshot_max_age`` seconds ago are skipped.
+        The rest restart their TTL at load time, so a restore after a long
+        restart may miss recipes other workers wrote since the snapshot, for
+        up to ``snapshot_max_age`` plus ``ttl`` seconds.
+        """
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path) as f:
+                data = json.load(f)
+            if data.get("version") != SNAPSHOT_VERSION:
+                raise ValueError(f"unsupported snapshot version {data.get('version')!r}")
+            shards = {
+                str(user_id): UserTextIndex.from_snapshot(shard)
+                for user_id, shard in data["shards"].items()
+            }
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable text index snapshot: {e!r}")
+            return
+
+        now = time.time()
+        for user_id, shard in shards.items():
+            if now - shard.built_at <= self.snapshot_max_age:
+                shard.fresh_since = now
+                shard.last_used = time.monotonic()
+                self._shards[user_id] = shard
+        self._evict()
+        logger.info(f"Loaded {len(self._shards)} text index shards from {self.snapshot_path}")
+
+
+text_indexes = TextIndexRegistry(
+    memory_budget=int(float(os.getenv("TEXT_INDEX_MEMORY_BUDGET_MB", "64")) * 1024 * 1024),
+    idle_timeout=float(os.getenv("TEXT_INDEX_IDLE_SECONDS", "1800")),
+    ttl=float(os.getenv("TEXT_INDEX_TTL_SECONDS", "600")),
+    snapshot_path=os.getenv("TEXT_INDEX_SNAPSHOT_PATH") or None,
+    snapshot_max_age=float(os.getenv("TEXT_INDEX_SNAPSHOT_MAX_AGE_SECONDS", "86400")),
+)
+
+
+def _text_index_metrics():
+    stats = text_indexes.stats()
+    return [
+        ("text_index_shards", "Per-user full-text index shards in memory.", "gauge", [({}, stats["shards"])]),
+        ("text_index_estimated_bytes", "Estimated memory held by text index shards.", "gauge",
+         [({}, stats["estimatedBytes"])]),
+        ("text_index_evictions_total", "Shards evicted for memory or idleness.", "counter", [({}, stats["evictions"])]),
+    ]
+
+
+registry.register_collector(_text_index_metrics)
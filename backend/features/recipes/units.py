@@ -0,0 +1,209 @@
+import re
+from typing import Any, Optional, Tuple
+
+from features.recipes.ingredients import singularize
+
+# Unit aliases -> (base unit, factor to base). Mass is summed in grams and
+# volume in millilitres; anything else (cloves, cans, ...) is a count unit.
+UNITS = {
+    "mg": ("g", 0.001),
+    "milligram": ("g", 0.001),
+    "g": ("g", 1.0),
+    "gr": ("g", 1.0),
+    "gram": ("g", 1.0),
+    "gramme": ("g", 1.0),
+    "kg": ("g", 1000.0),
+    "kilo": ("g", 1000.0),
+    "kilogram": ("g", 1000.0),
+    "oz": ("g", 28.349523125),
+    "ounce": ("g", 28.349523125),
+    "lb": ("g", 453.59237),
+    "lbs": ("g", 453.59237),
+    "pound": ("g", 453.59237),
+    "ml": ("ml", 1.0),
+    "millilitre": ("ml", 1.0),
+    "milliliter": ("ml", 1.0),
+    "cl": ("ml", 10.0),
+    "dl": ("ml", 100.0),
+    "l": ("ml", 1000.0),
+    "litre": ("ml", 1000.0),
+    "liter": ("ml", 1000.0),
+    "tsp": ("ml", 4.92892159375),
+    "teaspoon": ("ml", 4.92892159375),
+    "tbsp": ("ml", 14.78676478125),
+    "tbs": ("ml", 14.78676478125),
+    "tablespoon": ("ml", 14.78676478125),
+    "fl oz": ("ml", 29.5735295625),
+    "fluid ounce": ("ml", 29.5735295625),
+    "cup": ("ml", 236.5882365),
+    "pint": ("ml", 473.176473),
+    "pt": ("ml", 473.176473),
+    "quart": ("ml", 946.352946),
+    "qt": ("ml", 946.352946),
+    "gallon": ("ml", 3785.411784),
+    "gal": ("ml", 3785.411784),
+}
+
+# Largest display unit first; a base amount is shown in the first unit it reaches
+METRIC_DISPLAY = {
+    "g": (("kg", 1000.0), ("g", 1.0)),
+    "ml": (("l", 1000.0), ("ml", 1.0)),
+}
+
+_FRACTION = re.compile(r"^\s*(?:(\d+)\s+)?(\d+)\s*/\s*(\d+)\s*$")
+_UNICODE_FRACTIONS = {"½": 0.5, "⅓": 1 / 3, "⅔": 2 / 3, "¼": 0.25, "¾": 0.75, "⅛": 0.125}
+
+
+def parse_amount(value: Any) -> Optional[float]:
+    """
+    Parse a stored ingredient amount.
+
+    Accepts numbers and strings such as "2", "2.5", "1/2", "1 1/2" or "1½".
+    Returns None for anything else (e.g. "a pinch").
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+
+    text = value.strip()
+    whole = 0.0
+    if text and text[-1] in _UNICODE_FRACTIONS:
+        whole = _UNICODE_FRACTIONS[text[-1]]
+        text = text[:-1].strip()
+        if not text:
+            return whole
+    match = _FRACTION.match(text)
+    if match:
+        integer, numerator, denominator = match.groups()
+        if int(denominator) == 0:
+            return None
+        return whole + int(integer or 0) + int(numerator) / int(denominator)
+    try:
+        return whole + float(text)
+    except ValueError:
+        return None
+
+
+def normalize_unit(unit: Any) -> Optional[str]:
+    """Canonical spelling of a unit, e.g. "Tablespoons" -> "tablespoon"; None if empty."""
+    if not isinstance(unit, str):
+        return None
+    text = " ".join(unit.lower().replace(".", "").split())
+    if not text:
+        return None
+    if text in UNITS:
+        return text
+    return " ".join(singularize(word) for word in text.split())
+
+
+def to_base(amount: float, unit: Any) -> Tuple[float, Optional[str]]:
+    """
+    Convert an amount to its base unit so like quantities can be summed.
+
+    Returns ``(amount, "g" | "ml")`` for known mass and volume units and
+    ``(amount, normalized unit)`` for count units such as "clove".
+    """
+    canonical = normalize_unit(unit)
+    if canonical in UNITS:
+        base, factor = UNITS[canonical]
+        return amount * factor, base
+    return amount, canonical
+
+
+def for_display(amount: float, base_unit: Optional[str]) -> Tuple[float, Optional[str]]:
+    """Pick a readable metric unit for a base amount, e.g. 1500 g -> 1.5 kg."""
+    for unit, factor in METRIC_DISPLAY.get(base_unit, ()):
+        if amount >= factor:
+            return round(amount / factor, 2), unit
+    return round(amount, 2), base_unit
+
+
+# Display units per unit system as (unit, size in base units, minimum
+# quantity), largest first; an amount is shown in the first unit it fills
+# to at least the minimum, e.g. 60 ml -> 1/4 cup but 30 ml -> 2 tbsp
+UNIT_SYSTEMS = {
+    "metric": {
+        "g": (("kg", 1000.0, 1.0), ("g", 1.0, 0.0)),
+        "ml": (("l", 1000.0, 1.0), ("ml", 1.0, 0.0)),
+    },
+    "imperial": {
+        "g": (("lb", 453.59237, 1.0), ("oz", 28.349523125, 0.0)),
+        "ml": (
+            ("quart", 946.352946, 1.0),
+            ("cup", 236.5882365, 0.25),
+            ("tbsp", 14.78676478125, 1.0),
+            ("tsp", 4.92892159375, 0.0),
+        ),
+    },
+}
+
+# (unit alias, system) -> (factor to base, display ladder), so converting an
+# ingredient is one lookup instead of walking both tables
+CONVERSIONS = {
+    (alias, system): (factor, ladders[base])
+    for alias, (base, factor) in UNITS.items()
+    for system, ladders in UNIT_SYSTEMS.items()
+}
+
+
+def convert(amount: float, unit: Any, system: str) -> Tuple[float, Any]:
+    """
+    Express an amount in ``system``'s units, e.g. (2, "cups") -> (473.18, "ml").
+
+    Count units and unknown units are returned unchanged.
+    """
+    entry = CONVERSIONS.get((normalize_unit(unit), system))
+    if entry is None:
+        return amount, unit
+    factor, ladder = entry
+    base_amount = amount * factor
+    for display_unit, size, minimum in ladder:
+        if base_amount >= size * minimum:
+            return base_amount / size, display_unit
+    return base_amount / ladder[-1][1], ladder[-1][0]
+
+
+def _rounding_step(amount: float, factor: Optional[float]) -> float:
+    if factor == 1.0:
+        # g and ml
+        return 5.0 if amount >= 100 else 1.0 if amount >= 10 else 0.5
+    if factor == 1000.0:
+        # kg and l
+        return 0.05
+    if amount >= 10:
+        return 1.0
+    # Spoons, cups, ounces and counts read best in quarters (eighths for tsp)
+    return 0.125 if factor == UNITS["tsp"][1] else 0.25
+
+
+def _fraction_text(amount: float) -> str:
+    whole, eighths = divmod(round(amount * 8), 8)
+    if not eighths:
+        return str(whole)
+    numerator, denominator = eighths, 8
+    while numerator % 2 == 0:
+        numerator, denominator = numerator // 2, denominator // 2
+    fraction = f"{numerator}/{denominator}"
+    return f"{whole} {fraction}" if whole else fraction
+
+
+def kitchen_round(amount: float, unit: Any) -> Tuple[float, str]:
+    """
+    Round an amount to what a cook would measure, as a number and as text.
+
+    Metric amounts get sensible decimals (7.3 g -> "7.5", 233 ml -> "235");
+    everything else is rounded to quarters (eighths of a tsp) and written as
+    a fraction (0.7 cup -> "3/4", 2.6 cloves -> "2 1/2"). Non-zero amounts
+    never round down to zero.
+    """
+    factor = UNITS.get(normalize_unit(unit), (None, None))[1]
+    step = _rounding_step(amount, factor)
+    rounded = round(amount / step) * step
+    if rounded == 0 and amount > 0:
+        rounded = step
+    if factor in (1.0, 1000.0):
+        return rounded, f"{round(rounded, 2):g}"
+    return rounded, _fraction_text(rounded)
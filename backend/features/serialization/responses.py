@@ -0,0 +1,67 @@
+"""
+Opt-in fast JSON responses.
+
+By default a route's return value is validated against its
+``response_model``, run through ``jsonable_encoder`` and encoded with the
+stdlib ``json``. For data the backend has just built itself (a model it
+constructed, or a plan it cached after validating) that validation is
+redundant. With ``FAST_SERIALIZATION=true``, routes return through
+``fast_json`` instead:
+
+- pydantic models are encoded by pydantic-core (``model_dump_json``)
+- plain JSON-ready dicts and lists are encoded with orjson when installed
+
+Either way the bytes go out in a ready-made Response, which FastAPI passes
+through untouched. The OpenAPI schema still comes from ``response_model``.
+
+Only GET and POST /planner use it: a full week is the largest response the
+app sends on a hot path, and there skipping validation measurably pays off
+(``benchmarks.bench_serialization``). Elsewhere the saving is within noise
+and not worth returning unvalidated data.
+"""
+import json
+import os
+from typing import Any, Optional
+
+from fastapi import Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+
+    def dumps(content: Any) -> bytes:
+        return orjson.dumps(content)
+except ImportError:  # pragma: no cover - orjson is optional
+    def dumps(content: Any) -> bytes:
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+# Read per call through the module, so it can be flipped at runtime (e.g. by benchmarks)
+FAST_SERIALIZATION = os.getenv("FAST_SERIALIZATION", "false").lower() in ("1", "true", "yes")
+
+
+def fast_json(
+    content: Any,
+    sub_response: Optional[Response] = None,
+    status_code: int = 200,
+) -> Any:
+    """
+    Return ``content`` as a pre-encoded JSON Response in fast mode, else unchanged.
+
+    Only pass data that already matches the route's response_model: it is
+    not validated again. ``sub_response`` is the route's injected Response;
+    its headers (ETag, ...) are copied over, since FastAPI only merges them
+    into responses it builds itself.
+    """
+    if not FAST_SERIALIZATION:
+        return content
+
+    if isinstance(content, BaseModel):
+        body = content.model_dump_json().encode("utf-8")
+    else:
+        body = dumps(content)
+    response = Response(content=body, status_code=status_code, media_type="application/json")
+    if sub_response is not None:
+        for name, value in sub_response.headers.items():
+            if name != "content-length":
+                response.headers[name] = value
+    return response
@@ -0,0 +1,109 @@
+"""
+Lazily created app-wide services: the Firebase Admin app and the Firestore client.
+
+Nothing here runs at import time. The Google client libraries are imported,
+and the Firebase app is initialized, only when a request first needs them,
+or earlier when ``warm_up`` runs in the background after the app starts
+serving. A cold instance can therefore answer ``/health`` before any of
+this has been loaded.
+"""
+import importlib
+import inspect
+import os
+import sys
+import threading
+from typing import Any
+
+from features.observability.startup import startup_report
+
+FIREBASE_PROJECT_ID = os.getenv("FIREBASE_PROJECT_ID", "chefmate-ai-fac55")
+# "firestore" (async client; honours FIRESTORE_EMULATOR_HOST) or "memory"
+FIRESTORE_BACKEND = os.getenv("FIRESTORE_BACKEND", "firestore")
+
+
+class ServiceContainer:
+    def __init__(self, project_id: str, firestore_backend: str):
+        self.project_id = project_id
+        self.firestore_backend = firestore_backend
+        # Reentrant: firestore_client initializes the app while holding it
+        self._lock = threading.RLock()
+        self._firebase_app = None
+        self._firestore_client = None
+
+    def _import(self, module_name: str) -> Any:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            return module
+        with startup_report.phase(f"import {module_name}"):
+            return importlib.import_module(module_name)
+
+    def firebase_app(self) -> Any:
+        """The Firebase Admin app, initialized on first use."""
+        if self._firebase_app is not None:
+            return self._firebase_app
+        with self._lock:
+            if self._firebase_app is None:
+                firebase_admin = self._import("firebase_admin")
+                with startup_report.phase("initialize firebase app"):
+                    if firebase_admin._apps:
+                        self._firebase_app = firebase_admin.get_app()
+                    else:
+                        self._firebase_app = firebase_admin.initialize_app(options={
+                            'projectId': self.project_id
+                        })
+        return self._firebase_app
+
+    def auth(self) -> Any:
+        """``firebase_admin.auth``, with the app initialized."""
+        self.firebase_app()
+        return self._import("firebase_admin.auth")
+
+    def firestore(self) -> Any:
+        """``firebase_admin.firestore`` (sentinels, transforms, Query directions)."""
+        return self._import("firebase_admin.firestore")
+
+    def api_exceptions(self) -> Any:
+        """``google.api_core.exceptions``."""
+        return self._import("google.api_core.exceptions")
+
+    def firestore_client(self) -> Any:
+        """
+        The process-wide async Firestore client, created on first use.
+
+        With ``FIRESTORE_BACKEND=memory`` an in-memory fake is returned instead.
+        Call from the event loop thread: the async client binds to it.
+        """
+        if self._firestore_client is not None:
+            return self._firestore_client
+        with self._lock:
+            if self._firestore_client is None:
+                if self.firestore_backend == "memory":
+                    from features.database.memory import InMemoryFirestore
+                    self._firestore_client = InMemoryFirestore()
+                else:
+                    self.firebase_app()
+                    firestore_async = self._import("firebase_admin.firestore_async")
+                    with startup_report.phase("create firestore client"):
+                        self._firestore_client = firestore_async.client()
+        return self._firestore_client
+
+    def warm_up(self) -> None:
+        """
+        Import the client libraries and initialize the Firebase app ahead of
+        the first request. Blocking; run it in a worker thread.
+        """
+        self.auth()
+        self.api_exceptions()
+        if self.firestore_backend != "memory":
+            self._import("firebase_admin.firestore_async")
+
+    async def close(self) -> None:
+        """Close the Firestore client if one was created."""
+        client, self._firestore_client = self._firestore_client, None
+        if client is not None:
+            result = client.close()
+            if inspect.isawaitable(result):
+                await result
+
+
+services = ServiceContainer(FIREBASE_PROJECT_ID, FIRESTORE_BACKEND)
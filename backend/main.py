@@ -1,38 +1,94 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-import logging
+from features.observability.startup import startup_report
 
-from features.elevenlabs.router import router as elevenlabs_router
-from features.recipes.router import router as recipes_router
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
+with startup_report.phase("import fastapi"):
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+
+with startup_report.phase("import features"):
+    from features.cooking.router import router as cooking_router
+    from features.database.firestore import close_db
+    from features.elevenlabs.client import start_http_client, close_http_client
+    from features.events.hub import close_on_server_exit, event_hub
+    from features.events.router import router as events_router
+    from features.elevenlabs.router import router as elevenlabs_router
+    from features.elevenlabs.token_pool import token_pool
+    from features.observability.access_log import AccessLogMiddleware, access_log
+    from features.observability.metrics import MetricsMiddleware, loop_lag_monitor
+    from features.observability.router import router as observability_router
+    from features.planner.router import router as planner_router
+    from features.recipes.router import router as recipes_router
+    from features.recipes.text_index import text_indexes
+    from features.services.container import services
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Load the Google client libraries and initialize Firebase in the background
+# once serving, instead of on the first authenticated request
+SERVICES_WARM_UP = os.getenv("SERVICES_WARM_UP", "true").lower() in ("1", "true", "yes")
+
+
+async def _warm_up_services() -> None:
+    try:
+        with startup_report.phase("warm up services (background)"):
+            await asyncio.to_thread(services.warm_up)
+    except Exception as e:
+        # Not fatal: the same initialization is retried on first use
+        logger.warning(f"Service warm-up failed: {e!r}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create app-lifetime resources on startup and release them on shutdown."""
+    with startup_report.phase("lifespan startup"):
+        access_log.start()
+        await loop_lag_monitor.start()
+        await start_http_client()
+        await token_pool.start()
+        event_hub.start()
+        close_on_server_exit()
+        with startup_report.phase("load text index snapshot"):
+            await asyncio.to_thread(text_indexes.load_snapshot)
+    startup_report.mark_ready()
+
+    warm_up = asyncio.create_task(_warm_up_services()) if SERVICES_WARM_UP else None
+
+    # Log registered routes on startup for debugging
+    uvicorn_logger = logging.getLogger("uvicorn")
+    routes = [r.path for r in app.routes if hasattr(r, 'path')]
+    uvicorn_logger.info(f"Registered routes: {', '.join(sorted(routes))}")
+    uvicorn_logger.info(startup_report.format())
+
+    yield
+
+    # Normally already closed by the exit signal (see close_on_server_exit)
+    event_hub.close()
+    if warm_up is not None:
+        await warm_up
+    await asyncio.to_thread(text_indexes.save_snapshot)
+    await token_pool.stop()
+    await close_http_client()
+    await close_db()
+    await loop_lag_monitor.stop()
+    access_log.stop()
+
+
 app = FastAPI(
     title="ChefMate API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
-# Debug middleware to log all requests
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    logger.info(f">>> Request: {request.method} {request.url.path}")
-    headers = dict(request.headers)
-    if "authorization" in headers:
-        headers["authorization"] = "[REDACTED]"
-    if "Authorization" in headers:
-        headers["Authorization"] = "[REDACTED]"
-    logger.info(f">>> Headers: {headers}")
-    response = await call_next(request)
-    logger.info(f"<<< Response: {response.status_code}")
-    return response
-
-
 # CORS for React Native
 app.add_middleware(
     CORSMiddleware,
@@ -42,21 +98,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so the recorded timing covers the whole stack
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(AccessLogMiddleware)
+
 
 # Include routers
 app.include_router(elevenlabs_router)
 app.include_router(recipes_router)
-from features.planner.router import router as planner_router
 app.include_router(planner_router)
-
-
-@app.on_event("startup")
-async def startup_event():
-    """Log registered routes on startup for debugging."""
-    import logging
-    logger = logging.getLogger("uvicorn")
-    routes = [r.path for r in app.routes if hasattr(r, 'path')]
-    logger.info(f"Registered routes: {', '.join(sorted(routes))}")
+app.include_router(cooking_router)
+app.include_router(events_router)
+app.include_router(observability_router)
 
 
 @app.get("/")
@@ -71,4 +124,5 @@ async def health():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # Bounded, so a client holding a connection open can't stall a reload
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, timeout_graceful_shutdown=5)
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from features.recipes import ingredient_index
+from features.recipes.ingredient_index import IngredientIndexRegistry, UserIngredientIndex
+from features.recipes.ingredients import ingredient_tokens, normalize_ingredient_name
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Fresh Chopped Scallions", "green onion"),
+    ("spring onions", "green onion"),
+    ("Prawns", "shrimp"),
+    ("Garbanzo beans", "chickpea"),
+    ("icing sugar", "powdered sugar"),
+    ("Beef mince", "ground beef"),
+    ("Ground beef", "ground beef"),
+    ("ground cumin", "cumin"),
+    ("Extra-virgin olive oil", "olive oil"),
+    ("Tomatoes", "tomato"),
+    ("Cherry tomatoes", "cherry tomato"),
+    ("Berries", "berry"),
+    ("Peaches", "peach"),
+    ("Leaves", "leaf"),
+    ("Glass", "glass"),
+    ("Asparagus", "asparagus"),
+    ("Couscous", "couscous"),
+])
+def test_normalize_ingredient_name(name, expected):
+    assert normalize_ingredient_name(name) == expected
+
+
+def test_ingredient_tokens():
+    assert ingredient_tokens("Diced Cherry Tomatoes") == {"cherry", "tomato"}
+    assert ingredient_tokens("to taste") == frozenset()
+
+
+def _recipe(title, *ingredients):
+    return {"title": title, "ingredients": [{"name": name} for name in ingredients]}
+
+
+@pytest.fixture
+def index():
+    index = UserIngredientIndex()
+    index.add("omelette", _recipe("Omelette", "Eggs", "Butter"))
+    index.add("shakshuka", _recipe("Shakshuka", "eggs", "Tomatoes", "Onion", "Cumin"))
+    index.add("salsa", _recipe("Salsa", "Cherry tomatoes", "Scallions", "Cilantro", "Lime"))
+    index.add("toast", _recipe("Toast", "Bread", "Butter"))
+    return index
+
+
+def test_search_ranks_by_items_used_then_coverage(index):
+    results = index.search(["egg", "tomato", "butter"], limit=10)
+    assert [r["id"] for r in results] == ["omelette", "shakshuka", "toast", "salsa"]
+    assert results[0]["coverage"] == 1.0
+    assert results[1]["matched"] == ["eggs", "Tomatoes"]
+    assert results[1]["missing"] == ["Onion", "Cumin"]
+    assert results[1]["coverage"] == 0.5
+
+
+def test_search_matches_synonyms_and_plurals(index):
+    results = index.search(["spring onion", "coriander"], limit=10)
+    assert [r["id"] for r in results] == ["salsa"]
+    assert results[0]["matched"] == ["Scallions", "Cilantro"]
+
+
+def test_search_limit_and_unknown_items(index):
+    assert len(index.search(["butter"], limit=1)) == 1
+    assert index.search(["saffron", "to taste"], limit=10) == []
+
+
+def test_re_adding_a_recipe_replaces_its_ingredients(index):
+    index.add("toast", _recipe("Toast", "Bread", "Jam"))
+    assert [r["id"] for r in index.search(["butter"], limit=10)] == ["omelette"]
+    index.remove("toast")
+    assert index.search(["jam"], limit=10) == []
+    assert "jam" not in index.postings
+
+
+@pytest.fixture
+def recipes(monkeypatch):
+    calls = []
+
+    async def get_user_recipes(user_id):
+        calls.append(user_id)
+        await asyncio.sleep(0)
+        if user_id == "broken":
+            raise RuntimeError("firestore unavailable")
+        return [{"id": "toast", **_recipe("Toast", "Bread", "Butter")}]
+
+    monkeypatch.setattr(ingredient_index, "get_user_recipes", get_user_recipes)
+    return calls
+
+
+def test_concurrent_gets_build_once_and_drop_the_lock(recipes):
+    registry = IngredientIndexRegistry()
+
+    async def scenario():
+        return await asyncio.gather(*(registry.get("u1") for _ in range(5)))
+
+    indexes = asyncio.run(scenario())
+    assert recipes == ["u1"]
+    assert all(index is indexes[0] for index in indexes)
+    assert registry._build_locks == {}
+
+
+def test_failed_build_drops_the_lock(recipes):
+    registry = IngredientIndexRegistry()
+    with pytest.raises(RuntimeError):
+        asyncio.run(registry.get("broken"))
+    assert registry._build_locks == {}
@@ -0,0 +1,134 @@
+import asyncio
+import copy
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from features.database.firestore import PLANS_COLLECTION, plan_doc_id
+from features.database.memory import InMemoryFirestore
+from features.planner import migrate
+from features.planner.history import PLANNER_HISTORY_RETENTION, history_entry, revert
+from features.planner.models import WEEK_DAYS
+from features.planner.storage import days_to_storage
+
+WEEK = date(2026, 10, 12)
+MONDAY_MORNING = datetime(2026, 10, 12, 8, tzinfo=timezone.utc)
+
+
+def _days(dinner: str, breakfast: str = "Eggs"):
+    """A DayPlan list, the layout legacy documents stored."""
+    return [
+        {"day": day, "breakfast": [{"name": breakfast}], "lunch": [], "dinner": [{"name": f"{dinner} {day}"}]}
+        for day in WEEK_DAYS
+    ]
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = InMemoryFirestore()
+    monkeypatch.setattr(migrate, "get_db", lambda: db)
+    return db
+
+
+def _docs(db: InMemoryFirestore):
+    return {doc_id: entry["data"] for doc_id, entry in db._collections.get(PLANS_COLLECTION, {}).items()}
+
+
+def _seed(db: InMemoryFirestore, documents):
+    async def write():
+        for doc_id, data in documents.items():
+            await db.collection(PLANS_COLLECTION).document(doc_id).set(data)
+    asyncio.run(write())
+
+
+def _legacy(db: InMemoryFirestore, dinners, user_id="u1", start=MONDAY_MORNING):
+    _seed(db, {
+        f"legacy-{user_id}-{i}": {"userId": user_id, "createdAt": start + timedelta(hours=i), "days": _days(dinner)}
+        for i, dinner in enumerate(dinners)
+    })
+
+
+def _run(dry_run=False, keep_legacy=False):
+    return asyncio.run(migrate.migrate(dry_run, keep_legacy))
+
+
+def _revisions(plan):
+    """Every revision the plan's history can restore, newest first."""
+    history = plan["history"]
+    return [revert(plan["days"], history, steps) for steps in range(len(history) + 1)]
+
+
+def test_legacy_only_week_becomes_one_plan(db):
+    _legacy(db, ["Pasta", "Curry", "Tacos"])
+    _legacy(db, ["Soup"], user_id="u2", start=MONDAY_MORNING + timedelta(days=7))
+    _seed(db, {"broken": {"userId": "u3", "days": _days("Stew")}})
+
+    summary = _run()
+    assert summary == {"legacyDocuments": 4, "weeklyPlans": 2, "skipped": 1, "writes": 6, "commits": 1}
+
+    docs = _docs(db)
+    assert set(docs) == {plan_doc_id("u1", WEEK), plan_doc_id("u2", WEEK + timedelta(days=7)), "broken"}
+    plan = docs[plan_doc_id("u1", WEEK)]
+    assert plan["weekStartDate"] == WEEK.isoformat()
+    assert plan["createdAt"] == MONDAY_MORNING
+    assert plan["updatedAt"] == MONDAY_MORNING + timedelta(hours=2)
+    assert _revisions(plan) == [days_to_storage(_days(dinner)) for dinner in ("Tacos", "Curry", "Pasta")]
+    assert [entry["revisionTime"] for entry in plan["history"]] == [
+        MONDAY_MORNING.isoformat(), (MONDAY_MORNING + timedelta(hours=1)).isoformat()]
+    assert docs[plan_doc_id("u2", WEEK + timedelta(days=7))]["history"] == []
+
+
+def test_legacy_revisions_fold_under_an_existing_plan(db):
+    _legacy(db, ["Pasta", "Curry"])
+    # The week-keyed plan was created with oatmeal, then breakfast went back
+    # to the eggs the last legacy revision had
+    current = days_to_storage(_days("Tacos"))
+    first = copy.deepcopy(current)
+    for day in first.values():
+        day["breakfast"] = [{"name": "Oatmeal"}]
+    saved_at = MONDAY_MORNING + timedelta(days=1)
+    own_history = [history_entry(saved_at.isoformat(), {
+        f"{day}.breakfast": first[day]["breakfast"] for day in current})]
+    _seed(db, {plan_doc_id("u1", WEEK): {
+        "userId": "u1", "weekStartDate": WEEK.isoformat(), "days": current, "history": own_history,
+        "createdAt": saved_at, "updatedAt": saved_at + timedelta(hours=1),
+    }})
+
+    _run()
+    docs = _docs(db)
+    assert list(docs) == [plan_doc_id("u1", WEEK)]
+    plan = docs[plan_doc_id("u1", WEEK)]
+    assert plan["days"] == current
+    assert plan["createdAt"] == MONDAY_MORNING
+    assert plan["updatedAt"] == saved_at + timedelta(hours=1)
+    # Oldest first: the legacy revisions, then the plan's own history
+    assert plan["history"][-1] == own_history[0]
+    assert _revisions(plan) == [
+        current, first, days_to_storage(_days("Curry")), days_to_storage(_days("Pasta"))]
+
+
+def test_history_keeps_the_newest_revisions(db):
+    dinners = [f"Dish {i}" for i in range(PLANNER_HISTORY_RETENTION + 5)]
+    _legacy(db, dinners)
+
+    _run()
+    plan = _docs(db)[plan_doc_id("u1", WEEK)]
+    assert len(plan["history"]) == PLANNER_HISTORY_RETENTION
+    assert _revisions(plan) == [days_to_storage(_days(dinner)) for dinner in reversed(dinners[-PLANNER_HISTORY_RETENTION - 1:])]
+
+
+def test_keep_legacy_leaves_the_old_documents(db):
+    _legacy(db, ["Pasta", "Curry"])
+    summary = _run(keep_legacy=True)
+    assert summary["writes"] == 1
+    assert set(_docs(db)) == {"legacy-u1-0", "legacy-u1-1", plan_doc_id("u1", WEEK)}
+
+
+def test_dry_run_writes_nothing(db):
+    _legacy(db, ["Pasta", "Curry"])
+    _legacy(db, ["Soup"], user_id="u2")
+    before = copy.deepcopy(db._collections)
+
+    summary = _run(dry_run=True)
+    assert summary == {"legacyDocuments": 3, "weeklyPlans": 2, "skipped": 0, "writes": 5, "commits": 0}
+    assert db._collections == before
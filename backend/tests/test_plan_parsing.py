@@ -0,0 +1,199 @@
+"""
+Property checks for ``features.planner.parsing.normalize_plan``.
+
+A seeded generator produces the plan shapes the planner agent sends (random
+day-key case, meal shapes and planJson wrapping) and every plan is checked
+against the parser ``save_weekly_plan`` used before, plus invariants that
+hold for any input. ``benchmarks.bench_plan_parser`` times the same corpus.
+"""
+import json
+import random
+from typing import Any, Dict, List
+
+import pytest
+
+from features.planner import parsing
+from features.planner.models import DayPlan, MealItem, WeeklyPlan, WeeklyPlanCreate, WEEK_DAYS
+from features.planner.parsing import normalize_plan
+
+DISHES = [
+    "Eggs", "Toast", "Oatmeal", "Greek Yogurt", "Pasta Primavera", "Chicken Curry",
+    "Caesar Salad", "Tomato Soup", "Grilled Salmon", "Tacos", "Pad Thai", "Risotto",
+]
+EMOJIS = ["🍳", "🥗", "🍝", "🍛", "🌮", "🍣", ""]
+SEEDS = range(8)
+CASES_PER_SEED = 250
+
+
+def legacy_parse(plan_data: Dict[str, Any]) -> List[DayPlan]:
+    """The parser save_weekly_plan used before features.planner.parsing."""
+    if "planJson" in plan_data:
+        try:
+            potential_json = plan_data["planJson"]
+            if isinstance(potential_json, str):
+                plan_data = json.loads(potential_json)
+            elif isinstance(potential_json, dict):
+                plan_data = potential_json
+        except Exception:
+            pass
+
+    def process_meals(meal_input) -> List[MealItem]:
+        if isinstance(meal_input, str):
+            items = [x.strip() for x in meal_input.split(',')]
+            return [MealItem(name=item, emoji="🍽️") for item in items if item]
+        elif isinstance(meal_input, list):
+            result = []
+            for item in meal_input:
+                if isinstance(item, str):
+                    result.append(MealItem(name=item, emoji="🍽️"))
+                elif isinstance(item, dict):
+                    name = item.get("name") or item.get("title") or "Unknown"
+                    emoji = item.get("emoji") or "🍽️"
+                    result.append(MealItem(name=name, emoji=emoji))
+            return result
+        return []
+
+    days_list = []
+    plan_data_lower = {k.lower(): v for k, v in plan_data.items()}
+    for day_name in WEEK_DAYS:
+        day_content = plan_data_lower.get(day_name.lower(), {})
+        if isinstance(day_content, str):
+            breakfast, lunch, dinner = [], [], process_meals(day_content)
+        else:
+            breakfast = process_meals(day_content.get("breakfast", []))
+            lunch = process_meals(day_content.get("lunch", []))
+            dinner = process_meals(day_content.get("dinner", []))
+        days_list.append(DayPlan(day=day_name, breakfast=breakfast, lunch=lunch, dinner=dinner))
+    return days_list
+
+
+def _meal(rng: random.Random) -> Any:
+    dishes = rng.sample(DISHES, rng.randint(0, 3))
+    shape = rng.choice(("strings", "joined", "objects", "titles"))
+    if shape == "strings":
+        return dishes
+    if shape == "joined":
+        return ", ".join(dishes) + rng.choice(("", ",", " , "))
+    if shape == "objects":
+        return [{"name": d, "emoji": rng.choice(EMOJIS)} for d in dishes]
+    return [{"title": d} for d in dishes] + rng.choice(([], [{}]))
+
+
+def _day(rng: random.Random, strict: bool) -> Any:
+    if strict:
+        return {meal: rng.sample(DISHES, rng.randint(0, 2)) for meal in ("breakfast", "lunch", "dinner")}
+    if rng.random() < 0.2:
+        return rng.choice(DISHES)
+    return {meal: _meal(rng) for meal in ("breakfast", "lunch", "dinner") if rng.random() < 0.8}
+
+
+def make_corpus(cases: int, seed: int) -> List[Dict[str, Any]]:
+    """Plans with random day-key case, meal shapes and planJson wrapping."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(cases):
+        strict = rng.random() < 0.5
+        plan = {}
+        for day in rng.sample(WEEK_DAYS, rng.randint(0, 7)):
+            key = rng.choice((day, day.lower(), day.upper()))
+            plan[key] = _day(rng, strict)
+        if rng.random() < 0.1:
+            plan["notes"] = "extra keys are ignored"
+        wrap = rng.random()
+        if wrap < 0.25:
+            plan = {"planJson": json.dumps(plan)}
+        elif wrap < 0.35:
+            plan = {"planJson": plan}
+        corpus.append(plan)
+    return corpus
+
+
+@pytest.fixture(params=SEEDS, ids=lambda seed: f"seed{seed}")
+def corpus(request) -> List[Dict[str, Any]]:
+    return make_corpus(CASES_PER_SEED, request.param)
+
+
+def test_matches_legacy_parser(corpus):
+    for plan in corpus:
+        assert normalize_plan(plan) == [day.model_dump() for day in legacy_parse(plan)], plan
+
+
+def test_always_seven_days_monday_first(corpus):
+    for plan in corpus:
+        assert [day["day"] for day in normalize_plan(plan)] == list(WEEK_DAYS)
+
+
+def test_output_validates_as_days(corpus):
+    for plan in corpus:
+        days = normalize_plan(plan)
+        assert WeeklyPlan(days=days, user_id="u").model_dump()["days"] == days
+
+
+def test_idempotent_on_its_own_output(corpus):
+    for plan in corpus:
+        days = normalize_plan(plan)
+        assert normalize_plan({"days": days}) == days
+
+
+def test_planjson_wrapping_is_transparent(corpus):
+    for plan in corpus:
+        if "planJson" in plan:
+            continue
+        expected = normalize_plan(plan)
+        assert normalize_plan({"planJson": plan}) == expected
+        assert normalize_plan({"planJson": json.dumps(plan)}) == expected
+
+
+def _day_keyed(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """The plan's day entries, without planJson wrapping or extra keys."""
+    if "planJson" in plan:
+        plan = plan["planJson"] if isinstance(plan["planJson"], dict) else json.loads(plan["planJson"])
+    return {key: value for key, value in plan.items() if key.lower() in {d.lower() for d in WEEK_DAYS}}
+
+
+def test_days_dict_shape_matches_top_level_days(corpus):
+    for plan in corpus:
+        days = _day_keyed(plan)
+        assert normalize_plan({"days": days}) == normalize_plan(days), plan
+
+
+def test_weekly_plan_create_takes_the_strict_path(monkeypatch):
+    body = WeeklyPlanCreate(days={
+        "monday": {"breakfast": ["Eggs", "Toast"], "dinner": ["Pasta"]},
+        "Sunday": {"lunch": []},
+    }).model_dump()
+    expected = normalize_plan(body["days"])
+
+    def not_strict(_):
+        raise AssertionError("WeeklyPlanCreate input should not go through parse_meals")
+
+    monkeypatch.setattr(parsing, "parse_meals", not_strict)
+    days = normalize_plan(body)
+    assert days == expected
+    assert [item["name"] for item in days[0]["breakfast"]] == ["Eggs", "Toast"]
+    assert [item["name"] for item in days[0]["dinner"]] == ["Pasta"]
+
+
+def test_loose_days_dict_falls_back_to_the_general_path():
+    days = normalize_plan({"days": {"MONDAY": {"dinner": "Soup, Bread"}, "tuesday": "Tacos", "funday": {}}})
+    assert [item["name"] for item in days[0]["dinner"]] == ["Soup", "Bread"]
+    assert [item["name"] for item in days[1]["dinner"]] == ["Tacos"]
+
+
+def test_days_list_shape():
+    days = normalize_plan({"days": [{"day": "tuesday", "lunch": "Soup, Bread"}, {"day": "Funday"}]})
+    assert [item["name"] for item in days[1]["lunch"]] == ["Soup", "Bread"]
+    assert all(not day["breakfast"] for day in days)
+
+
+def test_recipe_ids_and_non_string_names():
+    days = normalize_plan({"Monday": {"dinner": [{"name": 42, "recipeId": "r1"}, {"title": "Stew", "recipe_id": 7}]}})
+    assert days[0]["dinner"] == [
+        {"name": "42", "emoji": "🍽️", "recipe_id": "r1"},
+        {"name": "Stew", "emoji": "🍽️", "recipe_id": None},
+    ]
+
+
+def test_unparseable_planjson_falls_back_to_outer_dict():
+    days = normalize_plan({"planJson": "{not json", "monday": "Pasta"})
+    assert days[0]["dinner"][0]["name"] == "Pasta"
@@ -0,0 +1,83 @@
+import asyncio
+from datetime import date, datetime, timezone
+
+import pytest
+from firebase_admin import firestore
+
+from features.database import firestore as database
+from features.database.memory import InMemoryFirestore
+
+WEEK = date(2026, 10, 12)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = InMemoryFirestore()
+    monkeypatch.setattr(database, "get_db", lambda: db)
+    return db
+
+
+def _touch(db: InMemoryFirestore) -> None:
+    """Stand in for another request's save landing mid-transaction."""
+    entry = db._collections[database.PLANS_COLLECTION][database.plan_doc_id("u1", WEEK)]
+    entry["update_time"] = datetime.now(timezone.utc)
+    entry["data"]["history"] = entry["data"]["history"] + ["concurrent"]
+
+
+def test_transaction_retries_when_a_read_document_changes(db):
+    ref = db.collection("counters").document("c")
+    reads = []
+
+    @firestore.async_transactional
+    async def increment(transaction):
+        snapshot = await ref.get(transaction=transaction)
+        reads.append(snapshot.get("n"))
+        if len(reads) == 1:
+            await ref.set({"n": 10})
+        transaction.set(ref, {"n": snapshot.get("n") + 1})
+
+    async def scenario():
+        await ref.set({"n": 0})
+        await increment(db.transaction())
+        return (await ref.get()).get("n")
+
+    assert asyncio.run(scenario()) == 11
+    assert reads == [0, 10]
+
+
+def test_replace_plan_builds_on_the_plan_it_read(db):
+    seen = []
+
+    def build(existing):
+        seen.append(existing)
+        history = existing[0]["history"] if existing else []
+        if len(seen) == 2:
+            _touch(db)
+        return {"days": {}, "history": history + [len(seen)]}
+
+    async def scenario():
+        first, _ = await database.replace_plan("u1", WEEK, build)
+        second, update_time = await database.replace_plan("u1", WEEK, build)
+        return first, second, update_time
+
+    first, second, update_time = asyncio.run(scenario())
+    assert seen[0] is None
+    assert first["history"] == [1]
+    # The second save was retried on top of the concurrent write, not over it
+    assert second["history"] == [1, "concurrent", 3]
+    assert second["weekStartDate"] == WEEK.isoformat()
+    assert isinstance(update_time, datetime)
+
+
+def test_replace_plan_gives_up_on_constant_contention(db):
+    def build(existing):
+        if existing is not None:
+            _touch(db)
+        return {"days": {}, "history": []}
+
+    async def scenario():
+        await database.replace_plan("u1", WEEK, build)
+        await database.replace_plan("u1", WEEK, build)
+
+    with pytest.raises(database.ConcurrentModificationError):
+        asyncio.run(scenario())
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from features.recipes import router
+from features.recipes.models import RecipeBatchCreate
+
+
+def _recipe(title: str) -> dict:
+    return {"userId": "u1", "title": title, "ingredients": ["Flour"], "instructions": ["Bake"]}
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """Stub reads and writes; titles starting with "bad" fail to write."""
+    written = {}
+
+    async def get_recipes(recipe_ids):
+        return {recipe_id: written[recipe_id] for recipe_id in recipe_ids if recipe_id in written}
+
+    async def save_recipes(recipes, recipe_ids):
+        created, failed = [], []
+        for position, (recipe, recipe_id) in enumerate(zip(recipes, recipe_ids)):
+            if recipe["title"].startswith("bad"):
+                failed.append((position, "Failed to save recipe: boom"))
+            else:
+                written[recipe_id] = recipe
+                created.append((position, recipe_id))
+        return created, failed
+
+    monkeypatch.setattr(router, "get_recipes", get_recipes)
+    monkeypatch.setattr(router, "save_recipes", save_recipes)
+    monkeypatch.setattr(router.ingredient_indexes, "add_recipe", lambda *args: None)
+    monkeypatch.setattr(router.text_indexes, "add_recipe", lambda *args: None)
+    return written
+
+
+def _save(titles):
+    batch = RecipeBatchCreate(recipes=[_recipe(title) for title in titles])
+    return asyncio.run(router._save_recipe_batch(batch, "u1"))
+
+
+def test_repeat_of_a_written_recipe_is_a_duplicate(store):
+    result = _save(["Bread", "Bread"])
+    assert [(item.index, item.duplicate) for item in result.created] == [(0, False), (1, True)]
+    assert result.created[0].id == result.created[1].id
+    assert result.failed == []
+    assert len(store) == 1
+
+
+def test_repeat_of_a_failed_recipe_fails_with_it(store):
+    result = _save(["bad bread", "Cake", "bad bread"])
+    assert [item.index for item in result.created] == [1]
+    assert [(failure.index, failure.error) for failure in result.failed] == [
+        (0, "Failed to save recipe: boom"),
+        (2, "Failed to save recipe: boom"),
+    ]
+
+
+def test_recipe_saved_earlier_is_a_duplicate(store):
+    _save(["Bread"])
+    result = _save(["Bread", "Bread"])
+    assert [(item.index, item.duplicate) for item in result.created] == [(0, True), (1, True)]
@@ -0,0 +1,57 @@
+from features.recipes.scaling import ScaledRecipeCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_views_expire_after_ttl():
+    clock = FakeClock()
+    cache = ScaledRecipeCache(max_size=10, ttl=60, clock=clock)
+    cache.set("r1", 4, "metric", {"id": "r1"})
+
+    clock.now = 59
+    assert cache.get("r1", 4, "metric") == {"id": "r1"}
+
+    clock.now = 60
+    assert cache.get("r1", 4, "metric") is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_expired_view_is_rebuilt_with_a_fresh_ttl():
+    clock = FakeClock()
+    cache = ScaledRecipeCache(max_size=10, ttl=60, clock=clock)
+    cache.set("r1", None, None, {"title": "old"})
+    clock.now = 100
+    assert cache.get("r1", None, None) is None
+    cache.set("r1", None, None, {"title": "new"})
+    clock.now = 159
+    assert cache.get("r1", None, None) == {"title": "new"}
+
+
+def test_invalidate_drops_every_variant():
+    cache = ScaledRecipeCache(max_size=10, ttl=60, clock=FakeClock())
+    cache.set("r1", 2, None, {})
+    cache.set("r1", 4, "imperial", {})
+    cache.set("r2", 2, None, {})
+    cache.invalidate("r1")
+    assert cache.get("r1", 2, None) is None
+    assert cache.get("r1", 4, "imperial") is None
+    assert cache.get("r2", 2, None) == {}
+
+
+def test_lru_eviction_and_disabled_cache():
+    cache = ScaledRecipeCache(max_size=2, ttl=60, clock=FakeClock())
+    for recipe_id in ("r1", "r2", "r3"):
+        cache.set(recipe_id, None, None, {})
+    assert cache.get("r1", None, None) is None
+    assert len(cache) == 2
+
+    disabled = ScaledRecipeCache(max_size=10, ttl=0, clock=FakeClock())
+    disabled.set("r1", None, None, {})
+    assert len(disabled) == 0
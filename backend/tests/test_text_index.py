@@ -0,0 +1,173 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from features.recipes import text_index
+from features.recipes.text_index import SNAPSHOT_VERSION, TextIndexRegistry, UserTextIndex, tokenize
+
+RECIPES = {
+    "soup": {"title": "Tomato Soup", "description": "A warm soup", "instructions": ["Simmer the tomatoes"]},
+    "salad": {"title": "Greek Salad", "description": "Tomatoes, cucumber and feta", "instructions": ["Toss"]},
+    "curry": {"title": "Chicken Curry", "description": "Spicy", "instructions": ["Brown the chicken", "Add curry paste"]},
+    "stew": {"title": "Beef Stew", "description": "Hearty winter stew", "instructions": ["Simmer for hours"]},
+}
+
+
+def _shard(recipes=RECIPES) -> UserTextIndex:
+    shard = UserTextIndex()
+    for recipe_id, recipe in recipes.items():
+        shard.add(recipe_id, recipe)
+    return shard
+
+
+def test_tokenize_drops_stopwords_and_singularizes():
+    assert tokenize("Add the Tomatoes to 2 pots, then simmer for 10 minutes") == [
+        "tomato", "pot", "simmer", "10"]
+
+
+def test_title_hits_outrank_description_hits():
+    results = _shard().search("tomato", limit=10)
+    assert [r["id"] for r in results] == ["soup", "salad"]
+    assert results[0]["title"] == "Tomato Soup"
+    assert results[0]["score"] > results[1]["score"] > 0
+
+
+def test_rare_terms_outweigh_common_ones():
+    # "simmer" is in two recipes, "chicken" in one
+    results = _shard().search("simmer chicken", limit=10)
+    assert results[0]["id"] == "curry"
+    assert {r["id"] for r in results} == {"curry", "soup", "stew"}
+
+
+def test_search_limit_and_misses():
+    assert len(_shard().search("tomato", limit=1)) == 1
+    assert _shard().search("saffron", limit=10) == []
+    assert UserTextIndex().search("tomato", limit=10) == []
+
+
+def test_remove_and_re_add_keep_counts_consistent():
+    shard = _shard()
+    shard.add("soup", {"title": "Pea Soup"})
+    assert [r["id"] for r in shard.search("tomato", limit=10)] == ["salad"]
+    shard.remove("salad")
+    assert shard.search("tomato", limit=10) == []
+    rebuilt = _shard({"soup": {"title": "Pea Soup"}, "curry": RECIPES["curry"], "stew": RECIPES["stew"]})
+    assert shard.postings == rebuilt.postings
+    assert shard.posting_count == rebuilt.posting_count
+    assert shard.total_length == pytest.approx(rebuilt.total_length)
+
+
+def test_memory_budget_evicts_least_recently_used():
+    # Room for two shards plus the added recipe, not three
+    registry = TextIndexRegistry(memory_budget=2 * _shard().estimated_bytes + 1000)
+    for user_id in ("u1", "u2"):
+        registry._shards[user_id] = _shard()
+    assert registry._fresh("u1") is not None
+
+    registry._shards["u3"] = _shard()
+    registry.add_recipe("u3", "toast", {"title": "Toast"})
+    assert list(registry._shards) == ["u1", "u3"]
+    assert registry.evictions == 1
+
+
+def test_most_recent_shard_is_kept_even_over_budget():
+    registry = TextIndexRegistry(memory_budget=1)
+    registry._shards["u1"] = _shard()
+    registry._shards["u2"] = _shard()
+    registry.add_recipe("u2", "toast", {"title": "Toast"})
+    assert list(registry._shards) == ["u2"]
+
+
+def test_idle_shards_are_evicted():
+    registry = TextIndexRegistry(idle_timeout=60)
+    registry._shards["idle"] = _shard()
+    registry._shards["idle"].last_used = time.monotonic() - 61
+    registry._shards["active"] = _shard()
+    registry.add_recipe("active", "toast", {"title": "Toast"})
+    assert list(registry._shards) == ["active"]
+    assert registry.evictions == 1
+
+
+def test_shards_past_their_ttl_are_rebuilt():
+    registry = TextIndexRegistry(ttl=600)
+    registry._shards["u1"] = UserTextIndex(built_at=time.time() - 601)
+    assert registry._fresh("u1") is None
+    assert "u1" not in registry._shards
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = tmp_path / "text_index.snapshot"
+    saved = TextIndexRegistry(snapshot_path=str(path))
+    saved._shards["u1"] = _shard()
+    saved._shards["u2"] = _shard({"stew": RECIPES["stew"]})
+    saved.save_snapshot()
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+
+    loaded = TextIndexRegistry(snapshot_path=str(path))
+    loaded.load_snapshot()
+    assert list(loaded._shards) == ["u1", "u2"]
+    for user_id, shard in saved._shards.items():
+        restored = loaded._shards[user_id]
+        assert restored.built_at == shard.built_at
+        assert restored.postings == shard.postings
+        assert restored.search("simmer tomato", limit=10) == shard.search("simmer tomato", limit=10)
+
+
+def test_snapshot_older_than_ttl_is_restored_with_a_fresh_ttl(tmp_path):
+    path = tmp_path / "text_index.snapshot"
+    saved = TextIndexRegistry(snapshot_path=str(path))
+    saved._shards["recent"] = _shard()
+    saved._shards["recent"].built_at = time.time() - 3600
+    saved._shards["ancient"] = _shard()
+    saved._shards["ancient"].built_at = time.time() - 2 * 86400
+    saved.save_snapshot()
+
+    loaded = TextIndexRegistry(ttl=600, snapshot_max_age=86400, snapshot_path=str(path))
+    loaded.load_snapshot()
+    assert list(loaded._shards) == ["recent"]
+    assert loaded._fresh("recent") is not None
+
+
+@pytest.mark.parametrize("content", ["{not json", json.dumps({"version": SNAPSHOT_VERSION + 1, "shards": {}})])
+def test_unreadable_snapshot_is_ignored(tmp_path, content):
+    path = tmp_path / "text_index.snapshot"
+    path.write_text(content)
+    registry = TextIndexRegistry(snapshot_path=str(path))
+    registry.load_snapshot()
+    assert registry._shards == {}
+
+
+@pytest.fixture
+def recipes(monkeypatch):
+    calls = []
+
+    async def get_user_recipes(user_id):
+        calls.append(user_id)
+        await asyncio.sleep(0)
+        if user_id == "broken":
+            raise RuntimeError("firestore unavailable")
+        return [{"id": recipe_id, **recipe} for recipe_id, recipe in RECIPES.items()]
+
+    monkeypatch.setattr(text_index, "get_user_recipes", get_user_recipes)
+    return calls
+
+
+def test_concurrent_searches_build_once_and_drop_the_lock(recipes):
+    registry = TextIndexRegistry()
+
+    async def scenario():
+        return await asyncio.gather(*(registry.search("u1", "soup", 5) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert recipes == ["u1"]
+    assert all(result == results[0] for result in results)
+    assert registry._build_locks == {}
+
+
+def test_failed_build_drops_the_lock(recipes):
+    registry = TextIndexRegistry()
+    with pytest.raises(RuntimeError):
+        asyncio.run(registry.get("broken"))
+    assert registry._build_locks == {}
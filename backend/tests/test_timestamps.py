@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+from google.protobuf.timestamp_pb2 import Timestamp
+
+from features.database.timestamps import to_datetime, to_iso
+
+MOMENT = datetime(2026, 10, 17, 9, 30, 15, 250000, tzinfo=timezone.utc)
+
+
+def test_firestore_datetime_with_nanoseconds():
+    value = DatetimeWithNanoseconds(2026, 10, 17, 9, 30, 15, nanosecond=250000123, tzinfo=timezone.utc)
+    assert to_datetime(value) is value
+    assert to_iso(value) == "2026-10-17T09:30:15.250000+00:00"
+
+
+def test_protobuf_timestamp():
+    value = Timestamp()
+    value.FromDatetime(MOMENT)
+    assert to_datetime(value) == MOMENT
+    assert to_datetime(value).tzinfo is not None
+
+
+def test_aware_and_naive_datetimes_pass_through():
+    naive = MOMENT.replace(tzinfo=None)
+    assert to_datetime(MOMENT) is MOMENT
+    assert to_datetime(naive) is naive
+    assert to_iso(naive) == "2026-10-17T09:30:15.250000"
+    assert to_iso(MOMENT) == "2026-10-17T09:30:15.250000+00:00"
+
+
+@pytest.mark.parametrize("value", [MOMENT.timestamp(), int(MOMENT.timestamp())])
+def test_epoch_seconds(value):
+    assert to_datetime(value) == datetime.fromtimestamp(value, tz=timezone.utc)
+    assert to_datetime(value).tzinfo == timezone.utc
+
+
+@pytest.mark.parametrize("value", [MOMENT.timestamp() * 1000, int(MOMENT.timestamp() * 1000)])
+def test_epoch_milliseconds(value):
+    assert to_datetime(value) == MOMENT
+
+
+def test_epoch_out_of_range():
+    assert to_datetime(1e300) is None
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2026-10-17T09:30:15.250000+00:00", MOMENT),
+    ("2026-10-17T09:30:15.25Z", MOMENT),
+    ("2026-10-17T11:30:15.25+02:00", MOMENT),
+    ("2026-10-17T09:30:15", MOMENT.replace(microsecond=0, tzinfo=None)),
+    ("2026-10-17", datetime(2026, 10, 17)),
+])
+def test_iso_strings(value, expected):
+    assert to_datetime(value) == expected
+
+
+@pytest.mark.parametrize("value", [None, True, False, "", "yesterday", "2026-13-45", b"2026-10-17", [], {}, object()])
+def test_missing_and_unrecognized_values(value):
+    assert to_datetime(value) is None
+
+
+@pytest.mark.parametrize("value", [None, True, "garbage"])
+def test_to_iso_defaults_to_now(value):
+    before = datetime.now()
+    result = datetime.fromisoformat(to_iso(value))
+    assert before <= result <= datetime.now() + timedelta(seconds=1)
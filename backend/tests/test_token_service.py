@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from features.elevenlabs.service import ConversationTokenService, UpstreamUnavailableError
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test")
+    monkeypatch.setenv("ELEVENLABS_COOK_AGENT_ID", "agent")
+    # reset_timeout=0: an opened circuit is half-open straight away
+    return ConversationTokenService(failure_threshold=1, reset_timeout=0, queue_timeout=0.05, max_concurrency=1)
+
+
+def _open(service: ConversationTokenService) -> None:
+    service.breaker("cook").record_failure()
+    assert service.breaker("cook").state == "half-open"
+
+
+def test_cancelled_trial_gives_the_slot_back(service, monkeypatch):
+    started = asyncio.Event()
+
+    async def hang(*args):
+        started.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(service, "_request_with_retries", hang)
+    _open(service)
+
+    async def scenario():
+        task = asyncio.create_task(service.mint_token("cook"))
+        await started.wait()
+        assert not service.breaker("cook").allow_request()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    breaker = service.breaker("cook")
+    assert breaker.state == "half-open"
+    assert breaker.allow_request()
+
+
+def test_trial_cancelled_while_queued_gives_the_slot_back(service):
+    _open(service)
+
+    async def scenario():
+        semaphore = service._semaphore("cook")
+        await semaphore.acquire()
+        task = asyncio.create_task(service.mint_token("cook"))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert service.breaker("cook").allow_request()
+
+
+def test_queue_timeout_only_releases_its_own_trial(service, monkeypatch):
+    started = asyncio.Event()
+
+    async def hang(*args):
+        started.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(service, "_request_with_retries", hang)
+
+    async def scenario():
+        # Admitted while closed, then stuck in the queue behind the hung call
+        holder = asyncio.create_task(service.mint_token("cook"))
+        await started.wait()
+        queued = asyncio.create_task(service.mint_token("cook"))
+        await asyncio.sleep(0)
+        # The circuit opens meanwhile and another caller claims the trial
+        _open(service)
+        assert service.breaker("cook").allow_request()
+        with pytest.raises(HTTPException) as error:
+            await queued
+        assert error.value.status_code == 503
+        holder.cancel()
+        return service.breaker("cook").allow_request()
+
+    # The timed-out call wasn't the trial, so the claimed trial still blocks others
+    assert asyncio.run(scenario()) is False
+
+
+def test_trial_outcomes_close_or_reopen_the_circuit(service, monkeypatch):
+    async def fail(*args):
+        raise UpstreamUnavailableError("down")
+
+    async def succeed(*args):
+        return "token"
+
+    _open(service)
+    monkeypatch.setattr(service, "_request_with_retries", fail)
+    with pytest.raises(UpstreamUnavailableError):
+        asyncio.run(service.mint_token("cook"))
+    assert service.breaker("cook").opened_at is not None
+
+    monkeypatch.setattr(service, "_request_with_retries", succeed)
+    assert asyncio.run(service.mint_token("cook")) == "token"
+    assert service.breaker("cook").state == "closed"
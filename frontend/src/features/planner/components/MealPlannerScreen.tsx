@@ -4,9 +4,11 @@ import { SafeAreaView } from 'react-native-safe-area-context';
 import LinearGradient from 'react-native-linear-gradient';
 import { Colors, Spacing, BorderRadius } from '@/shared/constants/theme';
 import { useAuth } from '@/shared/context/AuthContext';
-import { API_BASE_URL } from '@/shared/config/api';
+import { API_BASE_URL, localWeekQuery } from '@/shared/config/api';
 import { VoiceChatModal } from '@/features/voice/components/VoiceChatModal';
 import { useFocusEffect } from 'expo-router';
+import { useIsFocused } from '@react-navigation/native';
+import { useServerEvents } from '@/shared/hooks/useServerEvents';
 
 interface MealItem {
     id: string;
@@ -24,6 +26,7 @@ interface DayPlan {
 export function MealPlannerScreen() {
     const { user } = useAuth();
     const [weekPlan, setWeekPlan] = useState<DayPlan[]>([]);
+    const [weekStart, setWeekStart] = useState<string | null>(null);
     const [isLoading, setIsLoading] = useState(false);
     const [isVoiceModalVisible, setIsVoiceModalVisible] = useState(false);
 
@@ -32,7 +35,7 @@ export function MealPlannerScreen() {
         try {
             setIsLoading(true);
             const token = await user.getIdToken();
-            const response = await fetch(`${API_BASE_URL}/planner`, {
+            const response = await fetch(`${API_BASE_URL}/planner?${localWeekQuery()}`, {
                 headers: {
                     'Authorization': `Bearer ${token}`
                 }
@@ -42,6 +45,7 @@ export function MealPlannerScreen() {
                 if (data.days && Array.isArray(data.days)) {
                     setWeekPlan(data.days);
                 }
+                setWeekStart(data.week_start_date ? data.week_start_date.slice(0, 10) : null);
             }
         } catch (e) {
             console.error(e);
@@ -56,6 +60,22 @@ export function MealPlannerScreen() {
         }, [fetchPlan])
     );
 
+    // Plans the agent saves are pushed over the event stream as soon as
+    // they're stored; the stream is open while the screen is focused and
+    // the focus fetch above covers the time it isn't
+    useServerEvents({
+        'planner.updated': (event) => {
+            if (weekStart && event.weekStartDate !== weekStart) return;
+            if (event.plan?.days && Array.isArray(event.plan.days)) {
+                setWeekPlan(event.plan.days);
+                setWeekStart(event.weekStartDate);
+            }
+        },
+        resync: () => {
+            fetchPlan();
+        },
+    }, useIsFocused());
+
     return (
         <View style={styles.container}>
             <LinearGradient
@@ -109,6 +129,8 @@ export function MealPlannerScreen() {
                 visible={isVoiceModalVisible}
                 onClose={() => {
                     setIsVoiceModalVisible(false);
+                    // Events only reach streams on the worker that saved the
+                    // plan, so still refetch once as a fallback
                     fetchPlan();
                 }}
                 agentType="planner"
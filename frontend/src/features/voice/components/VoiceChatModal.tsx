@@ -25,7 +25,7 @@ import { Colors, Spacing, BorderRadius } from '@/shared/constants/theme';
 import { Recipe } from '@/shared/types/recipe';
 import { getUserPreferences } from '@/shared/services/preferencesService';
 import { getUserRecipes } from '@/shared/services/recipeService';
-import { API_BASE_URL } from '@/shared/config/api';
+import { API_BASE_URL, localWeekQuery } from '@/shared/config/api';
 
 interface Message {
   id: string;
@@ -111,7 +111,7 @@ export function VoiceChatModal({
             }
           }
 
-          const response = await fetch(`${API_BASE_URL}/planner`, {
+          const response = await fetch(`${API_BASE_URL}/planner?${localWeekQuery()}`, {
             method: 'POST',
             headers: {
               'Authorization': `Bearer ${token}`,
@@ -28,3 +28,7 @@ const getApiBaseUrl = () => {
 
 export const API_BASE_URL = getApiBaseUrl();
 
+
+// Planner routes default to the current week; send the device's UTC offset
+// so that week starts at local Monday midnight rather than UTC's
+export const localWeekQuery = () => `tz_offset_minutes=${-new Date().getTimezoneOffset()}`;
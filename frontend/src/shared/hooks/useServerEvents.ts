@@ -0,0 +1,107 @@
+import { useEffect, useRef } from 'react';
+import { useAuth } from '@/shared/context/AuthContext';
+import { API_BASE_URL } from '@/shared/config/api';
+
+export type ServerEventHandler = (data: any) => void;
+
+// Reconnect once this much of the stream is buffered, so a long-lived
+// connection doesn't grow responseText forever
+const MAX_STREAM_CHARS = 1_000_000;
+
+/**
+ * Subscribe to the backend's per-user change events (GET /events).
+ *
+ * Streams over XMLHttpRequest because React Native has no EventSource and
+ * EventSource can't send the Authorization header. Reconnects with backoff,
+ * and calls the `resync` handler after a reconnect, since events sent while
+ * disconnected are lost.
+ */
+export function useServerEvents(
+  handlers: Record<string, ServerEventHandler>,
+  enabled: boolean = true
+): void {
+  const { user } = useAuth();
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+
+  useEffect(() => {
+    if (!user || !enabled) return;
+
+    let request: XMLHttpRequest | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | null = null;
+    let stopped = false;
+    let attempt = 0;
+    let connectedBefore = false;
+
+    const dispatch = (block: string) => {
+      let event = 'message';
+      const data: string[] = [];
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data.push(line.slice(5).trimStart());
+      }
+
+      if (event === 'ready') {
+        attempt = 0;
+        if (connectedBefore) handlersRef.current.resync?.({});
+        connectedBefore = true;
+        return;
+      }
+
+      const handler = handlersRef.current[event];
+      if (!handler || data.length === 0) return;
+      try {
+        handler(JSON.parse(data.join('\n')));
+      } catch (e) {
+        console.error(`Failed to handle server event ${event}`, e);
+      }
+    };
+
+    const scheduleReconnect = () => {
+      if (stopped) return;
+      const delay = Math.min(30000, 1000 * 2 ** attempt);
+      attempt += 1;
+      retryTimer = setTimeout(connect, delay);
+    };
+
+    const connect = async () => {
+      let token: string;
+      try {
+        token = await user.getIdToken();
+      } catch (e) {
+        scheduleReconnect();
+        return;
+      }
+      if (stopped) return;
+
+      const xhr = new XMLHttpRequest();
+      request = xhr;
+      let seen = 0;
+      let buffer = '';
+
+      xhr.open('GET', `${API_BASE_URL}/events`);
+      xhr.setRequestHeader('Authorization', `Bearer ${token}`);
+      xhr.setRequestHeader('Accept', 'text/event-stream');
+      xhr.onprogress = () => {
+        const text = xhr.responseText;
+        buffer += text.slice(seen);
+        seen = text.length;
+        const blocks = buffer.split('\n\n');
+        buffer = blocks.pop() ?? '';
+        blocks.forEach(dispatch);
+        if (seen > MAX_STREAM_CHARS) xhr.abort();
+      };
+      // Fires after errors, aborts and the server closing the stream alike
+      xhr.onloadend = scheduleReconnect;
+      xhr.send();
+    };
+
+    connect();
+
+    return () => {
+      stopped = true;
+      if (retryTimer) clearTimeout(retryTimer);
+      request?.abort();
+    };
+  }, [user, enabled]);
+}